@@ -33,6 +33,45 @@ QTYPE_EOD = 2
 QTYPE_SINGLE = 3
 QTYPE_OPTIONS_EOD = 4
 
+#
+# Local disk cache of DB quotes (set QUOTES_CACHE_DIR path in settings_local.py to enable)
+#
+QUOTES_CACHE_DIR = None
+QUOTES_CACHE_MAX_SIZE = 10 * 1024 ** 3  # bytes
+QUOTES_CACHE_OPTIONS_EOD_MAX_AGE = 4 * 3600  # seconds, options EOD blobs are updated by the DB daily
+QUOTES_CACHE_INTRADAY_SETTLE_DAYS = 2  # days, recent intraday day-blobs could be updated by the nightly DB update
+
+# Local disk cache of built QuoteContFut series for incremental builds (set path to enable)
+QUOTES_CONTFUT_CACHE_DIR = None
+
+#
+# In-memory intraday prices cache of the DataFeed (set INTRADAY_PRICE_CACHE_MAX_SIZE = None to disable)
+#
+INTRADAY_PRICE_CACHE_MAX_SIZE = 256 * 1024 ** 2  # bytes
+INTRADAY_PRICE_CACHE_CHUNK_DAYS = 30
+
+#
+# In-memory cache regions limits of DataFeed and DataManager (see tmqrfeed.cache.CacheManager)
+# {region name: {'max_entries': int, 'max_size': bytes, 'ttl': seconds}}, not listed regions are unlimited
+#
+CACHE_REGIONS = {
+    'price_data': {'max_size': 2 * 1024 ** 3},
+    'options_iv': {'max_size': 1024 ** 3},
+    'single_price': {'max_entries': 2 * 10 ** 6},
+}
+
+#
+# Strategy calculate() results cache limit (enabled by 'wfo_exposure_cache' strategy kwarg)
+#
+STRATEGY_EXPOSURE_CACHE_MAX_SIZE = 512 * 1024 ** 2  # bytes
+
+#
+# Process-wide reference data store shared by all DataManager instances (see tmqrfeed.refdata)
+# Set REFDATA_STORE_DIR path to share the store between processes via local disk
+#
+REFDATA_STORE_ENABLED = False
+REFDATA_STORE_DIR = None
+
 #
 # Min-max range of quotes
 #
@@ -1,9 +1,18 @@
 import re
-from datetime import time, timedelta
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
 
 from tmqr.errors import SettingsError, ArgumentError
 from tmqr.settings import *
 
+# AssetSession.get_many() value of missing 'next_sess_date' (the same as pandas NaT internal value)
+SESSION_EPOCH_NONE = np.iinfo(np.int64).min
+
+EPOCH_NAIVE = datetime(1970, 1, 1)
+
 
 class AssetSession:
     """
@@ -22,6 +31,13 @@ class AssetSession:
         self._check_integrity(sessions)
         self.sessions = self.parse(sessions)
 
+        # Session change dates for bisect lookups
+        self._sess_dates = [s['dt'].date() for s in self.sessions]
+        # Memoized session params {(date, decision_time_shift): (start, decision, execution, next_sess_date)}
+        self._sess_cache = {}
+        # Memoized epochs {(date, decision_time_shift, local_time): (start, decision, execution, next_sess_date)}
+        self._sess_epochs_cache = {}
+
     def __eq__(self, other):
         if not isinstance(other, type(self)):
             return False
@@ -122,23 +138,69 @@ class AssetSession:
 
         return self._get_sess_params(date, decision_time_shift)
 
+    def get_many(self, dates, decision_time_shift=0, local_time=False):
+        """
+        Get trading session params for many dates at once
+        :param dates: DatetimeIndex or list of datetime like objects (tz-aware dates are used as local session dates)
+        :param decision_time_shift: decision time offset in minutes
+        :param local_time: return epoch seconds of the tz-naive local times (i.e. to compare with the tz-naive
+                           local quotes index values) instead of UTC epoch seconds
+        :return: tuple of (start, decision, execution, next_sess_date) np.int64 arrays of epoch seconds,
+                 next_sess_date is SESSION_EPOCH_NONE if there is no next session
+        """
+        if decision_time_shift < 0:
+            raise ArgumentError("'decision_time_shift' argument must be >= 0")
+
+        idx = pd.DatetimeIndex(dates)
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+
+        days, days_inverse = np.unique(idx.values.astype('datetime64[D]'), return_inverse=True)
+
+        result = np.empty((len(days), 4), dtype=np.int64)
+        for i, day in enumerate(days.astype(object)):
+            result[i] = self._get_sess_epochs(day, decision_time_shift, local_time)
+
+        result = result[days_inverse]
+        return result[:, 0], result[:, 1], result[:, 2], result[:, 3]
+
+    def _get_sess_epochs(self, date, decision_time_shift, local_time=False):
+        key = (date, decision_time_shift, local_time)
+        epochs = self._sess_epochs_cache.get(key)
+        if epochs is None:
+            if local_time:
+                epochs = tuple(SESSION_EPOCH_NONE if dt is None else
+                               int((dt.replace(tzinfo=None) - EPOCH_NAIVE).total_seconds())
+                               for dt in self._get_sess_params(date, decision_time_shift))
+            else:
+                epochs = tuple(SESSION_EPOCH_NONE if dt is None else int(dt.timestamp())
+                               for dt in self._get_sess_params(date, decision_time_shift))
+            self._sess_epochs_cache[key] = epochs
+        return epochs
+
     def _get_sess_params(self, date, decision_time_shift=0):
-        if date.tzinfo is None:
-            dt = date
+        key = (date.date() if isinstance(date, datetime) else date, decision_time_shift)
+
+        result = self._sess_cache.get(key)
+        if result is not None:
+            return result
+
+        dt = datetime.combine(key[0], time(0, 0))
+        i = bisect_right(self._sess_dates, key[0]) - 1
+        if i < 0:
+            raise SettingsError("Trading sessions information doesn't contain records for so early date, "
+                                "try to add '1900-01-01' record to implement default session")
+        sess = self.sessions[i]
+
+        start = self.tz.localize(datetime.combine(dt, sess['start']))
+        decision = self.tz.localize(datetime.combine(dt, sess['decision'])) - timedelta(
+            minutes=decision_time_shift)
+        execution = self.tz.localize(datetime.combine(dt, sess['execution']))
+        if i < len(self.sessions) - 1:
+            next_sess_date = self.tz.localize(self.sessions[i + 1]['dt'])
         else:
-            dt = date.replace(tzinfo=None)
-
-        for i, sess in enumerate(reversed(self.sessions)):
-            if dt >= sess['dt']:
-                start = self.tz.localize(datetime.combine(dt, sess['start']))
-                decision = self.tz.localize(datetime.combine(dt, sess['decision'])) - timedelta(
-                    minutes=decision_time_shift)
-                execution = self.tz.localize(datetime.combine(dt, sess['execution']))
-                if i > 0:
-                    next_sess_date = self.tz.localize(self.sessions[len(self.sessions) - i]['dt'])
-                else:
-                    next_sess_date = None
-                return start, decision, execution, next_sess_date
-
-        raise SettingsError("Trading sessions information doesn't contain records for so early date, "
-                            "try to add '1900-01-01' record to implement default session")
+            next_sess_date = None
+
+        result = start, decision, execution, next_sess_date
+        self._sess_cache[key] = result
+        return result
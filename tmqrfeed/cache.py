@@ -0,0 +1,282 @@
+import sys
+import threading
+import time as systime
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from tmqr.errors import ArgumentError
+from tmqr.logs import log
+
+_MISSING = object()
+
+
+def sizeof(obj):
+    """
+    Approximate memory size of the cached object in bytes
+    (numpy arrays and pandas objects are measured by their data buffers, tuples/lists/dicts recursively)
+    :param obj: any object
+    :return: size in bytes
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(sizeof(x) for x in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(k) + sizeof(v) for k, v in obj.items())
+    return sys.getsizeof(obj)
+
+
+class CacheRegion:
+    """
+    Named in-memory cache region with dict-like interface
+
+    The region is bounded by 'max_entries' and/or 'max_size' bytes (least recently used entries are evicted first),
+    entries older than 'ttl' seconds are expired. Hits, misses and evictions are counted for the region stats.
+    All limits are optional, the region without limits works as plain dict with stats.
+    """
+
+    def __init__(self, name, max_entries=None, max_size=None, ttl=None, sizeof_func=None):
+        """
+        Initialize cache region
+        :param name: region name
+        :param max_entries: max number of entries (None - unlimited)
+        :param max_size: max size of entries in bytes, calculated by 'sizeof_func' (None - unlimited)
+        :param ttl: entry time to live in seconds (None - entries never expire)
+        :param sizeof_func: callable(value) -> size in bytes (default: sizeof())
+        """
+        if max_entries is not None and max_entries <= 0:
+            raise ArgumentError("'max_entries' must be > 0")
+        if max_size is not None and max_size <= 0:
+            raise ArgumentError("'max_size' must be > 0")
+        if ttl is not None and ttl <= 0:
+            raise ArgumentError("'ttl' must be > 0")
+
+        self.name = name
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sizeof_func = sizeof_func if sizeof_func is not None else sizeof
+
+        # {key: (value, size, creation time)}
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size(self):
+        """
+        Size of the region entries in bytes (always 0 if 'max_size' is not set, sizes are not calculated)
+        """
+        return self._size
+
+    def _is_expired(self, created):
+        return self.ttl is not None and systime.time() - created > self.ttl
+
+    def _remove(self, key):
+        value, size, created = self._data.pop(key)
+        self._size -= size
+
+    def get(self, key, default=None):
+        """
+        Get value from the cache, updates the LRU order
+        :param key: cache key
+        :param default: returned if key is not found or expired
+        :return:
+        """
+        with self._lock:
+            rec = self._data.get(key, None)
+            if rec is None or self._is_expired(rec[2]):
+                if rec is not None:
+                    self._remove(key)
+                    self.evictions += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return rec[0]
+
+    def put(self, key, value):
+        """
+        Store value in the cache, evicts least recently used entries if limits are exceeded
+        (the new entry is never evicted, even if it's larger than 'max_size')
+        :param key: cache key
+        :param value: cached value
+        :return:
+        """
+        size = self.sizeof_func(value) if self.max_size is not None else 0
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size, systime.time())
+            self._size += size
+
+            while len(self._data) > 1 and ((self.max_entries is not None and len(self._data) > self.max_entries) or
+                                           (self.max_size is not None and self._size > self.max_size)):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def setdefault(self, key, value):
+        """
+        Store value if the key is not cached yet
+        :return: cached value
+        """
+        with self._lock:
+            cached = self.get(key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+            self.put(key, value)
+            return value
+
+    def pop(self, key, default=None):
+        """
+        Remove entry from the cache
+        :return: removed value or default
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data[key][0]
+            self._remove(key)
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __delitem__(self, key):
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            rec = self._data.get(key, None)
+            return rec is not None and not self._is_expired(rec[2])
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def clear(self):
+        """
+        Remove all entries from the region (stats counters are kept)
+        """
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def stats(self):
+        """
+        Region statistics
+        :return: dict of {'name', 'entries', 'size', 'hits', 'misses', 'evictions', 'hit_ratio',
+                          'max_entries', 'max_size', 'ttl'}
+        """
+        n_requests = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._data),
+            'size': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / n_requests if n_requests > 0 else float('nan'),
+            'max_entries': self.max_entries,
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+        }
+
+    def __repr__(self):
+        return f"CacheRegion('{self.name}', entries: {len(self._data)})"
+
+
+class CacheManager:
+    """
+    Registry of named cache regions, regions limits could be overridden by 'settings' (see CACHE_REGIONS in settings)
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initialize cache manager
+        :param settings: dict of {region name: {'max_entries', 'max_size', 'ttl'}} overriding regions defaults
+        """
+        self.settings = settings if settings is not None else {}
+        self._regions = OrderedDict()
+
+    def region(self, name, **kwargs):
+        """
+        Get or create cache region
+        :param name: region name
+        :param kwargs: CacheRegion() kwargs used as defaults for the new region (overridden by manager settings)
+        :return: CacheRegion
+        """
+        region = self._regions.get(name, None)
+        if region is None:
+            region_kwargs = dict(kwargs)
+            region_kwargs.update(self.settings.get(name, {}))
+            region = CacheRegion(name, **region_kwargs)
+            self._regions[name] = region
+        return region
+
+    def add_region(self, region):
+        """
+        Register externally created region (i.e. owned by other cache class)
+        :param region: CacheRegion instance
+        :return: region
+        """
+        if region.name in self._regions:
+            raise ArgumentError(f"Cache region '{region.name}' is already exists")
+        self._regions[region.name] = region
+        return region
+
+    def __getitem__(self, name):
+        return self._regions[name]
+
+    def __contains__(self, name):
+        return name in self._regions
+
+    def regions(self):
+        """
+        :return: list of regions names
+        """
+        return list(self._regions.keys())
+
+    def stats(self):
+        """
+        :return: list of regions stats dicts (see CacheRegion.stats())
+        """
+        return [r.stats() for r in self._regions.values()]
+
+    def clear(self, name=None):
+        """
+        Clear single region or all regions if 'name' is None
+        """
+        if name is not None:
+            self._regions[name].clear()
+        else:
+            for r in self._regions.values():
+                r.clear()
+
+    def log_stats(self):
+        for s in self.stats():
+            log.info(f"Cache {s['name']:<20} entries: {s['entries']:>8} size: {s['size'] / 1024 ** 2:>10.1f}MB "
+                     f"hits: {s['hits']:>10} misses: {s['misses']:>10} evictions: {s['evictions']:>8}")
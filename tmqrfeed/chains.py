@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from collections.abc import Mapping
 
 import numpy as np
 import pandas as pd
@@ -7,6 +8,7 @@ from pandas.tseries.offsets import BDay
 from tmqr.errors import ArgumentError, NotFoundError, ChainNotFoundError, QuoteNotFoundError
 from tmqr.settings import *
 from tmqrfeed.contracts import FutureContract, ContractBase, OptionContract
+from tmqrfeed.fast_option_pricing import blackscholes_greeks_array, GREEK_DELTA
 import warnings
 import datetime
 from typing import List, Tuple
@@ -60,7 +62,7 @@ class FutureChain:
         chain = []
 
         for i, tckr in enumerate(raw_futures):
-            fut = FutureContract(tckr, self.datamanager)
+            fut = FutureContract.intern(tckr, self.datamanager)
 
             #
             # Check expiration months filter
@@ -153,6 +155,105 @@ class FutureChain:
         return self._futchain
 
 
+class OptionChainRecord(Mapping):
+    """
+    Compact option chain record for single expiration, the mapping of {strike: (call, put)} like a plain dict,
+    but OptionContract instances are created only on access (one instance per strike is reused then)
+    """
+
+    def __init__(self, strikes, call_tickers, put_tickers, underlying: ContractBase, datamanager):
+        """
+        Init option chain record
+        :param strikes: ascending sorted strikes list
+        :param call_tickers: calls tickers list (in strikes order)
+        :param put_tickers: puts tickers list (in strikes order)
+        :param underlying: underlying contract
+        :param datamanager: DataManager instance
+        """
+        if len(strikes) != len(call_tickers) or len(strikes) != len(put_tickers):
+            raise ArgumentError("'strikes', 'call_tickers' and 'put_tickers' must have the same length")
+
+        self.strikes = np.array(strikes, dtype=np.float64)
+        self.call_tickers = tuple(call_tickers)
+        self.put_tickers = tuple(put_tickers)
+
+        if len(self.strikes) > 1 and np.any(np.diff(self.strikes) <= 0):
+            # Strikes must be unique and sorted for the lookups
+            idx = np.argsort(self.strikes, kind='mergesort')
+            if np.any(np.diff(self.strikes[idx]) == 0):
+                raise ArgumentError("Duplicated strikes in option chain record")
+            self.strikes = self.strikes[idx]
+            self.call_tickers = tuple(self.call_tickers[i] for i in idx)
+            self.put_tickers = tuple(self.put_tickers[i] for i in idx)
+        self.underlying = underlying
+        self.dm = datamanager
+
+        # {strike index: (call, put)} of already created contracts
+        self._contracts = {}
+        self._opt_codes = None
+
+    @staticmethod
+    def _parse_opt_code(tckr):
+        # US.C.F-ZB-H11-110322.110121.OPTCODE@89.0 -> OPTCODE (the same as OptionContract.opt_code)
+        toks = tckr.split('@')[0].split('.')
+        return toks[4] if len(toks) > 4 else ''
+
+    @property
+    def opt_codes(self):
+        """
+        Set of options codes of the record (parsed from tickers without contracts creation)
+        :return:
+        """
+        if self._opt_codes is None:
+            self._opt_codes = {self._parse_opt_code(t) for t in self.call_tickers + self.put_tickers}
+        return self._opt_codes
+
+    @property
+    def tickers(self) -> List[str]:
+        """
+        Tickers of all calls and puts of the record (in strikes order)
+        :return:
+        """
+        return [t for call_put in zip(self.call_tickers, self.put_tickers) for t in call_put]
+
+    def _get_index(self, strike):
+        idx = int(np.searchsorted(self.strikes, strike))
+        if idx >= len(self.strikes) or self.strikes[idx] != strike:
+            raise KeyError(strike)
+        return idx
+
+    def __getitem__(self, strike) -> Tuple[OptionContract, OptionContract]:
+        idx = self._get_index(strike)
+        call_put = self._contracts.get(idx, None)
+        if call_put is None:
+            call_put = (
+                OptionContract.intern(self.call_tickers[idx], datamanager=self.dm, underlying=self.underlying),
+                OptionContract.intern(self.put_tickers[idx], datamanager=self.dm, underlying=self.underlying)
+            )
+            self._contracts[idx] = call_put
+        return call_put
+
+    def __contains__(self, strike):
+        try:
+            self._get_index(strike)
+            return True
+        except (KeyError, TypeError):
+            return False
+
+    def __iter__(self):
+        return iter(self.strikes.tolist())
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def copy(self) -> OrderedDict:
+        """
+        Plain dict copy of the record (creates all contracts)
+        :return: OrderedDict[strike, (call, put)]
+        """
+        return OrderedDict(self.items())
+
+
 class OptionChain:
     """
     Main class for option chains data management.
@@ -163,8 +264,12 @@ class OptionChain:
         self.dm = datamanager
         self.underlying = underlying
 
+        # OptionChainRecord or plain dict of {strike: (call, put)}
         self._options = option_chain_record
-        self._strike_array = np.array(list(self._options.keys()))
+        if isinstance(option_chain_record, OptionChainRecord):
+            self._strike_array = option_chain_record.strikes
+        else:
+            self._strike_array = np.array(list(self._options.keys()))
 
         if self.dm is None:
             raise ArgumentError("DataManager instance must be set")
@@ -173,10 +278,13 @@ class OptionChain:
             raise ChainNotFoundError(f'Empty option chain for {underlying} at expiration: {expiration}')
 
         # Setting chain opt code
-        opt_code_set = set()
-        for call, put in self._options.values():
-            opt_code_set.add(call.opt_code)
-            opt_code_set.add(put.opt_code)
+        if isinstance(option_chain_record, OptionChainRecord):
+            opt_code_set = set(option_chain_record.opt_codes)
+        else:
+            opt_code_set = set()
+            for call, put in self._options.values():
+                opt_code_set.add(call.opt_code)
+                opt_code_set.add(put.opt_code)
 
         if len(opt_code_set) > 1:
             raise ArgumentError(
@@ -192,6 +300,16 @@ class OptionChain:
         """
         return self._expiration
 
+    @property
+    def tickers(self) -> List[str]:
+        """
+        Tickers of all calls and puts of the chain (in strikes order)
+        :return:
+        """
+        if isinstance(self._options, OptionChainRecord):
+            return self._options.tickers
+        return [opt.ticker for call_put in self._options.values() for opt in call_put]
+
     def find(self,
              dt: datetime.datetime,
              item,
@@ -218,6 +336,8 @@ class OptionChain:
             * how == 'delta' kwargs:
                 - error_limit - how many QuoteNotFound errors occurred before raising exception (default: 5)
                 - strike_limit - how many strikes to analyse from ATM (default: 30)
+                - vectorized - fetch IVs of all candidate strikes by single datafeed call and calculate deltas
+                               by vectorized pricing kernel (default: False)
         :return: OptionContract
 
         Examples::
@@ -277,6 +397,8 @@ class OptionChain:
 
             err_limit = kwargs.get('error_limit', 5)
             strike_limit = kwargs.get('strike_limit', 30)
+            if kwargs.get('vectorized', False):
+                return self._find_by_delta_vectorized(dt, item, opttype.upper(), err_limit, strike_limit)
             return self._find_by_delta(dt, item, opttype.upper(), err_limit, strike_limit)
         else:
             raise ArgumentError("Wrong 'how' argument, only 'offset'|'delta' values supported.")
@@ -362,6 +484,111 @@ class OptionChain:
 
         return last_contract
 
+    def _find_by_delta_vectorized(self,
+                                  dt: datetime,
+                                  delta: float,
+                                  opttype: str,
+                                  error_limit: int = 5,
+                                  strike_limit: int = 30) -> OptionContract:
+        """
+        Search option contract by delta value (the same as _find_by_delta(), but all candidate strikes IVs are fetched
+        by single datafeed call and all deltas are calculated by vectorized pricing kernel)
+        :param dt: calculation date
+        :param delta: delta to find (must be > 0 and < 1)
+        :param opttype: option type 'C' or 'P'
+        :param error_limit: how many consecutive QuoteNotFound errors occurred until ChainNotFoundError() raised
+        :param strike_limit: how many strikes to analyse from ATM
+        :return: Option contract instance
+        """
+        delta = abs(delta)
+        if delta <= 0 or delta >= 1 or np.isnan(delta):
+            raise ArgumentError("Delta values must be > 0 and < 1")
+        if strike_limit <= 0:
+            raise ArgumentError("Only positive 'strike_limit' argument allowed")
+
+        if delta == 0.5:
+            return self._find_by_offset(dt, 0, opttype, error_limit=error_limit)
+
+        # Fetching underlying price
+        ul_decision_px, ul_exec_px = self.dm.price_get(self.underlying, dt)
+
+        atm_index = self._get_atm_index(ul_decision_px)
+        strikes_max_offset = len(self._strike_array) - atm_index - 1
+        strikes_min_offset = -atm_index
+
+        if opttype == 'P':
+            # Algo direction for put
+            offset_direction = 1 if delta > 0.5 else -1
+            max_offset = abs(strikes_max_offset) if delta > 0.5 else abs(strikes_min_offset)
+        else:
+            # Algo direction for call
+            offset_direction = 1 if delta < 0.5 else -1
+            max_offset = abs(strikes_max_offset) if delta < 0.5 else abs(strikes_min_offset)
+
+        # Candidate strikes in the search order (from ATM)
+        strike_idx = atm_index + offset_direction * np.arange(1, min(strike_limit, max_offset) + 1)
+        if len(strike_idx) == 0:
+            raise ChainNotFoundError(f"Couldn't get requested strike by delta {delta} at {dt}. Strike limit is reached."
+                                     f" Try to check delta value validity and data presence for {self.underlying}.")
+
+        strikes = self._strike_array[strike_idx]
+        options = [self._options[strike][0 if opttype == 'C' else 1] for strike in strikes]
+
+        prices = np.array(self.dm.price_get_many(options, dt), dtype=np.float64)
+        iv_decision, iv_exec = prices[:, 0], prices[:, 1]
+        try:
+            rfr = self.dm.riskfreerate_get(options[0], dt)
+            has_data = ~np.isnan(iv_decision) & ~np.isnan(iv_exec)
+        except NotFoundError:
+            has_data = np.zeros(len(options), dtype=bool)
+
+        # Length of the consecutive quotes errors run at every candidate
+        n_missing = np.cumsum(~has_data)
+        errors_run = n_missing - np.maximum.accumulate(np.where(has_data, n_missing, 0))
+        error_limit_idx = np.flatnonzero(errors_run >= error_limit)
+        error_limit_pos = error_limit_idx[0] if len(error_limit_idx) > 0 else len(options)
+
+        # Deltas of all candidates by single kernel call
+        abs_deltas = np.full(len(options), np.nan)
+        if has_data.any():
+            opt = options[0]
+            abs_deltas[has_data] = np.abs(blackscholes_greeks_array(1 if opttype == 'C' else 0,
+                                                                    ul_decision_px,
+                                                                    strikes[has_data],
+                                                                    opt.to_expiration_years_from_days(
+                                                                        opt.to_expiration_days(dt)),
+                                                                    rfr,
+                                                                    iv_decision[has_data])[GREEK_DELTA])
+
+        # Option delta could be non-monotonic by strike (IV smile), so the first matching strike is picked
+        with np.errstate(invalid='ignore'):
+            if delta > 0.5:
+                is_target = has_data & (abs_deltas >= delta)
+            else:
+                is_target = has_data & (abs_deltas <= delta)
+
+        target_idx = np.flatnonzero(is_target[:error_limit_pos])
+        if len(target_idx) > 0:
+            pos = target_idx[0]
+        else:
+            if error_limit_pos < len(options):
+                raise ChainNotFoundError(
+                    f"Couldn't get requested strike by delta {delta} at {dt} for {self.underlying}."
+                    f" QuoteNotFound errors limit reached: {error_limit} errors occurred.")
+
+            valid_idx = np.flatnonzero(has_data)
+            if len(valid_idx) == 0:
+                raise ChainNotFoundError(
+                    f"Couldn't get requested strike by delta {delta} at {dt}. Strike limit is reached."
+                    f" Try to check delta value validity and data presence for {self.underlying}.")
+            # Returning last contract with data
+            pos = valid_idx[-1]
+
+        contract = options[pos]
+        # Set pricing context for option, this prevents extra DB calls
+        contract.set_pricing_context(dt, ul_decision_px, ul_exec_px, iv_decision[pos], iv_exec[pos], rfr)
+        return contract
+
     def _find_by_offset(self,
                         dt: datetime,
                         item: int,
@@ -1,4 +1,7 @@
+import threading
 import warnings
+import weakref
+from functools import lru_cache
 
 from tmqr.errors import ArgumentError, SettingsError
 from tmqr.settings import *
@@ -10,11 +13,36 @@ from tmqrfeed.fast_option_pricing import blackscholes, blackscholes_greeks, GREE
 
 FLOAT_NAN = float('nan')
 
+# Interned contracts registry {(ticker, id(datamanager)): contract}, see ContractBase.intern()
+# Entries are removed when contracts are not used anymore, contracts keep their DataManager alive so id() is unique
+_contracts_registry = weakref.WeakValueDictionary()
+_contracts_registry_lock = threading.Lock()
+
+
+@lru_cache(maxsize=100000)
+def _parse_expiration_string(exp_string):
+    """
+    Cached YYMMDD expiration parsing (many contracts share the same expirations)
+    :return: datetime or None if the date is invalid
+    """
+    y = int(exp_string[:2])
+    if y < 50:
+        y += 2000
+    else:
+        y += 1900
+    try:
+        m = int(exp_string[2:4])
+        d = int(exp_string[-2:])
+        return datetime(y, m, d)
+    except ValueError:
+        return None
+
 
 class ContractBase:
     """
     Base class for generic asset
     """
+    __slots__ = ('ticker', '_toks', 'ctype', 'dm', '_point_value', '__weakref__')
 
     def __init__(self, tckr, datamanager=None, **kwargs):
         """
@@ -187,17 +215,13 @@ class ContractBase:
         """
         if len(exp_string) != 6:
             raise ArgumentError("Expiration string must be 6 chars length: YYMMDD")
-        y = int(exp_string[:2])
-        if y < 50:
-            y += 2000
-        else:
-            y += 1900
         try:
-            m = int(exp_string[2:4])
-            d = int(exp_string[-2:])
-            return datetime(y, m, d)
+            exp = _parse_expiration_string(exp_string)
         except ValueError:
+            exp = None
+        if exp is None:
             raise ArgumentError("Bad expiration sting for {0}".format(self.ticker))
+        return exp
 
     @property
     def data_source(self):
@@ -221,8 +245,11 @@ class ContractBase:
     def __hash__(self):
         return self.ticker.__hash__()
 
-    @classmethod
-    def deserialize(cls, ticker, datamanager=None):
+    @staticmethod
+    def _get_contract_class(ticker):
+        """
+        Contract class by contract type in ticker
+        """
         idx_begin = ticker.find('.')
         idx_end = ticker.find('.', idx_begin + 1)
         ctype = ticker[idx_begin + 1:idx_end]
@@ -231,17 +258,56 @@ class ContractBase:
             raise ArgumentError(f"Couldn't parse contract type from {ticker}")
 
         if ctype == 'F':
-            return FutureContract(ticker, datamanager)
+            return FutureContract
         elif ctype == 'P' or ctype == 'C':
-            return OptionContract(ticker, datamanager)
+            return OptionContract
         else:
-            return ContractBase(ticker, datamanager)
+            return ContractBase
+
+    @classmethod
+    def intern(cls, ticker, datamanager=None, **kwargs):
+        """
+        Get the shared contract instance for (ticker, datamanager), the instance is created only once while it's used
+
+        ContractBase.intern() creates the contract class by ticker contract type,
+        FutureContract.intern() / OptionContract.intern() validate the ticker by the class
+
+        :param ticker: Ticker code
+        :param datamanager: DataManager instance
+        :param kwargs: contract init kwargs (applied to the new instance only)
+        :return: contract instance
+        """
+        contract_class = cls._get_contract_class(ticker) if cls is ContractBase else cls
+        key = (ticker, id(datamanager))
+
+        with _contracts_registry_lock:
+            contract = _contracts_registry.get(key, None)
+            if contract is None or type(contract) is not contract_class or contract.dm is not datamanager:
+                contract = contract_class(ticker, datamanager, **kwargs)
+                _contracts_registry[key] = contract
+            elif kwargs.get('underlying', None) is not None and isinstance(contract, OptionContract) \
+                    and contract._underlying is None:
+                contract._underlying = kwargs['underlying']
+
+        return contract
+
+    @classmethod
+    def deserialize(cls, ticker, datamanager=None):
+        """
+        Get contract instance from ticker (instances are interned, see ContractBase.intern())
+
+        :param ticker: Ticker code
+        :param datamanager: DataManager instance
+        :return: contract instance
+        """
+        return ContractBase.intern(ticker, datamanager)
 
 
 class FutureContract(ContractBase):
     """
     Future contract asset class
     """
+    __slots__ = ('expiration', 'expiration_month')
 
     def __init__(self, tckr, datamanager=None, **kwargs):
         """
@@ -330,6 +396,7 @@ class OptionContract(ContractBase):
     """
     Option contract asset class
     """
+    __slots__ = ('expiration', 'strike', 'opt_code', '_underlying', '_pricing_context')
 
     def __init__(self, tckr, datamanager=None, **kwargs):
         """
@@ -390,7 +457,7 @@ class OptionContract(ContractBase):
         if self._underlying is None:
             underlying_name = '{0}.{1}'.format(self._toks[0], self._toks[2].replace('-', '.'))
             if self._toks[2].startswith('F-'):
-                self._underlying = FutureContract(underlying_name, self.dm)
+                self._underlying = FutureContract.intern(underlying_name, self.dm)
             else:
                 self._underlying = ContractBase(underlying_name, self.dm)
         return self._underlying
@@ -495,7 +562,7 @@ class OptionContract(ContractBase):
         :param days_to_expiration: 
         :param rfr: 
         :param iv: 
-        :return: 
+        :return: tuple (delta, gamma, vega, theta, rho)
         """
         return blackscholes_greeks(1 if self.ctype == 'C' else 0, ulprice, self.strike,
                                    self.to_expiration_years_from_days(days_to_expiration),
@@ -522,14 +589,14 @@ class OptionContract(ContractBase):
 
     def greeks(self, date, ulprice=None, iv_change=0.0, days_to_expiration=None, riskfreerate=None):
         """
-        Calculate option's greeks at the decision time  (only delta supported so far)
+        Calculate option's greeks at the decision time (also could be used for WhatIF analysis)
 
         :param date: 
         :param ulprice: 
         :param iv_change: 
         :param days_to_expiration: 
         :param riskfreerate: 
-        :return: tuple (decision_price, execution_price)
+        :return: tuple (delta, gamma, vega, theta, rho), use GREEK_* constants as indexes
         """
         date, ul_decision_px, ul_exec_px, option_decision_iv, option_exec_iv, option_risk_free_rate = self.get_pricing_context(
             date)
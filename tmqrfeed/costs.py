@@ -1,3 +1,5 @@
+import numpy as np
+
 from .contracts import ContractBase
 
 
@@ -28,3 +30,20 @@ class Costs:
             return -abs(self.per_option) * abs(qty)
         else:
             return -abs(self.per_contract) * abs(qty)
+
+    def calc_costs_array(self, asset: ContractBase, qty) -> np.ndarray:
+        """
+        Calculate costs for many transactions of the same asset
+        :param asset: ContractBase instance
+        :param qty: array of transactions qty
+        :return: np.ndarray of costs USD values
+        """
+        qty = np.asarray(qty, dtype=np.float64)
+        if type(self).calc_costs is not Costs.calc_costs:
+            # Custom costs model, calculate transactions one by one
+            return np.array([self.calc_costs(asset, q) for q in qty], dtype=np.float64)
+
+        if asset.ctype in ('P', 'C'):
+            return -abs(self.per_option) * np.abs(qty)
+        else:
+            return -abs(self.per_contract) * np.abs(qty)
@@ -1,14 +1,22 @@
+import json
+import os
 import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 
+import numpy as np
 import pandas as pd
 from pymongo import MongoClient
 import pymongo
 
 from tmqr.errors import *
 from tmqr.settings import *
-from datetime import date, datetime, time
-from tmqr.serialization import object_load_decompress
+from datetime import date, datetime, time, timedelta
+from tmqr.logs import log
+from tmqr.serialization import object_load_decompress, object_save_compress
+from tmqrfeed.quotescache import QuotesDiskCache
+from tmqrfeed.refdata import get_shared_store, get_refdata_version, REFDATA_KINDS, REFDATA_INSTRUMENT_INFO, \
+    REFDATA_CONTRACT_INFO, REFDATA_FUTURES_CHAIN, REFDATA_OPTION_CHAINS, REFDATA_RFR_SERIES
 #
 # Collection names constants
 #
@@ -18,6 +26,12 @@ COLLECTION_INDEX_DATA = 'index_data'
 COLLECTION_ALPHA_DATA = 'alpha_data'
 COLLECTION_RFR = 'quotes_riskfreerate'
 
+#
+# Bulk quotes fetching settings
+#
+DB_BULK_BATCH_SIZE = 500
+DB_BULK_DECOMPRESS_WORKERS = 4
+
 
 class DataEngineBase:
     """
@@ -28,6 +42,13 @@ class DataEngineBase:
     def __init__(self, **kwargs):
         pass
 
+    @property
+    def engine_id(self):
+        """
+        Data source identifier (used in the keys of locally cached data built from the engine's data)
+        """
+        return type(self).__name__
+
 
 class DataEngineMongo(DataEngineBase):
     """
@@ -42,6 +63,51 @@ class DataEngineMongo(DataEngineBase):
         self.client = MongoClient(mongo_host)
         self.db = self.client[mongo_db]
         self.cursors = {}
+        self._engine_id = f"{type(self).__name__}:{mongo_host}/{mongo_db}"
+
+        # Bulk fetching settings (see db_get_raw_series_many())
+        self.bulk_batch_size = kwargs.get('bulk_batch_size', DB_BULK_BATCH_SIZE)
+        self.bulk_decompress_workers = kwargs.get('bulk_decompress_workers', DB_BULK_DECOMPRESS_WORKERS)
+
+        # Local disk cache of quotes blobs (disabled if cache dir is None)
+        quotes_cache_dir = kwargs.get('quotes_cache_dir', QUOTES_CACHE_DIR)
+        if quotes_cache_dir is not None:
+            self.quotes_cache = QuotesDiskCache(quotes_cache_dir,
+                                                kwargs.get('quotes_cache_max_size', QUOTES_CACHE_MAX_SIZE),
+                                                intraday_settle_days=kwargs.get('quotes_cache_intraday_settle_days',
+                                                                                QUOTES_CACHE_INTRADAY_SETTLE_DAYS))
+        else:
+            self.quotes_cache = None
+        self.quotes_cache_options_eod_max_age = kwargs.get('quotes_cache_options_eod_max_age',
+                                                           QUOTES_CACHE_OPTIONS_EOD_MAX_AGE)
+
+        # Process-wide reference data store (disabled if None, see REFDATA_STORE_ENABLED setting)
+        self.refdata_store = kwargs.get('refdata_store', get_shared_store())
+        self._refdata_versions = {}
+
+    @property
+    def engine_id(self):
+        return self._engine_id
+
+    def _refdata_version(self, name):
+        """
+        Version stamp of the reference data set, fetched once per data engine instance
+        """
+        if name not in self._refdata_versions:
+            self._refdata_versions[name] = get_refdata_version(self.db, name)
+        return self._refdata_versions[name]
+
+    def _refdata_get(self, kind, key, loader):
+        """
+        Get reference data via shared store (or directly from the DB if the store is disabled)
+        :param kind: reference data kind (see tmqrfeed.refdata.REFDATA_KINDS)
+        :param key: entry key
+        :param loader: callable() -> value, fetches the data from the DB
+        :return: reference data (shared between data engines, must not be changed)
+        """
+        if self.refdata_store is None:
+            return loader()
+        return self.refdata_store.get(kind, key, self._refdata_version(REFDATA_KINDS[kind]), loader)
 
     def db_get_futures_chain(self, instrument, date_start=None):
         """
@@ -50,6 +116,10 @@ class DataEngineMongo(DataEngineBase):
         :param date_start: Starting date of chain
         :return: List of futures' full-qualified ticker names
         """
+        return self._refdata_get(REFDATA_FUTURES_CHAIN, (instrument, date_start),
+                                 lambda: self._db_get_futures_chain(instrument, date_start))
+
+    def _db_get_futures_chain(self, instrument, date_start):
         if date_start is None:
             req = {'type': 'F', 'instr': instrument}
         else:
@@ -63,6 +133,10 @@ class DataEngineMongo(DataEngineBase):
         :param underlying_tckr: option's underlying contract tckr code (for example: future tckr code)
         :return: list of options aggregated chains
         """
+        return self._refdata_get(REFDATA_OPTION_CHAINS, underlying_tckr,
+                                 lambda: self._db_get_option_chains(underlying_tckr))
+
+    def _db_get_option_chains(self, underlying_tckr):
         cursor = self.db[COLLECTION_ASSET_INDEX].aggregate([
             {'$match': {
                 'underlying': underlying_tckr,
@@ -88,7 +162,12 @@ class DataEngineMongo(DataEngineBase):
         toks = instrument.split('.')
         if len(toks) != 2:
             raise ArgumentError("Instrument name must be <MARKET>.<INSTRUMENT>")
-        mkt_name, instr_name = toks
+
+        return self._refdata_get(REFDATA_INSTRUMENT_INFO, instrument,
+                                 lambda: self._db_get_instrument_info(instrument))
+
+    def _db_get_instrument_info(self, instrument):
+        mkt_name, instr_name = instrument.split('.')
 
         ainfo_default = self.db[COLLECTION_ASSET_INFO].find_one({'instrument': '{0}.$DEFAULT$'.format(mkt_name)})
         if ainfo_default is None:
@@ -110,7 +189,9 @@ class DataEngineMongo(DataEngineBase):
         :param tckr: full qualified ticker
         :return: Contract info Mongo dict
         """
+        return self._refdata_get(REFDATA_CONTRACT_INFO, tckr, lambda: self._db_get_contract_info(tckr))
 
+    def _db_get_contract_info(self, tckr):
         result = self.db[COLLECTION_ASSET_INDEX].find_one({'tckr': tckr})
         if result is None:
             raise DataEngineNotFoundError("Contract info for {0} not found".format(tckr))
@@ -180,33 +261,179 @@ class DataEngineMongo(DataEngineBase):
         date_start = kwargs.get('date_start', None)
         date_end = kwargs.get('date_end', None)
 
-        dt_filter = {}
-        if date_start is not None:
-            dt_filter['$gte'] = datetime.combine(date_start, time(0, 0, 0))
-        if date_end is not None:
-            dt_filter['$lte'] = datetime.combine(date_end, time(0, 0, 0))
+        dt_filter = self._source_intraday_dt_filter(date_start, date_end)
 
         request = {'tckr': tckr}
         if len(dt_filter) > 0:
             request['dt'] = dt_filter
 
         dframes_list = []
-        for data in self.db[SRC_INTRADAY].find(request):
+        for data in self._source_intraday_find(request):
             df = object_load_decompress(data['ohlc'])
             if not isinstance(df, pd.DataFrame):
                 raise DBDataCorruptionError(
                     f"{tckr} data is corrupted in {SRC_INTRADAY} collection at {data['dt']}, "
                     f"expected pd.DataFrame, got {type(data['ohlc'])}")
 
-            dframes_list.append(df)
+            dframes_list.append((data['dt'], df))
 
         if len(dframes_list) == 0:
             raise IntradayQuotesNotFoundError(f"No data found for {tckr} in period {date_start}-{date_end}")
 
-        return pd.concat(dframes_list), QTYPE_INTRADAY
+        # Cached day-blobs are yielded before the fetched ones, keep day-blobs in chronological order
+        dframes_list.sort(key=lambda x: x[0])
+        return pd.concat([df for dt, df in dframes_list]), QTYPE_INTRADAY
+
+    def db_get_raw_series_many(self, tckr_ranges, source_type, **kwargs):
+        """
+        Fetch raw series for many tickers at once (single DB cursor for all tickers)
+        :param tckr_ranges: dict of {tckr: (date_start, date_end)}, date_start or date_end could be None
+        :param source_type: datasource type
+        :param kwargs: db_get_raw_series kwargs
+        :return: dict of {tckr: (pandas DataFrame, QTYPE)}, tickers without data are not included
+        """
+        if source_type == SRC_INTRADAY:
+            return self._source_intraday_get_series_many(tckr_ranges, **kwargs)
+        elif source_type == SRC_OPTIONS_EOD:
+            return self._source_options_eod_get_series_many(tckr_ranges, **kwargs)
+
+        raise DataSourceNotFoundError("Unknown 'datasource' type")
+
+    @staticmethod
+    def _source_intraday_dt_filter(date_start, date_end):
+        """
+        Build MongoDB 'dt' field filter for intraday collection
+        :param date_start: start date (or None)
+        :param date_end: end date (or None)
+        :return: filter dict (empty if both dates are None)
+        """
+        dt_filter = {}
+        if date_start is not None:
+            dt_filter['$gte'] = datetime.combine(date_start, time(0, 0, 0))
+        if date_end is not None:
+            dt_filter['$lte'] = datetime.combine(date_end, time(0, 0, 0))
+        return dt_filter
+
+    @staticmethod
+    def _source_intraday_cache_key(tckr, dt):
+        return f"{SRC_INTRADAY}/{tckr}/{dt:%Y-%m-%d}"
+
+    def _source_intraday_find(self, request, **kwargs):
+        """
+        Iterate day-blobs records of the intraday collection.
+        If the quotes disk cache is enabled only 'tckr'/'dt' fields are requested first, cached day-blobs are loaded
+        from the disk, and the rest are fetched from the DB (only settled closed days are cached,
+        see QuotesDiskCache.is_intraday_day_cacheable())
+        :param request: MongoDB find() filter
+        :param kwargs: Collection.find() kwargs
+        :return: generator of {'tckr': ..., 'dt': ..., 'ohlc': compressed blob} records
+        """
+        if self.quotes_cache is None:
+            yield from self.db[SRC_INTRADAY].find(request, **kwargs)
+            return
+
+        missing_days = {}
+        for data in self.db[SRC_INTRADAY].find(request, projection={'_id': 0, 'tckr': 1, 'dt': 1}, **kwargs):
+            ohlc = None
+            if self.quotes_cache.is_intraday_day_cacheable(data['dt']):
+                ohlc = self.quotes_cache.get(self._source_intraday_cache_key(data['tckr'], data['dt']))
+
+            if ohlc is None:
+                missing_days.setdefault(data['tckr'], []).append(data['dt'])
+            else:
+                data['ohlc'] = ohlc
+                yield data
+
+        if len(missing_days) == 0:
+            return
+
+        or_clauses = [{'tckr': tckr, 'dt': {'$in': dt_list}} for tckr, dt_list in missing_days.items()]
+        if len(or_clauses) == 1:
+            request = or_clauses[0]
+        else:
+            request = {'$or': or_clauses}
+
+        for data in self.db[SRC_INTRADAY].find(request, **kwargs):
+            if self.quotes_cache.is_intraday_day_cacheable(data['dt']):
+                self.quotes_cache.put(self._source_intraday_cache_key(data['tckr'], data['dt']), data['ohlc'])
+            yield data
+
+    def _source_intraday_get_series_many(self, tckr_ranges, **kwargs):
+        """
+        Returns raw series dataframes for many tickers from intraday mongo data base
+        Day-blobs are fetched by one cursor and decompressed in the thread pool while cursor is iterated
+        :param tckr_ranges: dict of {tckr: (date_start, date_end)}
+        :param kwargs: db_get_raw_series_many kwargs
+        :return: dict of {tckr: (pandas DataFrame, QTYPE)}
+        """
+        if len(tckr_ranges) == 0:
+            return {}
+
+        # Tickers without dates filter are requested via single '$in' clause
+        tckr_no_filter = []
+        or_clauses = []
+        for tckr, (date_start, date_end) in tckr_ranges.items():
+            dt_filter = self._source_intraday_dt_filter(date_start, date_end)
+            if len(dt_filter) > 0:
+                or_clauses.append({'tckr': tckr, 'dt': dt_filter})
+            else:
+                tckr_no_filter.append(tckr)
+
+        if len(tckr_no_filter) > 0:
+            or_clauses.append({'tckr': {'$in': tckr_no_filter}})
+
+        if len(or_clauses) == 1:
+            request = or_clauses[0]
+        else:
+            request = {'$or': or_clauses}
+
+        day_blobs = {}
+        with ThreadPoolExecutor(max_workers=self.bulk_decompress_workers) as pool:
+            for data in self._source_intraday_find(request, batch_size=self.bulk_batch_size):
+                day_blobs.setdefault(data['tckr'], []).append(
+                    (data['dt'], pool.submit(object_load_decompress, data['ohlc']))
+                )
+
+            result = {}
+            for tckr, blobs in day_blobs.items():
+                # Keep day-blobs in chronological order, because the cursor has no sorting
+                blobs.sort(key=lambda x: x[0])
+
+                dframes_list = []
+                for dt, future in blobs:
+                    df = future.result()
+                    if not isinstance(df, pd.DataFrame):
+                        raise DBDataCorruptionError(
+                            f"{tckr} data is corrupted in {SRC_INTRADAY} collection at {dt}, "
+                            f"expected pd.DataFrame, got {type(df)}")
+                    dframes_list.append(df)
+
+                result[tckr] = (pd.concat(dframes_list), QTYPE_INTRADAY)
+
+        return result
+
+    def _source_options_eod_find_one(self, tckr):
+        """
+        Fetch options EOD record, uses quotes disk cache if enabled
+        (cache entries expire after 'quotes_cache_options_eod_max_age' seconds, because the DB data is updated daily)
+        :param tckr: full qualified ticker name
+        :return: {'_id': tckr, 'data': compressed blob} or None if not found
+        """
+        if self.quotes_cache is None:
+            return self.db[SRC_OPTIONS_EOD].find_one({'_id': tckr})
+
+        cache_key = f"{SRC_OPTIONS_EOD}/{tckr}"
+        blob = self.quotes_cache.get(cache_key, max_age=self.quotes_cache_options_eod_max_age)
+        if blob is not None:
+            return {'_id': tckr, 'data': blob}
 
-    def _source_options_eod_get_series(self, tckr, **kwargs):
         data = self.db[SRC_OPTIONS_EOD].find_one({'_id': tckr})
+        if data is not None:
+            self.quotes_cache.put(cache_key, data['data'])
+        return data
+
+    def _source_options_eod_get_series(self, tckr, **kwargs):
+        data = self._source_options_eod_find_one(tckr)
         if data is None:
             raise OptionsEODQuotesNotFoundError(f"No data found for {tckr} in options EOD database")
 
@@ -218,6 +445,57 @@ class DataEngineMongo(DataEngineBase):
 
         return data['data'], QTYPE_OPTIONS_EOD
 
+    def _source_options_eod_find_many(self, tckr_list):
+        """
+        Iterate options EOD records for many tickers by single '$in' request, uses quotes disk cache if enabled
+        :param tckr_list: list of full qualified ticker names
+        :return: generator of {'_id': tckr, 'data': compressed blob} records (missing tickers are skipped)
+        """
+        missing = []
+        for tckr in tckr_list:
+            blob = None
+            if self.quotes_cache is not None:
+                blob = self.quotes_cache.get(f"{SRC_OPTIONS_EOD}/{tckr}", max_age=self.quotes_cache_options_eod_max_age)
+
+            if blob is None:
+                missing.append(tckr)
+            else:
+                yield {'_id': tckr, 'data': blob}
+
+        if len(missing) == 0:
+            return
+
+        for data in self.db[SRC_OPTIONS_EOD].find({'_id': {'$in': missing}}, batch_size=self.bulk_batch_size):
+            if self.quotes_cache is not None:
+                self.quotes_cache.put(f"{SRC_OPTIONS_EOD}/{data['_id']}", data['data'])
+            yield data
+
+    def _source_options_eod_get_series_many(self, tckr_ranges, **kwargs):
+        """
+        Returns options EOD dataframes for many tickers (i.e. all strikes of the option chain) by single DB request
+        Options EOD records are not filtered by dates, the whole series is returned (as in db_get_raw_series())
+        :param tckr_ranges: dict of {tckr: (date_start, date_end)} or list of tickers
+        :param kwargs: db_get_raw_series_many kwargs
+        :return: dict of {tckr: (pandas DataFrame, QTYPE)}
+        """
+        if len(tckr_ranges) == 0:
+            return {}
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.bulk_decompress_workers) as pool:
+            for data in self._source_options_eod_find_many(list(tckr_ranges)):
+                futures[data['_id']] = pool.submit(object_load_decompress, data['data'])
+
+            result = {}
+            for tckr, future in futures.items():
+                df = future.result()
+                if not isinstance(df, pd.DataFrame):
+                    raise DBDataCorruptionError(
+                        f"{tckr} data is corrupted in {SRC_OPTIONS_EOD} collection, expected pd.DataFrame, got {type(df)}")
+                result[tckr] = (df, QTYPE_OPTIONS_EOD)
+
+        return result
+
     def db_save_index(self, index_data):
         """
         Saves index data to the MongoDB
@@ -264,10 +542,298 @@ class DataEngineMongo(DataEngineBase):
         :param market: market name
         :return: Pandas.Series
         """
+        return self._refdata_get(REFDATA_RFR_SERIES, market, lambda: self._db_get_rfr_series(market))
+
+    def _db_get_rfr_series(self, market):
         rfr = self.db[COLLECTION_RFR].find_one({'market': market})
         if rfr is None:
             raise DataEngineNotFoundError(f"RiskFreeRate series is not found in the DB for the '{market}' market")
         return object_load_decompress(rfr['rfr_series'])
 
 
+class DataEngineColumnar(DataEngineBase):
+    """
+    This class implements low-level data fetching from the local columnar quotes store.
+
+    Every ticker's quotes are stored as separate memory-mapped NumPy arrays:
+        <data_dir>/<source_type>/<tckr>/index.npy - int64 UTC epoch seconds
+        <data_dir>/<source_type>/<tckr>/<column>.npy - float64 column values
+        <data_dir>/<source_type>/<tckr>/meta.json - columns list and index timezone
+    Reference data (instrument info, contracts info, chains, RFR) are stored as compressed docs in <data_dir>/docs
+
+    The store is populated from any other data engine (i.e. DataEngineMongo) by export_instrument()/export_series()
+    """
 
+    def __init__(self, **kwargs):
+        """
+        Initialize columnar data engine
+        :param kwargs:
+            - 'data_dir' - path to the columnar quotes store (required)
+        """
+        super().__init__(**kwargs)
+        self.data_dir = kwargs.get('data_dir', None)
+        if self.data_dir is None:
+            raise ArgumentError("'data_dir' kwarg is not set")
+
+    @property
+    def engine_id(self):
+        return f"{type(self).__name__}:{os.path.abspath(self.data_dir)}"
+
+    #
+    # Storage helpers
+    #
+    def _series_path(self, tckr, source_type):
+        if source_type not in (SRC_INTRADAY, SRC_OPTIONS_EOD):
+            raise DataSourceNotFoundError("Unknown 'datasource' type")
+        return os.path.join(self.data_dir, source_type, tckr)
+
+    def _doc_path(self, collection, key):
+        return os.path.join(self.data_dir, 'docs', collection, key)
+
+    def _doc_load(self, collection, key):
+        """
+        Load reference data doc
+        :return: doc or None if not found
+        """
+        try:
+            with open(self._doc_path(collection, key), 'rb') as fh:
+                return object_load_decompress(fh.read())
+        except FileNotFoundError:
+            return None
+
+    def _doc_save(self, collection, key, doc):
+        path = self._doc_path(collection, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(object_save_compress(doc))
+
+    def _series_load(self, tckr, source_type):
+        """
+        Load memory-mapped ticker arrays
+        :return: (meta dict, index array, dict of column arrays) or None if not found
+        """
+        path = self._series_path(tckr, source_type)
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r') as fh:
+                meta = json.load(fh)
+        except FileNotFoundError:
+            return None
+
+        index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        columns = {c: np.load(os.path.join(path, f'{c}.npy'), mmap_mode='r') for c in meta['columns']}
+        return meta, index, columns
+
+    @staticmethod
+    def _series_to_dataframe(meta, index, columns, i_start, i_end):
+        dt_index = pd.DatetimeIndex(np.asarray(index[i_start:i_end], dtype=np.int64) * 10 ** 9)
+        if meta['tz'] is not None:
+            dt_index = dt_index.tz_localize('UTC').tz_convert(meta['tz'])
+
+        return pd.DataFrame({c: np.asarray(arr[i_start:i_end]) for c, arr in columns.items()},
+                            index=dt_index, columns=meta['columns'])
+
+    def db_write_series(self, tckr, source_type, df):
+        """
+        Write ticker quotes to the columnar store (existing quotes are overwritten)
+        :param tckr: full qualified ticker
+        :param source_type: datasource type
+        :param df: quotes pd.DataFrame with DatetimeIndex and numeric columns
+        :return:
+        """
+        if not isinstance(df, pd.DataFrame) or not isinstance(df.index, pd.DatetimeIndex):
+            raise ArgumentError("'df' must be pd.DataFrame with pd.DatetimeIndex")
+
+        path = self._series_path(tckr, source_type)
+        os.makedirs(path, exist_ok=True)
+
+        df = df.sort_index()
+        tz = None
+        if df.index.tz is not None:
+            tz = str(df.index.tz)
+            dt_index = df.index.tz_convert('UTC')
+        else:
+            dt_index = df.index
+
+        np.save(os.path.join(path, 'index.npy'), dt_index.asi8 // 10 ** 9)
+        for c in df.columns:
+            np.save(os.path.join(path, f'{c}.npy'), np.asarray(df[c], dtype=np.float64))
+
+        # Meta file is written last, it marks ticker data as complete
+        with open(os.path.join(path, 'meta.json'), 'w') as fh:
+            json.dump({'columns': [str(c) for c in df.columns], 'tz': tz}, fh)
+
+    #
+    # Data engine interface
+    #
+    def db_get_raw_series(self, tckr, source_type, **kwargs):
+        """
+        Fetch raw series from the columnar store
+        :param tckr: full qualified ticker
+        :param source_type: datasource type
+        :param kwargs:
+            - 'date_start' - start date (SRC_INTRADAY only)
+            - 'date_end' - end date, inclusive (SRC_INTRADAY only)
+        :return: (tuple) pandas DataFrame, QTYPE
+        """
+        data = self._series_load(tckr, source_type)
+
+        if source_type == SRC_INTRADAY:
+            date_start = kwargs.get('date_start', None)
+            date_end = kwargs.get('date_end', None)
+            if data is None:
+                raise IntradayQuotesNotFoundError(f"No data found for {tckr} in period {date_start}-{date_end}")
+
+            meta, index, columns = data
+            i_start, i_end = 0, len(index)
+            if date_start is not None:
+                i_start = np.searchsorted(index, self._date_to_epoch(date_start), side='left')
+            if date_end is not None:
+                # Whole day of date_end is included (like intraday day-blobs in the Mongo)
+                i_end = np.searchsorted(index, self._date_to_epoch(date_end) + 24 * 3600, side='left')
+
+            if i_start >= i_end:
+                raise IntradayQuotesNotFoundError(f"No data found for {tckr} in period {date_start}-{date_end}")
+
+            return self._series_to_dataframe(meta, index, columns, i_start, i_end), QTYPE_INTRADAY
+
+        # SRC_OPTIONS_EOD
+        if data is None:
+            raise OptionsEODQuotesNotFoundError(f"No data found for {tckr} in options EOD database")
+        meta, index, columns = data
+        return self._series_to_dataframe(meta, index, columns, 0, len(index)), QTYPE_OPTIONS_EOD
+
+    def db_get_raw_series_many(self, tckr_ranges, source_type, **kwargs):
+        """
+        Fetch raw series for many tickers at once
+        :param tckr_ranges: dict of {tckr: (date_start, date_end)}, date_start or date_end could be None
+        :param source_type: datasource type
+        :param kwargs: db_get_raw_series kwargs
+        :return: dict of {tckr: (pandas DataFrame, QTYPE)}, tickers without data are not included
+        """
+        result = {}
+        for tckr, (date_start, date_end) in tckr_ranges.items():
+            try:
+                result[tckr] = self.db_get_raw_series(tckr, source_type, date_start=date_start, date_end=date_end)
+            except QuoteNotFoundError:
+                continue
+        return result
+
+    @staticmethod
+    def _date_to_epoch(d):
+        return int((datetime.combine(d, time(0, 0, 0)) - datetime(1970, 1, 1)).total_seconds())
+
+    def db_get_last_quote_date(self, tckr, source_type, **kwargs):
+        data = self._series_load(tckr, source_type)
+        if data is None or len(data[1]) == 0:
+            if source_type == SRC_INTRADAY:
+                raise IntradayQuotesNotFoundError(f"No data found for {tckr}")
+            raise OptionsEODQuotesNotFoundError(f"No data found for {tckr} in options EOD database")
+
+        meta, index, columns = data
+        return self._series_to_dataframe(meta, index, {}, len(index) - 1, len(index)).index[-1]
+
+    def db_get_option_chains(self, underlying_tckr):
+        """
+        Fetch options chains (all expirations and strikes) for given underlying_tckr
+        :param underlying_tckr: option's underlying contract tckr code (for example: future tckr code)
+        :return: list of options aggregated chains (the same format as DataEngineMongo)
+        """
+        chains = self._doc_load('option_chains', underlying_tckr)
+        if chains is None:
+            return []
+        return chains
+
+    def db_get_futures_chain(self, instrument, date_start=None):
+        """
+        Fetch futures chain for particular instrument
+        :param instrument: Full-qualified instrument name <Market>.<Name>
+        :param date_start: Starting date of chain
+        :return: List of futures' full-qualified ticker names
+        """
+        chain = self._doc_load('futures_chains', instrument)
+        if chain is None:
+            return []
+        return [{'tckr': x['tckr']} for x in chain if date_start is None or x['exp'] > date_start]
+
+    def db_get_instrument_info(self, instrument):
+        toks = instrument.split('.')
+        if len(toks) != 2:
+            raise ArgumentError("Instrument name must be <MARKET>.<INSTRUMENT>")
+
+        ainfo = self._doc_load(COLLECTION_ASSET_INFO, instrument)
+        if ainfo is None:
+            raise DataEngineNotFoundError(f"Instrument info for {instrument} not found in the columnar store")
+        return ainfo
+
+    def db_get_contract_info(self, tckr):
+        cinfo = self._doc_load(COLLECTION_ASSET_INDEX, tckr)
+        if cinfo is None:
+            raise DataEngineNotFoundError("Contract info for {0} not found".format(tckr))
+        return cinfo
+
+    def db_get_rfr_series(self, market):
+        rfr = self._doc_load(COLLECTION_RFR, market)
+        if rfr is None:
+            raise DataEngineNotFoundError(f"RiskFreeRate series is not found in the DB for the '{market}' market")
+        return rfr
+
+    #
+    # Export from other data engines
+    #
+    def export_series(self, data_engine, tckr, source_type):
+        """
+        Copy full history of ticker quotes from other data engine
+        :param data_engine: source data engine instance (i.e. DataEngineMongo)
+        :param tckr: full qualified ticker
+        :param source_type: datasource type
+        :return: True if quotes exported, False if source has no quotes
+        """
+        try:
+            df, qtype = data_engine.db_get_raw_series(tckr, source_type)
+        except QuoteNotFoundError:
+            return False
+
+        self.db_write_series(tckr, source_type, df)
+        return True
+
+    def export_instrument(self, data_engine, instrument, date_start=None, export_options=True):
+        """
+        Copy instrument's reference data, futures and options quotes from other data engine
+        :param data_engine: source data engine instance (i.e. DataEngineMongo)
+        :param instrument: Full-qualified instrument name <Market>.<Name>
+        :param date_start: export contracts expired after this date (None - all contracts)
+        :param export_options: export futures options chains and EOD quotes
+        :return:
+        """
+        ainfo = data_engine.db_get_instrument_info(instrument)
+        self._doc_save(COLLECTION_ASSET_INFO, instrument, ainfo)
+
+        market = instrument.split('.')[0]
+        try:
+            self._doc_save(COLLECTION_RFR, market, data_engine.db_get_rfr_series(market))
+        except DataEngineNotFoundError:
+            log.warn(f"DataEngineColumnar export: RFR series is not found for '{market}'")
+
+        futures_chain = []
+        for fut in data_engine.db_get_futures_chain(instrument, date_start):
+            fut_info = data_engine.db_get_contract_info(fut['tckr'])
+            self._doc_save(COLLECTION_ASSET_INDEX, fut['tckr'], fut_info)
+            futures_chain.append({'tckr': fut['tckr'], 'exp': fut_info['exp']})
+
+            if not self.export_series(data_engine, fut['tckr'], SRC_INTRADAY):
+                log.warn(f"DataEngineColumnar export: no intraday quotes for {fut['tckr']}")
+
+            if not export_options:
+                continue
+
+            option_chains = data_engine.db_get_option_chains(fut['tckr'])
+            self._doc_save('option_chains', fut['tckr'], option_chains)
+            for exp in option_chains:
+                for opt in exp['chain']:
+                    self._doc_save(COLLECTION_ASSET_INDEX, opt['tckr'], data_engine.db_get_contract_info(opt['tckr']))
+                    self.export_series(data_engine, opt['tckr'], SRC_OPTIONS_EOD)
+
+        # Older chains are not overwritten by partial exports with 'date_start'
+        chain_docs = {x['tckr']: x for x in (self._doc_load('futures_chains', instrument) or [])}
+        chain_docs.update({x['tckr']: x for x in futures_chain})
+        self._doc_save('futures_chains', instrument, sorted(chain_docs.values(), key=lambda x: x['exp']))
@@ -3,19 +3,23 @@ import pytz
 import pyximport
 
 from tmqr.settings import *
-from tmqrfeed.chains import FutureChain, OptionChainList
+from tmqrfeed.chains import FutureChain, OptionChainList, OptionChainRecord
 from tmqrfeed.contractinfo import ContractInfo
-from tmqrfeed.contracts import ContractBase, OptionContract
+from tmqrfeed.contracts import ContractBase
 from tmqrfeed.dataengines import DataEngineMongo
 from tmqrfeed.instrumentinfo import InstrumentInfo
+from tmqrfeed.cache import CacheManager
+from tmqrfeed.quotescache import IntradayPriceCache
 
 pyximport.install(setup_args={"include_dirs": np.get_include()})
-from tmqrfeed.fast_data_handling import find_quotes
-from tmqr.errors import ArgumentError, OptionsEODQuotesNotFoundError, ChainNotFoundError
+from tmqrfeed.fast_data_handling import find_quotes_arrays
+from tmqr.errors import ArgumentError, OptionsEODQuotesNotFoundError, ChainNotFoundError, QuoteNotFoundError, \
+    IntradayQuotesNotFoundError
+import weakref
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time, timedelta
 from tmqr.logs import log
-from bdateutil import relativedelta
 
 
 class DataFeed:
@@ -30,6 +34,11 @@ class DataFeed:
             - 'data_engine_cls' - class of low-level data engine (default: DataEngineMongo)
             - 'data_engine_settings' - kwargs passed to low-level data engine
             - 'date_start' - starting date of all quotes requests
+            - 'intraday_cache_max_size' - intraday prices cache size in bytes, None - disabled
+              (default: INTRADAY_PRICE_CACHE_MAX_SIZE)
+            - 'intraday_cache_chunk_days' - intraday prices cache chunk size in days
+              (default: INTRADAY_PRICE_CACHE_CHUNK_DAYS)
+            - 'cache_settings' - cache regions limits (default: CACHE_REGIONS), see tmqrfeed.cache.CacheManager
         """
         self.dm = kwargs.get('datamanager', None)
         # Initiating low-level data engine
@@ -42,12 +51,31 @@ class DataFeed:
         self.date_end = kwargs.get('date_end', QDATE_MAX)
 
         # Cache setup
-        self._cache_instrument_info = {}
-        self._cache_contract_info = {}
-        self._cache_futchain = {}
-        self._cache_opt_chain = {}
-        self._cache_price_data = {}
-        self._cache_riskfreerate = {}
+        self.cache = CacheManager(kwargs.get('cache_settings', CACHE_REGIONS))
+        """Cache regions of the datafeed (use self.cache.stats() to inspect)"""
+        self._cache_instrument_info = self.cache.region('instrument_info')
+        self._cache_contract_info = self.cache.region('contract_info')
+        self._cache_futchain = self.cache.region('futchain')
+        self._cache_opt_chain = self.cache.region('opt_chain')
+        self._cache_price_data = self.cache.region('price_data')
+        # Entries are (weakref(dfseries), arrays) tuples, dfseries is accounted (and held) in 'price_data' only
+        self._cache_options_iv = self.cache.region('options_iv',
+                                                   sizeof_func=lambda x: sum(a.nbytes for a in x[1]))
+        self._cache_riskfreerate = self.cache.region('riskfreerate')
+
+        # Intraday prices cache (used by get_raw_prices())
+        intraday_cache_max_size = kwargs.get('intraday_cache_max_size', INTRADAY_PRICE_CACHE_MAX_SIZE)
+        if intraday_cache_max_size is not None:
+            self._cache_intraday_prices = IntradayPriceCache(intraday_cache_max_size,
+                                                             kwargs.get('intraday_cache_chunk_days',
+                                                                        INTRADAY_PRICE_CACHE_CHUNK_DAYS))
+            self.cache.add_region(self._cache_intraday_prices.region)
+        else:
+            self._cache_intraday_prices = None
+
+        # Options EOD background prefetching (see prefetch_option_chain())
+        self._prefetch_executor = None
+        self._prefetch_pending = {}
 
     def get_instrument_info(self, instrument):
         """
@@ -55,13 +83,11 @@ class DataFeed:
         :param instrument: full qualified instrument name
         :return: AssetInfo class instance
         """
-        if instrument in self._cache_instrument_info:
-            # Use caching
-            return self._cache_instrument_info[instrument]
-        else:
+        ainfo = self._cache_instrument_info.get(instrument, None)
+        if ainfo is None:
             ainfo = InstrumentInfo(self.data_engine.db_get_instrument_info(instrument))
             self._cache_instrument_info[instrument] = ainfo
-            return ainfo
+        return ainfo
 
     def get_fut_chain(self, instrument, **kwargs) -> FutureChain:
         """
@@ -69,7 +95,8 @@ class DataFeed:
         :param instrument: Full-qualified instrument name <Market>.<Name>
         :return: FutureChain class instance
         """
-        if instrument not in self._cache_futchain:
+        fut_chain = self._cache_futchain.get(instrument, None)
+        if fut_chain is None:
             chain_dict = self.data_engine.db_get_futures_chain(instrument, self.date_start - timedelta(days=180))
             asset_info = self.get_instrument_info(instrument)
 
@@ -83,18 +110,20 @@ class DataFeed:
                                     **kwargs)
             self._cache_futchain[instrument] = fut_chain
 
-        return self._cache_futchain[instrument]
+        return fut_chain
 
     def _process_raw_options_chains(self, chain_list, underlying_asset: ContractBase):
         """
         Converting MongoDB option chains to OptionsChainList friendly format
         :param chain_list: result of data_engine.db_get_option_chains()
         :param underlying_asset: underlying asset instance
-        :return: OrderedDict[ expiration, OrderedDict[strike, CallPutTickers] ]
+        :return: OrderedDict[ expiration, OptionChainRecord ] (contracts are created on access)
         """
         chain_result = OrderedDict()
         for exp in chain_list:
-            options = chain_result.setdefault(exp['_id']['date'], OrderedDict())
+            strikes = []
+            call_tickers = []
+            put_tickers = []
 
             chain = exp['chain']
             for i, strike_rec in enumerate(chain):
@@ -111,10 +140,18 @@ class DataFeed:
                         call_idx = i - 1
                         put_idx = i
 
-                    options[strike] = (
-                        OptionContract(chain[call_idx]['tckr'], datamanager=self.dm, underlying=underlying_asset),
-                        OptionContract(chain[put_idx]['tckr'], datamanager=self.dm, underlying=underlying_asset)
-                    )
+                    if len(strikes) > 0 and strikes[-1] == strike:
+                        # Duplicated strike records, the last pair is used
+                        strikes.pop()
+                        call_tickers.pop()
+                        put_tickers.pop()
+
+                    strikes.append(strike)
+                    call_tickers.append(chain[call_idx]['tckr'])
+                    put_tickers.append(chain[put_idx]['tckr'])
+
+            chain_result[exp['_id']['date']] = OptionChainRecord(strikes, call_tickers, put_tickers,
+                                                                 underlying=underlying_asset, datamanager=self.dm)
         return chain_result
 
     def get_option_chains(self, underlying_asset: ContractBase):
@@ -123,7 +160,8 @@ class DataFeed:
         :param underlying_asset: underlying contract instance
         :return: OptionChainList object
         """
-        if underlying_asset not in self._cache_opt_chain:
+        opt_chain = self._cache_opt_chain.get(underlying_asset, None)
+        if opt_chain is None:
             chain_list = self.data_engine.db_get_option_chains(underlying_asset.ticker)
             if len(chain_list) == 0:
                 raise ChainNotFoundError(f"Couldn't find options chains in DB for {underlying_asset}")
@@ -132,7 +170,7 @@ class DataFeed:
             opt_chain = OptionChainList(chain_result, underlying=underlying_asset, datamanager=self.dm)
             self._cache_opt_chain[underlying_asset] = opt_chain
 
-        return self._cache_opt_chain[underlying_asset]
+        return opt_chain
 
     def get_contract_info(self, tckr) -> ContractInfo:
         """
@@ -141,12 +179,13 @@ class DataFeed:
         :return: ContractInfo class instance
         """
 
-        if tckr not in self._cache_contract_info:
+        cinfo = self._cache_contract_info.get(tckr, None)
+        if cinfo is None:
             # Populate cache if contract info not set
             cinfo = ContractInfo(self.data_engine.db_get_contract_info(tckr))
             self._cache_contract_info[tckr] = cinfo
 
-        return self._cache_contract_info[tckr]
+        return cinfo
 
     def get_raw_series(self, tckr, source_type, **kwargs):
         """
@@ -174,6 +213,35 @@ class DataFeed:
         else:
             raise NotImplementedError("Quote type is not implemented yet.")
 
+    def get_raw_series_many(self, tckr_ranges, source_type, **kwargs):
+        """
+        Fetch raw series for many assets from the datasource by single bulk request
+        :param tckr_ranges: dict of {tckr: (date_start, date_end)}
+        :param source_type: datasource type
+        :param kwargs:
+            - 'timezone' - pytz.timezone instance or (str) pytz timezone name
+            - Also dataengine.db_get_raw_series_many() **kwargs
+        :return: dict of {tckr: pd.DataFrame}, tickers without data are not included
+        """
+        tz = kwargs.get('timezone', None)
+        if type(tz) == str:
+            tz = pytz.timezone(tz)
+
+        series_dict = self.data_engine.db_get_raw_series_many(tckr_ranges, source_type, **kwargs)
+
+        result = {}
+        for tckr, (dfseries, qtype) in series_dict.items():
+            if qtype == QTYPE_INTRADAY:
+                if tz is not None:
+                    # Convert timezone of the dataframe (in place)
+                    dfseries.tz_convert(tz, copy=False)
+                result[tckr] = dfseries
+            elif qtype == QTYPE_OPTIONS_EOD:
+                result[tckr] = dfseries
+            else:
+                raise NotImplementedError("Quote type is not implemented yet.")
+        return result
+
     def get_last_quote_date(self, tckr, source_type, **kwargs):
         """
         Fetch last quote date from the DB and return datetime of the last quote
@@ -203,6 +271,132 @@ class DataFeed:
         return rfr_series
 
 
+    @staticmethod
+    def _intraday_price_arrays(dfseries):
+        """
+        Intraday series as arrays for find_quotes_arrays()
+        :param dfseries: intraday series with UTC index
+        :return: tuple (epochs, close) - np.int64 UTC epoch seconds of bars, np.float64 close prices
+        """
+        return dfseries.index.values.astype('datetime64[s]').view(np.int64), dfseries['c'].values.astype(np.float64)
+
+    @staticmethod
+    def _datetimes_to_epochs(dt_list):
+        """
+        Convert timezone aware datetimes list to np.int64 array of UTC epoch seconds
+        """
+        for t in dt_list:
+            if t.tzinfo is None:
+                raise ArgumentError("dt_list's dates must be timezone aware")
+        return np.array([t.timestamp() for t in dt_list], dtype=np.float64).astype(np.int64)
+
+    def _intraday_prices_lookup(self, epochs, close, dt_list):
+        prices, idx = find_quotes_arrays(epochs, close, self._datetimes_to_epochs(dt_list))
+
+        not_found = idx < 0
+        if not_found.any():
+            raise IntradayQuotesNotFoundError(f"Quote is not found at {dt_list[np.argmax(not_found)]}")
+        return prices.tolist()
+
+    def _intraday_cache_load(self, tckr, date_start, date_end):
+        dfseries, qtype = self.data_engine.db_get_raw_series(tckr, SRC_INTRADAY, date_start=date_start,
+                                                             date_end=date_end)
+        assert qtype == QTYPE_INTRADAY
+        assert dfseries.index.tz is pytz.UTC, 'Quotes data Pandas.DataFrame index expected to be in UTC timezone'
+        return self._intraday_price_arrays(dfseries)
+
+    def _get_intraday_arrays_cached(self, tckr, **kwargs):
+        """
+        Get intraday quotes arrays of the 'date_start'-'date_end' kwargs period from the intraday prices cache
+        (the period has the same meaning as the day-blobs filter of DataEngineMongo)
+        :return: tuple (epochs, close) or None if the cache is disabled or the period is not cacheable
+        """
+        date_start = kwargs.get('date_start', None)
+        date_end = kwargs.get('date_end', None)
+        if self._cache_intraday_prices is None or date_start is None or date_end is None:
+            return None
+
+        if isinstance(date_start, datetime):
+            date_start = date_start.date()
+        if isinstance(date_end, datetime):
+            date_end = date_end.date()
+
+        if not self._cache_intraday_prices.is_cacheable(date_end):
+            # The current day quotes are still updating
+            return None
+
+        epochs, close = self._cache_intraday_prices.get_window(tckr, date_start, date_end, self._intraday_cache_load)
+        if len(epochs) == 0:
+            raise IntradayQuotesNotFoundError(f"No data found for {tckr} in period {date_start}-{date_end}")
+        return epochs, close
+
+    def _options_eod_iv_arrays(self, tckr, dfseries):
+        """
+        Options EOD series as sorted arrays, cached per ticker (rebuilt if the cached DataFrame is changed)
+        :return: tuple (epochs, days, iv, iv_prev) - UTC epoch seconds, datetime64[D] dates, IVs and previous row IVs
+        """
+        cached = self._cache_options_iv.get(tckr, None)
+        if cached is not None and cached[0]() is dfseries:
+            return cached[1]
+
+        epochs = dfseries.index.values.astype('datetime64[s]').view(np.int64)
+        iv = dfseries['iv'].values.astype(np.float64)
+        iv_prev = np.empty_like(iv)
+        if len(iv) > 0:
+            iv_prev[0] = np.nan
+            iv_prev[1:] = iv[:-1]
+
+        arrays = (epochs, (epochs // 86400).astype('datetime64[D]'), iv, iv_prev)
+        self._cache_options_iv[tckr] = (weakref.ref(dfseries), arrays)
+        return arrays
+
+    def _options_eod_iv_lookup(self, tckr, dfseries, dt_list, data_options_use_prev_date):
+        """
+        Get options IVs at the end of days of 'dt_list' (EOD quotes are stamped at 23:59:59 UTC)
+        If some quote date is missing (data holes or holidays) the last known IV is used if the data is delayed
+        not more than 1 business day, otherwise OptionsEODQuotesNotFoundError is raised
+        :param tckr: option ticker
+        :param dfseries: options EOD raw series
+        :param dt_list: list of dates
+        :param data_options_use_prev_date: use IV of the previous quote date
+        :return: list of IVs
+        """
+        epochs, days, iv, iv_prev = self._options_eod_iv_arrays(tckr, dfseries)
+
+        target_days = np.array([d.date() for d in dt_list], dtype='datetime64[D]')
+        target_epochs = target_days.astype('datetime64[s]').view(np.int64) + 86399
+
+        # Index of the last quote at or before the target date
+        idx = np.searchsorted(epochs, target_epochs, side='right') - 1
+
+        not_found = idx < 0
+        if not_found.any():
+            raise OptionsEODQuotesNotFoundError(
+                f"Option {tckr} EOD quotes not found at {dt_list} (no data before: {dt_list[np.argmax(not_found)]})")
+
+        if np.all(epochs[idx] == target_epochs):
+            # All dates have quotes
+            return (iv_prev[idx] if data_options_use_prev_date else iv[idx]).tolist()
+
+        #
+        # Handling data holes or fridays
+        #
+        last_days = days[idx]
+        # The same as bdateutil.relativedelta(target, last_quote).bdays (weekend quote days are counted too)
+        bdays = np.busday_count(last_days, target_days) + ~np.is_busday(last_days)
+
+        stale = bdays > 1
+        if stale.any():
+            i = np.argmax(stale)
+            raise OptionsEODQuotesNotFoundError(
+                f"Option {tckr} EOD quotes data delay at {dt_list[i]} last DB date: {dfseries.index[idx[i]]}")
+
+        if data_options_use_prev_date:
+            # use previous date if requested date is last in the df index
+            return np.where(bdays == 0, iv_prev[idx], iv[idx]).tolist()
+        else:
+            return iv[idx].tolist()
+
     def get_raw_prices(self, tckr, source_type, dt_list, **kwargs):
         tz = kwargs.get('timezone', None)
         if tz is None:
@@ -210,6 +404,16 @@ class DataFeed:
 
         if type(tz) == str:
             tz = pytz.timezone(tz)
+        # Wait for the background prefetch of the 'tckr' (if any)
+        prefetch_future = self._prefetch_pending.pop(tckr, None)
+        if prefetch_future is not None:
+            prefetch_future.result()
+
+        if source_type == SRC_INTRADAY:
+            intraday_arrays = self._get_intraday_arrays_cached(tckr, **kwargs)
+            if intraday_arrays is not None:
+                return self._intraday_prices_lookup(*intraday_arrays, dt_list)
+
         # Trying to get cache
         dfseries, qtype = self._cache_price_data.get(tckr, (None, None))
         if dfseries is None:
@@ -218,57 +422,81 @@ class DataFeed:
             assert dfseries.index.tz is pytz.UTC, 'Quotes data Pandas.DataFrame index expected to be in UTC timezone'
 
         if qtype == QTYPE_INTRADAY:
-            # Convert timezone of the dataframe (in place)
-            dfseries.tz_convert(tz, copy=False)
-            quotes_tuple_arr = find_quotes(dfseries, dt_list)
-            return [px for dt, px in quotes_tuple_arr]
+            return self._intraday_prices_lookup(*self._intraday_price_arrays(dfseries), dt_list)
 
         elif qtype == QTYPE_OPTIONS_EOD:
             # IMPORTANT: make sure that caching raw data (before shifting, and changing)
             # And don't changing cached values
             self._cache_price_data[tckr] = (dfseries, qtype)
+            return self._options_eod_iv_lookup(tckr, dfseries, dt_list,
+                                               kwargs.get('data_options_use_prev_date', False))
 
-            data_options_use_prev_date = kwargs.get('data_options_use_prev_date', False)
-            df = dfseries
+        else:
+            raise NotImplementedError("Quote type is not implemented yet.")
 
+    def get_raw_prices_many(self, tckr_list, source_type, dt_list, **kwargs):
+        """
+        Get prices for many assets at the same dates (i.e. IVs for all strikes of the option chain)
+        :param tckr_list: list of full qualified tickers
+        :param source_type: datasource type
+        :param dt_list: list of price dates
+        :param kwargs: get_raw_prices() **kwargs
+        :return: dict of {tckr: prices list}, tickers without quotes are not included
+        """
+        if source_type == SRC_OPTIONS_EOD:
+            # Fetch all not cached options series by single DB request
+            self.prefetch_options_eod(tckr_list)
 
+        result = {}
+        for tckr in tckr_list:
             try:
-                if data_options_use_prev_date:
-                    df_shifted = df.shift(1)
-                    return [df_shifted.at[datetime.combine(d.date(), time(23, 59, 59)), 'iv'] for d in dt_list]
-                else:
-                    return [df.at[datetime.combine(d.date(), time(23, 59, 59)), 'iv'] for d in dt_list]
-            except KeyError:
-                #
-                # Handling data holes or fridays
-                #
-
-                px_list = []
-                for d in dt_list:
-                    _dt_tz = pytz.utc.localize(datetime.combine(d.date(), time(23, 59, 59)))
-                    df_data = df.ix[:_dt_tz].tail(2)
-
-                    # Raise error if dataframe is empty
-                    if len(df_data) == 0:
-                        raise OptionsEODQuotesNotFoundError(
-                            f"Option {tckr} EOD quotes not found at {dt_list} (no data before: {d})")
-
-                    # Raise error if data is delayed more than 0 business day
-                    bd_delta = relativedelta(_dt_tz, df_data.index[-1])
-
-                    assert bd_delta.bdays >= 0
-
-                    if bd_delta.bdays > 1:
-                        raise OptionsEODQuotesNotFoundError(
-                            f"Option {tckr} EOD quotes data delay at {d} last DB date: {df_data.index[-1]}")
-                    else:
-                        # bd_delta.bdays == 0
-                        if data_options_use_prev_date and bd_delta.bdays == 0:
-                            # use previous date if requested date is last in the df index
-                            px_list.append(df_data['iv'][-2])
-                        else:
-                            px_list.append(df_data['iv'][-1])
-                return px_list
+                result[tckr] = self.get_raw_prices(tckr, source_type, dt_list, **kwargs)
+            except QuoteNotFoundError:
+                pass
+        return result
 
-        else:
-            raise NotImplementedError("Quote type is not implemented yet.")
+    def prefetch_options_eod(self, tckr_list, background=False):
+        """
+        Fetch options EOD series for many tickers by single DB request and populate the price data cache
+        (already cached or pending tickers are skipped)
+        :param tckr_list: list of options full qualified tickers
+        :param background: fetch data in the background thread, get_raw_prices() waits for the pending tickers
+        :return: concurrent.futures.Future if background, otherwise None
+        """
+        tckr_list = [tckr for tckr in tckr_list
+                     if tckr not in self._cache_price_data and tckr not in self._prefetch_pending]
+        if len(tckr_list) == 0:
+            return None
+
+        if not background:
+            self._prefetch_options_eod_load(tckr_list)
+            return None
+
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(max_workers=1)
+
+        future = self._prefetch_executor.submit(self._prefetch_options_eod_load, tckr_list)
+        for tckr in tckr_list:
+            self._prefetch_pending[tckr] = future
+        return future
+
+    def _prefetch_options_eod_load(self, tckr_list):
+        try:
+            series_dict = self.data_engine.db_get_raw_series_many({tckr: (None, None) for tckr in tckr_list},
+                                                                  SRC_OPTIONS_EOD)
+            for tckr, (dfseries, qtype) in series_dict.items():
+                assert dfseries.index.tz is pytz.UTC, \
+                    'Quotes data Pandas.DataFrame index expected to be in UTC timezone'
+                self._cache_price_data.setdefault(tckr, (dfseries, qtype))
+        except Exception as exc:
+            # Prefetching is optimization only, get_raw_prices() will fetch the data by ticker
+            log.warn(f"Options EOD prefetching failed: {exc}")
+
+    def prefetch_option_chain(self, option_chain, background=False):
+        """
+        Fetch options EOD data for all calls and puts of the option chain by single DB request
+        :param option_chain: OptionChain instance
+        :param background: fetch data in the background thread (see prefetch_options_eod())
+        :return: concurrent.futures.Future if background, otherwise None
+        """
+        return self.prefetch_options_eod(option_chain.tickers, background=background)
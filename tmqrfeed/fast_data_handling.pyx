@@ -58,3 +58,21 @@ def find_quotes(df, timestamps_list):
                 # We have quotes, but couldn't find exact bar, just picking previous bar price
                 result.append((df.index[ts_idx-1], df['c'][ts_idx-1]))
     return result
+
+
+def find_quotes_arrays(np.ndarray[np.int64_t, ndim=1] epochs, np.ndarray[DTYPE_t, ndim=1] close, target_epochs):
+    """
+    Find quotes for the batch of timestamps using pre-extracted series arrays (find_quotes() alternative)
+    If there is no exact bar for the timestamp the previous bar price is used
+    :param epochs: sorted np.int64 array of bars timestamps (UTC epoch seconds)
+    :param close: np.float64 array of bars close prices
+    :param target_epochs: np.int64 array of timestamps (UTC epoch seconds)
+    :return: tuple (prices, indexes) - np.float64 prices and np.int64 matched bars indexes,
+             if quote is not found the price is NaN and the index is -1
+    """
+    cdef np.ndarray[np.int64_t, ndim=1] idx = np.searchsorted(epochs, np.asarray(target_epochs, dtype=np.int64),
+                                                              side='right') - 1
+    found = idx >= 0
+    prices = np.full(len(idx), np.nan)
+    prices[found] = close[idx[found]]
+    return prices, idx
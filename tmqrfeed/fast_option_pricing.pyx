@@ -1,62 +1,181 @@
 import cython
-from libc.math cimport exp, log, sqrt
+from libc.math cimport exp, log, sqrt, erfc
+import numpy as np
 
+# blackscholes_greeks() result tuple indexes
 GREEK_DELTA = 0
+GREEK_GAMMA = 1
+GREEK_VEGA = 2
+GREEK_THETA = 3
+GREEK_RHO = 4
 
-@cython.cdivision(True)
-cdef float cnd(float d):
-    cdef float a1 = 0.31938153
-    cdef float a2 = -0.356563782
-    cdef float a3 = 1.781477937
-    cdef float a4 = -1.821255978
-    cdef float a5 = 1.330274429
-    cdef float rsqrt2pi = 0.39894228040143267793994605993438
-    cdef float k = 1.0 / (1.0 + 0.2316419 * abs(d))
-    cdef float ret_val = (rsqrt2pi * exp(-0.5 * d * d) *
-                          (k * (a1 + k * (a2 + k * (a3 + k * (a4 + k * a5))))))
-    if d > 0:
-        return 1.0 - ret_val
-    else:
-        return ret_val
+cdef double RSQRT2PI = 0.39894228040143267793994605993438
+cdef double RSQRT2 = 0.70710678118654752440084436210485
 
-@cython.cdivision(True)
-def blackscholes(int iscall, float ulprice, float strike, float toexpiry, float riskfreerate, float iv):
-    cdef float  bsPrice = 0.0
-    cdef float d1
-    cdef float d2
-    if toexpiry <= 0:
-        # Calculate payoff at expiration
-        if iscall == 1:
-            return max(0.0, ulprice - strike)
-        else:
-            return max(0.0, strike - ulprice)
 
-    d1 = (log(ulprice / strike) + (riskfreerate + iv * iv / 2) * toexpiry) / (iv * sqrt(toexpiry))
-    d2 = d1 - iv * sqrt(toexpiry)
+cdef struct bs_result:
+    double price
+    double delta
+    double gamma
+    double vega
+    double theta
+    double rho
+
+
+cdef inline double cnd(double d) nogil:
+    """
+    Standard normal CDF (double precision)
+    """
+    return 0.5 * erfc(-d * RSQRT2)
+
+
+cdef inline double npdf(double d) nogil:
+    """
+    Standard normal PDF
+    """
+    return RSQRT2PI * exp(-0.5 * d * d)
 
-    if iscall == 1:
-        bsPrice = ulprice * cnd(d1) - strike * exp(-riskfreerate * toexpiry) * cnd(d2)
-    else:
-        bsPrice = strike * exp(-riskfreerate * toexpiry) * cnd(-d2) - ulprice * cnd(-d1)
-    return bsPrice
 
 @cython.cdivision(True)
-def blackscholes_greeks(int iscall, float ulprice, float strike, float toexpiry, float riskfreerate, float iv):
+cdef bs_result bs_calc(int iscall, double ulprice, double strike, double toexpiry, double riskfreerate,
+                       double iv) nogil:
+    """
+    Black-Scholes price and greeks calculated from shared d1/d2 intermediates
+    Vega is per 1.0 IV change, theta is per year, rho is per 1.0 risk free rate change
+    """
+    cdef bs_result r
+    cdef double d1, d2, sqrt_t, disc, pdf_d1
+
+    r.gamma = 0.0
+    r.vega = 0.0
+    r.theta = 0.0
+    r.rho = 0.0
+
     if toexpiry <= 0:
-        # Calculate greeks at expiration
+        # Calculate payoff and greeks at expiration
         if iscall == 1:
-            delta = 1.0 if ulprice > strike else 0.0
+            r.price = max(0.0, ulprice - strike)
+            r.delta = 1.0 if ulprice > strike else 0.0
         else:
-            delta = -1.0 if ulprice < strike else 0.0
-        return (delta,)
+            r.price = max(0.0, strike - ulprice)
+            r.delta = -1.0 if ulprice < strike else 0.0
+        return r
+
+    sqrt_t = sqrt(toexpiry)
+    d1 = (log(ulprice / strike) + (riskfreerate + iv * iv / 2) * toexpiry) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    disc = exp(-riskfreerate * toexpiry)
+    pdf_d1 = npdf(d1)
+
+    r.gamma = pdf_d1 / (ulprice * iv * sqrt_t)
+    r.vega = ulprice * pdf_d1 * sqrt_t
 
-    d1 = (log(ulprice / strike) + (riskfreerate + iv * iv / 2) * toexpiry) / (iv * sqrt(toexpiry))
-    d2 = d1 - iv * sqrt(toexpiry)
     if iscall == 1:
-        # Call greeks
-        call_delta = cnd(d1)
-        return (call_delta,)
+        r.price = ulprice * cnd(d1) - strike * disc * cnd(d2)
+        r.delta = cnd(d1)
+        r.theta = -ulprice * pdf_d1 * iv / (2 * sqrt_t) - riskfreerate * strike * disc * cnd(d2)
+        r.rho = strike * toexpiry * disc * cnd(d2)
     else:
-        # put greeks
-        put_delta = -cnd(-d1)
-        return (put_delta,)
+        r.price = strike * disc * cnd(-d2) - ulprice * cnd(-d1)
+        r.delta = -cnd(-d1)
+        r.theta = -ulprice * pdf_d1 * iv / (2 * sqrt_t) + riskfreerate * strike * disc * cnd(-d2)
+        r.rho = -strike * toexpiry * disc * cnd(-d2)
+
+    return r
+
+
+def blackscholes(int iscall, double ulprice, double strike, double toexpiry, double riskfreerate, double iv):
+    """
+    Black-Scholes option price
+    :return: option price
+    """
+    return bs_calc(iscall, ulprice, strike, toexpiry, riskfreerate, iv).price
+
+
+def blackscholes_greeks(int iscall, double ulprice, double strike, double toexpiry, double riskfreerate, double iv):
+    """
+    Black-Scholes option greeks
+    :return: tuple (delta, gamma, vega, theta, rho), use GREEK_* constants as indexes
+    """
+    cdef bs_result r = bs_calc(iscall, ulprice, strike, toexpiry, riskfreerate, iv)
+    return r.delta, r.gamma, r.vega, r.theta, r.rho
+
+
+def blackscholes_price_greeks(int iscall, double ulprice, double strike, double toexpiry, double riskfreerate,
+                              double iv):
+    """
+    Black-Scholes option price and greeks in one call
+    :return: tuple (price, delta, gamma, vega, theta, rho)
+    """
+    cdef bs_result r = bs_calc(iscall, ulprice, strike, toexpiry, riskfreerate, iv)
+    return r.price, r.delta, r.gamma, r.vega, r.theta, r.rho
+
+
+#
+# Array versions of the pricing kernels
+#
+def _as_arrays(iscall, ulprice, strike, toexpiry, riskfreerate, iv):
+    """
+    Broadcast pricing arguments to the contiguous arrays of the same length (scalars are allowed)
+    """
+    arrays = np.broadcast_arrays(np.atleast_1d(np.asarray(iscall, dtype=np.int64)),
+                                 *[np.atleast_1d(np.asarray(x, dtype=np.float64))
+                                   for x in (ulprice, strike, toexpiry, riskfreerate, iv)])
+    return [np.ascontiguousarray(a) for a in arrays]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def blackscholes_price_greeks_array(iscall, ulprice, strike, toexpiry, riskfreerate, iv):
+    """
+    Black-Scholes prices and greeks for arrays of options
+    :param iscall: array of 1 - call / 0 - put flags
+    :param ulprice: array of underlying prices
+    :param strike: array of strikes
+    :param toexpiry: array of years to expiration
+    :param riskfreerate: array of risk free rates
+    :param iv: array of implied volatilities
+    :return: tuple of np.float64 arrays (price, delta, gamma, vega, theta, rho),
+             vega is per 1.0 IV change, theta is per year, rho is per 1.0 risk free rate change
+    """
+    _iscall, _ulprice, _strike, _toexpiry, _rfr, _iv = _as_arrays(iscall, ulprice, strike, toexpiry, riskfreerate, iv)
+    cdef long long[:] c_iscall = _iscall
+    cdef double[:] c_ulprice = _ulprice
+    cdef double[:] c_strike = _strike
+    cdef double[:] c_toexpiry = _toexpiry
+    cdef double[:] c_rfr = _rfr
+    cdef double[:] c_iv = _iv
+
+    cdef Py_ssize_t n = len(_ulprice)
+    result = np.empty((6, n), dtype=np.float64)
+    cdef double[:, :] c_result = result
+
+    cdef Py_ssize_t i
+    cdef bs_result r
+    with nogil:
+        for i in range(n):
+            r = bs_calc(<int>c_iscall[i], c_ulprice[i], c_strike[i], c_toexpiry[i], c_rfr[i], c_iv[i])
+            c_result[0, i] = r.price
+            c_result[1, i] = r.delta
+            c_result[2, i] = r.gamma
+            c_result[3, i] = r.vega
+            c_result[4, i] = r.theta
+            c_result[5, i] = r.rho
+
+    return tuple(result)
+
+
+def blackscholes_array(iscall, ulprice, strike, toexpiry, riskfreerate, iv):
+    """
+    Black-Scholes option prices for arrays of options (see blackscholes_price_greeks_array())
+    :return: np.float64 array of option prices
+    """
+    return blackscholes_price_greeks_array(iscall, ulprice, strike, toexpiry, riskfreerate, iv)[0]
+
+
+def blackscholes_greeks_array(iscall, ulprice, strike, toexpiry, riskfreerate, iv):
+    """
+    Black-Scholes greeks for arrays of options (see blackscholes_price_greeks_array())
+    :return: tuple of np.float64 arrays (delta, gamma, vega, theta, rho)
+    """
+    return blackscholes_price_greeks_array(iscall, ulprice, strike, toexpiry, riskfreerate, iv)[1:]
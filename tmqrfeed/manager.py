@@ -2,10 +2,13 @@ from tmqr.errors import *
 from tmqrfeed.contracts import ContractBase, FutureContract
 from tmqrfeed.datafeed import DataFeed
 from datetime import datetime
-from tmqr.settings import QDATE_MIN, QDATE_MAX
+from tmqr.settings import QDATE_MIN, QDATE_MAX, CACHE_REGIONS
+from tmqrfeed.cache import CacheManager
 from tmqrfeed.costs import Costs
 from tmqr.logs import log
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from typing import Dict, List, Tuple
 from tmqrfeed import Position
 from tmqrfeed.chains import FutureChain, OptionChain, OptionChainList
@@ -37,6 +40,9 @@ class DataManager:
 
         :param kwargs:
             * 'datafeed' - low-level datafeed class instance (by default: DataFeed)
+            * 'cache_settings' - cache regions limits of DataManager and DataFeed (see tmqrfeed.cache.CacheManager)
+            * 'options_prefetch' - fetch options EOD data of the whole chain returned by chains_options_get()
+                                   by single DB request: None - disabled (default), 'sync', 'background'
         """
         # Initiate low-level datafeed
         feed = kwargs.get('datafeed', None)
@@ -55,20 +61,31 @@ class DataManager:
         # Quotes range settings
         self._quotes_range_start = None
         self._quotes_range_end = None
+        # Active quotes range views {series_key: (source quotes, start offset, end offset, quotes slice)},
+        # invalidated by quotes_range_set()
+        self._quotes_range_views = {}
 
         # Primary series positions
         self._primary_positions = None
         # Secondary series positions dictionary
         self._secondary_positions = {}
 
-        # Internal price cache for getting single quotes
-        self._cache_single_price = {}
+        # Cache regions (limits are set by 'cache_settings' kwarg, default: CACHE_REGIONS)
+        self.cache = CacheManager(kwargs.get('cache_settings', CACHE_REGIONS))
 
+        # Internal price cache for getting single quotes {(asset, date): price_data}
+        self._cache_single_price = self.cache.region('single_price')
+
+        # Costs are user settings (not a cache), they are kept outside of the cache regions
         self._cache_costs = {}  # type: Dict[str, Costs]
 
         # Actual session
         self._session = None  # type: AssetSession
 
+        self.options_prefetch = kwargs.get('options_prefetch', None)
+        if self.options_prefetch not in (None, 'sync', 'background'):
+            raise ArgumentError(f"'options_prefetch' must be None, 'sync' or 'background', got {self.options_prefetch}")
+
     def instrument_info_get(self, instrument: str) -> InstrumentInfo:
         """
         Returns information about instrument
@@ -197,6 +214,20 @@ class DataManager:
                                      f"Try call datamanager.costs_set('market_name', costs_class_instance first.")
         return costs.calc_costs(asset, qty)
 
+    def costs_get_array(self, asset: ContractBase, qty) -> np.ndarray:
+        """
+        Calculate costs for many transactions of the same asset (see costs_get())
+
+        :param asset: ContractBase instance
+        :param qty: array of transactions qty
+        :return: np.ndarray of costs values in dollars
+        """
+        costs = self._cache_costs.get(asset.market, None)
+        if not costs:
+            raise CostsNotFoundError(f"Couldn't find costs settings for market '{asset.market}'."
+                                     f"Try call datamanager.costs_set('market_name', costs_class_instance first.")
+        return costs.calc_costs_array(asset, qty)
+
     def series_primary_set(self, quote_engine_cls, *args, **kwargs) -> None:
         """
         Fetch main series used for algorithm and strategy calculations
@@ -275,10 +306,40 @@ class DataManager:
 
         if self._quotes_range_start is not None or self._quotes_range_end is not None:
             # Apply quote range filters
-            result_series = result_series.ix[self._quotes_range_start:self._quotes_range_end]
+            result_series = self._quotes_range_view(series_key, result_series)[3]
 
         return result_series
 
+    def _quotes_range_view(self, series_key, quotes):
+        """
+        Get cached slice of the quotes by active quotes range
+        :param series_key: extra_series key or None
+        :param quotes: full quotes DataFrame of the series
+        :return: tuple (source quotes, start offset, end offset, quotes slice)
+        """
+        view = self._quotes_range_views.get(series_key, None)
+        if view is None or view[0] is not quotes:
+            # The same slicing as quotes.ix[range_start:range_end]
+            slc = quotes.index.slice_indexer(self._quotes_range_start, self._quotes_range_end)
+            start, end, _ = slc.indices(len(quotes))
+            view = (quotes, start, end, quotes.iloc[start:end])
+            self._quotes_range_views[series_key] = view
+        return view
+
+    def quotes_range_offsets(self, series_key: str = None) -> Tuple[int, int]:
+        """
+        Get integer offsets of the active quotes range, i.e. quotes(series_key) is quotes[start:end] of the full series
+
+        :param series_key: extra_series key, or if None - primary series
+        :return: tuple (start, end)
+        """
+        if self._quotes_range_start is None and self._quotes_range_end is None:
+            return 0, len(self.quotes(series_key))
+
+        self.quotes(series_key)
+        view = self._quotes_range_views[series_key]
+        return view[1], view[2]
+
     def quotes_range_set(self, range_start: datetime = None, range_end: datetime = None) -> None:
         """
         Set quotes date range returned by DataManager.quotes() method
@@ -298,6 +359,7 @@ class DataManager:
 
         self._quotes_range_start = range_start
         self._quotes_range_end = range_end
+        self._quotes_range_views = {}
 
     def quotes_range_get(self):
         """
@@ -374,6 +436,32 @@ class DataManager:
                                             date_end=kw_date_end
                                             )
 
+    def series_get_many(self, asset_ranges: List[Tuple[ContractBase, datetime, datetime]],
+                        **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Get raw series for many assets from the DB by bulk requests (one request per data source)
+
+        :param asset_ranges: list of tuples (asset, date_start, date_end)
+        :param kwargs: DataFeed get_raw_series_many() **kwargs
+        :return: dict of {asset.ticker: series DataFrame}, assets without data are not included
+        """
+        # use default session timezone
+        kw_timezone = self.session_get().tz
+
+        # Group requests by data source
+        source_requests = {}
+        for asset, date_start, date_end in asset_ranges:
+            kw_source_type = kwargs.get('source_type', asset.data_source)
+            tckr_ranges = source_requests.setdefault(kw_source_type, {})
+            tckr_ranges[asset.ticker] = (date_start, date_end)
+
+        result = {}
+        for source_type, tckr_ranges in source_requests.items():
+            result.update(self.datafeed.get_raw_series_many(tckr_ranges,
+                                                            source_type=source_type,
+                                                            timezone=kw_timezone))
+        return result
+
     def riskfreerate_get(self, asset: ContractBase, date: datetime) -> float:
         """
         Returns RFR for asset's market at 'date'
@@ -429,6 +517,59 @@ class DataManager:
 
         return res
 
+    def price_get_many(self, assets: List[ContractBase], date: datetime, **kwargs) -> List[Tuple[float, float]]:
+        """
+        Get prices at decision and execution time for many assets by single datafeed call per data source
+        (i.e. IVs for all strikes of the option chain)
+
+        :param assets: list of Contract class instances
+        :param date: timestamp for price
+        :return: list of tuples [decision_px, exec_px], (NaN, NaN) if quotes are not found for asset
+        """
+        result = [None] * len(assets)
+
+        # Group datafeed requests by data source and options previous date settings
+        feed_requests = OrderedDict()
+        for i, asset in enumerate(assets):
+            # Check if asset is expired
+            if asset.to_expiration_days(date) < 0:
+                raise AssetExpiredError(f"Trying to get price for already expired asset: {asset} at {date}")
+
+            res = self._price_get_positions_cached(asset, date)
+            if res[0] is None:
+                res = self._price_get_cached(asset, date)
+            if res[0] is not None:
+                result[i] = res
+                continue
+
+            kw_source_type = kwargs['source_type'] if 'source_type' in kwargs else asset.data_source
+            if 'data_options_use_prev_date' in kwargs:
+                kw_data_options_use_prev_date = kwargs['data_options_use_prev_date']
+            else:
+                kw_data_options_use_prev_date = asset.instrument_info.data_options_use_prev_date
+            feed_requests.setdefault((kw_source_type, kw_data_options_use_prev_date), []).append(i)
+
+        if len(feed_requests) > 0:
+            session = self.session_get()
+            sess_start_time, sess_decision_time, sess_execution_time, next_sess_date = session.get(date)
+
+            for (source_type, data_options_use_prev_date), asset_idx in feed_requests.items():
+                prices = self.datafeed.get_raw_prices_many([assets[i].ticker for i in asset_idx],
+                                                           source_type=source_type,
+                                                           dt_list=[sess_decision_time, sess_execution_time],
+                                                           timezone=session.tz,
+                                                           date_start=sess_decision_time,
+                                                           date_end=sess_execution_time,
+                                                           data_options_use_prev_date=data_options_use_prev_date
+                                                           )
+                for i in asset_idx:
+                    res = tuple(prices.get(assets[i].ticker, (float('nan'), float('nan'))))
+                    if not isnan(res[0]) and not isnan(res[1]):
+                        self._price_set_cached(assets[i], date, res)
+                    result[i] = res
+
+        return result
+
     def _price_get_positions_cached(self, asset: ContractBase, date: datetime):
 
         # Looking for primary positions
@@ -449,11 +590,9 @@ class DataManager:
         :return: 
         """
         if type(asset) == FutureContract or type(asset) == ContractBase:
-            price_data_dict = self._cache_single_price.get(asset, None)
-            if price_data_dict is not None:
-                price_data = price_data_dict.get(date, None)
-                if price_data is not None:
-                    return price_data
+            price_data = self._cache_single_price.get((asset, date), None)
+            if price_data is not None:
+                return price_data
         return None, None
 
     def _price_set_cached(self, asset: ContractBase, date, price_data):
@@ -465,8 +604,7 @@ class DataManager:
         :return: 
         """
         if type(asset) == FutureContract or type(asset) == ContractBase:
-            price_data_dict = self._cache_single_price.setdefault(asset, {})
-            price_data_dict[date] = price_data
+            self._cache_single_price[(asset, date)] = price_data
 
     def _price_get_from_datafeed(self, asset: ContractBase, date, **kwargs):
         """
@@ -547,6 +685,9 @@ class DataManager:
                 opt_chain_list = self.datafeed.get_option_chains(fut)
                 # Trying to find option with expiration by offset and days_to_exp > opt_min_days
                 option_chain = opt_chain_list.find(date, opt_offset, min_days=opt_min_days, opt_codes=opt_codes)
+                if self.options_prefetch is not None:
+                    self.datafeed.prefetch_option_chain(option_chain,
+                                                        background=self.options_prefetch == 'background')
                 return fut, option_chain
             except ChainNotFoundError as exc:
                 # Chain is not found, probably few days till expiration or no data
@@ -1,7 +1,9 @@
 from collections import OrderedDict
 from tmqr.errors import ArgumentError, PositionNotFoundError, PositionQuoteNotFoundError, PositionReadOnlyError, \
-    AssetExpiredError, QuoteNotFoundError
+    AssetExpiredError, QuoteNotFoundError, NotFoundError
 from tmqrfeed.contracts import ContractBase
+from tmqrfeed.fast_option_pricing import blackscholes_greeks_array
+from tmqrfeed.position_columnar import PositionColumnar, PNL_COLUMNS
 from tmqr.logs import log
 from tmqr.settings import QDATE_MIN
 import pandas as pd
@@ -12,12 +14,16 @@ import lz4
 from typing import Dict, Tuple, List
 from tmqr.serialization import object_save_compress, object_load_decompress
 import math
+import numpy as np
 
 # Position tuple constants
 iDPX = 0  # Decision price
 iEPX = 1  # Execution price
 iQTY = 2  # Qty
 
+# Position greeks columns
+GREEKS_COLUMNS = ['delta', 'gamma', 'vega', 'theta', 'rho']
+
 class Position:
     """
     Universal position management class for all types of strategies
@@ -38,6 +44,10 @@ class Position:
         self.dm = datamanager
         self.kwargs = kwargs
 
+        # PnL stats of the final dates (all dates before the last one, they can't be changed anymore),
+        # see get_pnl_series()
+        self._pnl_ledger = None  # type: pd.DataFrame
+
     #
     # Private methods
     #
@@ -106,6 +116,7 @@ class Position:
         res_dict = {
             'data': object_save_compress(result),
             'kwargs': self.kwargs,
+            'pnl_ledger': object_save_compress(self._pnl_ledger) if self._pnl_ledger is not None else None,
         }
 
         return res_dict
@@ -135,7 +146,10 @@ class Position:
             # TODO: check the position records for exec_time for online-index calculation (in online mode exec_px is unreliable)
             return PositionReadOnlyView(datamanager, result, **deserialized_kwargs)
         else:
-            return Position(datamanager, position_dict=result, **deserialized_kwargs)
+            pos = Position(datamanager, position_dict=result, **deserialized_kwargs)
+            if pos_data.get('pnl_ledger', None) is not None:
+                pos._pnl_ledger = object_load_decompress(pos_data['pnl_ledger'])
+            return pos
 
 
 
@@ -210,6 +224,94 @@ class Position:
 
         return delta_value
 
+    def _calc_greeks_arrays(self, dates: list) -> np.ndarray:
+        """
+        Calculate net position greeks for many dates by single vectorized pricing kernel call
+
+        :param dates: list of dates
+        :return: np.ndarray shape (len(dates), len(GREEKS_COLUMNS)), zeros if no position or quotes at date
+        """
+        result = np.zeros((len(dates), len(GREEKS_COLUMNS)))
+
+        # Option records
+        opt_date_idx = []
+        opt_qty = []
+        opt_iscall = []
+        opt_ulprice = []
+        opt_strike = []
+        opt_toexpiry = []
+        opt_rfr = []
+        opt_iv = []
+
+        for i, dt in enumerate(dates):
+            try:
+                net_position = self.get_net_position(dt)
+            except PositionNotFoundError:
+                continue
+
+            date_delta = 0.0
+            date_options = []
+            try:
+                for asset, pos_rec in net_position.items():
+                    if pos_rec[iQTY] == 0:
+                        continue
+
+                    if asset.ctype == 'P' or asset.ctype == 'C':
+                        # Decision time pricing context (the same as OptionContract.greeks())
+                        ctx_date, ul_decision_px, ul_exec_px, option_decision_iv, option_exec_iv, rfr = \
+                            asset.get_pricing_context(dt)
+                        date_options.append((pos_rec[iQTY], 1 if asset.ctype == 'C' else 0, ul_decision_px,
+                                             asset.strike,
+                                             asset.to_expiration_years_from_days(asset.to_expiration_days(dt)),
+                                             rfr, option_decision_iv))
+                    else:
+                        date_delta += asset.delta(dt) * pos_rec[iQTY]
+            except NotFoundError:
+                # Quotes are not available, skipping the whole date (the same as delta() failure)
+                continue
+
+            result[i, 0] = date_delta
+            for qty, iscall, ulprice, strike, toexpiry, rfr, iv in date_options:
+                opt_date_idx.append(i)
+                opt_qty.append(qty)
+                opt_iscall.append(iscall)
+                opt_ulprice.append(ulprice)
+                opt_strike.append(strike)
+                opt_toexpiry.append(toexpiry)
+                opt_rfr.append(rfr)
+                opt_iv.append(iv)
+
+        if len(opt_date_idx) > 0:
+            greeks = blackscholes_greeks_array(opt_iscall, opt_ulprice, opt_strike, opt_toexpiry, opt_rfr, opt_iv)
+            opt_qty = np.array(opt_qty, dtype=np.float64)
+            for g, greek_values in enumerate(greeks):
+                result[:, g] += np.bincount(opt_date_idx, weights=greek_values * opt_qty, minlength=len(dates))
+
+        return result
+
+    def get_greeks(self, date: datetime) -> Dict[str, float]:
+        """
+        Calculate net position greeks at the decision time
+
+        :param date: calculation date
+        :return: dict {'delta', 'gamma', 'vega', 'theta', 'rho'}, all zeros if no position or quotes at date
+        """
+        greeks = self._calc_greeks_arrays([date])[0]
+        return {name: greeks[i] for i, name in enumerate(GREEKS_COLUMNS)}
+
+    def get_greeks_series(self, dates=None) -> pd.DataFrame:
+        """
+        Calculate net position greeks for the date range (single vectorized pricing call for all dates and assets)
+
+        :param dates: list of dates or DatetimeIndex (default: all position dates)
+        :return: pandas.DataFrame with columns ['delta', 'gamma', 'vega', 'theta', 'rho'],
+                 zeros if no position or quotes at date
+        """
+        if dates is None:
+            dates = list(self._position.keys())
+
+        return pd.DataFrame(self._calc_greeks_arrays(list(dates)), index=dates, columns=GREEKS_COLUMNS)
+
     def last_transaction_date(self, date: datetime) -> datetime:
         """
         Returns the date when last transaction occurred
@@ -665,83 +767,80 @@ class Position:
             'costs': costs,
         }
 
-    def get_transaction_series(self) -> pd.DataFrame:
+    def _calc_transactions_columnar(self, dates=None):
         """
-        Calculates position transaction series
-        :return: pandas.DataFrame
+        Calculate transactions for all position dates by vectorized columnar engine
+        (the same as _calc_transactions() applied to every date, including closed records added to the position)
+
+        :param dates: calculate only for the range of position dates (default: all dates),
+                      the transactions of the first date are calculated as for the new position
+        :return: tuple (PositionColumnar, transactions arrays dict)
         """
-        result = []
-        prev_pos = None
-
-        for dt, pos_list in self._position.items():
-            transactions = self._calc_transactions(dt, pos_list, prev_pos)
-            """
-            transaction = Dict[ContractBase, Tuple[float, float, float, float, float, float]]
-            result[asset] = (decision_price, exec_price, -prev_values[iQTY],
-                                     pnl_decision + costs_value, pnl_execution + costs_value, costs_value)
-            """
-            for asset, asset_rec in transactions.items():
-                if asset_rec[2] == 0:
-                    # Skip zero-transactions (they are used only for PnL calculation)
-                    continue
+        if dates is None:
+            columnar = PositionColumnar.from_position_dict(self._position)
+        else:
+            columnar = PositionColumnar.from_position_dict(OrderedDict((dt, self._position[dt]) for dt in dates))
+        transactions, closed_records = columnar.calc_transactions(self.dm)
 
-                if asset.ctype in ('P', 'C'):
-                    tick_size = self.dm.instrument_info_get(asset.instrument).ticksize_options
-                else:
-                    tick_size = self.dm.instrument_info_get(asset.instrument).ticksize
+        for date, asset, pos_rec in closed_records:
+            # Add closed position record to store exit prices for it
+            # This will reduce future DB calls in case of Index's or Alpha's positions management
+            self._position[date][asset] = pos_rec
 
-                result.append({
-                    'dt': dt,
-                    'asset': asset,
-                    'decision_px': asset_rec[0],
-                    'execution_px': asset_rec[1],
-                    'qty': asset_rec[2],
-                    'costs': asset_rec[5],
-                    'pos_action': asset_rec[6],
-                    'execution_px_ticks': round(asset_rec[1] / tick_size),
-                })
-            prev_pos = pos_list
+        return columnar, transactions
 
-        return pd.DataFrame(result).set_index('dt')
+    def get_transaction_series(self) -> pd.DataFrame:
+        """
+        Calculates position transaction series
+        :return: pandas.DataFrame
+        """
+        columnar, transactions = self._calc_transactions_columnar()
+        return columnar.get_transaction_series(transactions, self.dm)
 
-    def get_pnl_series(self) -> pd.DataFrame:
+    def get_pnl_series(self, since: datetime = None) -> pd.DataFrame:
         """
         Calculates position PnL series for all transactions, also additional execution info provided
 
+        PnL of the dates before the last position date is stored in the position PnL ledger (which is also serialized),
+        so the next calls calculate only the new dates and the last one (its position could be still changed)
+
+        :param since: return only records at dates >= since (equity is accumulated from the beginning of the position)
         :return: pandas.DataFrame
         """
-        pnl_result = []
-        prev_pos = None
+        dates = list(self._position.keys())
+        if len(dates) == 0:
+            return pd.DataFrame([])
 
-        for dt, pos_list in self._position.items():
-            transactions = self._calc_transactions(dt, pos_list, prev_pos)
-            stats = self._transactions_stats(transactions)
-            """
-            Example:
-            stats = {
-            'pnl_change_decision': pnl_change_decision,
-            'pnl_change_execution': pnl_change_execution,
-            'ncontracts_executed': ncontracts_executed,
-            'noptions_executed': noptions_executed,
-            'ncontracts_trades': ncontracts_trades,
-            'noptions_trades': noptions_trades,
-            'costs': costs
-            }
-            """
-            res = {'dt': dt}
-            res.update(stats)
+        # Ledger is valid only if its dates are the same as position first dates
+        ledger = self._pnl_ledger
+        n_final = 0
+        if ledger is not None and 0 < len(ledger) < len(dates) and dates[len(ledger) - 1] == ledger.index[-1]:
+            n_final = len(ledger)
 
-            pnl_result.append(res)
-            prev_pos = pos_list
+        # Start from the last final date, to get the previous position record of the new dates
+        columnar, transactions = self._calc_transactions_columnar(dates[max(0, n_final - 1):])
+        df_new = columnar.get_pnl_series(transactions)[PNL_COLUMNS]
 
-        df_result = pd.DataFrame(pnl_result)
-        if len(df_result) > 0:
-            df_result.set_index('dt', inplace=True)
-            df_result['equity_decision'] = df_result['pnl_change_decision'].cumsum()
-            df_result['equity_execution'] = df_result['pnl_change_execution'].cumsum()
+        if n_final > 0:
+            df_result = pd.concat([ledger, df_new.iloc[1:]])
+        else:
+            df_result = df_new
+
+        self._pnl_ledger = df_result.iloc[:-1].copy()
+
+        df_result['equity_decision'] = df_result['pnl_change_decision'].cumsum()
+        df_result['equity_execution'] = df_result['pnl_change_execution'].cumsum()
 
+        if since is not None:
+            df_result = df_result[df_result.index >= since]
         return df_result
 
+    def reset_pnl_ledger(self):
+        """
+        Reset PnL ledger, next get_pnl_series() call will calculate all dates (i.e. after costs settings change)
+        """
+        self._pnl_ledger = None
+
     def __str__(self):
         return self.__repr__()
 
@@ -802,7 +901,7 @@ class PositionReadOnlyView(Position):
     def get_asset_price(self, date, asset):
         raise PositionQuoteNotFoundError(f'Operation is not allowed for PositionReadOnlyView instance')
 
-    def get_pnl_series(self):
+    def get_pnl_series(self, since=None):
         raise PositionReadOnlyError(f'Operation is not allowed for PositionReadOnlyView instance')
 
     def serialize(self):
@@ -0,0 +1,297 @@
+import numpy as np
+import pandas as pd
+
+from tmqr.errors import ArgumentError, AssetExpiredError, QuoteNotFoundError
+from tmqr.logs import log
+
+# Position.get_pnl_series() stats columns
+PNL_COLUMNS = ['costs', 'ncontracts_executed', 'ncontracts_trades', 'noptions_executed', 'noptions_trades',
+               'pnl_change_decision', 'pnl_change_execution']
+
+# Position.get_transaction_series() columns
+TRANSACTION_COLUMNS = ['asset', 'costs', 'decision_px', 'execution_px', 'execution_px_ticks', 'pos_action', 'qty']
+
+
+class PositionColumnar:
+    """
+    Columnar position storage: position records are stored as (date_idx, asset_idx, decision_px, exec_px, qty)
+    growable NumPy arrays with dates list and assets dictionary. Used for vectorized PnL, costs and transactions
+    calculations of the Position.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Init empty columnar position
+        :param capacity: initial records arrays capacity
+        """
+        self.dates = []
+        self.assets = []
+        self._assets_idx = {}
+
+        self._n = 0
+        capacity = max(1, capacity)
+        self._date_idx = np.empty(capacity, dtype=np.int64)
+        self._asset_idx = np.empty(capacity, dtype=np.int64)
+        self._dpx = np.empty(capacity, dtype=np.float64)
+        self._epx = np.empty(capacity, dtype=np.float64)
+        self._qty = np.empty(capacity, dtype=np.float64)
+
+    @classmethod
+    def from_position_dict(cls, position_dict):
+        """
+        Build columnar position from Position._position dict
+        :param position_dict: OrderedDict[date, Dict[ContractBase, Tuple(decision_px, exec_px, qty)]]
+        :return: PositionColumnar
+        """
+        date_idx = []
+        assets = []
+        pos_recs = []
+        for i, asset_dict in enumerate(position_dict.values()):
+            if len(asset_dict) > 0:
+                date_idx.extend([i] * len(asset_dict))
+                assets.extend(asset_dict.keys())
+                pos_recs.extend(asset_dict.values())
+
+        # Position dates are always in ascending order, all records are added at once
+        result = cls(capacity=len(assets))
+        result.dates = list(position_dict.keys())
+        result._add_records(date_idx, assets, pos_recs)
+        return result
+
+    def __len__(self):
+        return self._n
+
+    def _grow(self, n_required):
+        capacity = len(self._qty)
+        if n_required <= capacity:
+            return
+
+        new_capacity = max(n_required, capacity * 2)
+        for name in ('_date_idx', '_asset_idx', '_dpx', '_epx', '_qty'):
+            arr = getattr(self, name)
+            new_arr = np.empty(new_capacity, dtype=arr.dtype)
+            new_arr[:self._n] = arr[:self._n]
+            setattr(self, name, new_arr)
+
+    def asset_index(self, asset):
+        """
+        Get (or register) asset index in the assets dictionary
+        :param asset: ContractBase instance
+        :return: int index
+        """
+        idx = self._assets_idx.get(asset, None)
+        if idx is None:
+            idx = len(self.assets)
+            self.assets.append(asset)
+            self._assets_idx[asset] = idx
+        return idx
+
+    def _add_records(self, date_idx, assets, pos_recs):
+        n = len(assets)
+        if n == 0:
+            return
+        self._grow(self._n + n)
+
+        i_start, i_end = self._n, self._n + n
+        values = np.array(pos_recs, dtype=np.float64).reshape(n, 3)
+        self._date_idx[i_start:i_end] = date_idx
+        self._asset_idx[i_start:i_end] = [self.asset_index(a) for a in assets]
+        self._dpx[i_start:i_end] = values[:, 0]
+        self._epx[i_start:i_end] = values[:, 1]
+        self._qty[i_start:i_end] = values[:, 2]
+        self._n = i_end
+
+    def append(self, date, asset_dict):
+        """
+        Append position records at date, dates must be appended in ascending order
+        :param date: position date
+        :param asset_dict: Dict[ContractBase, Tuple(decision_px, exec_px, qty)]
+        :return:
+        """
+        if len(self.dates) > 0 and date <= self.dates[-1]:
+            raise ArgumentError(f"Position records must be appended in ascending dates order, got {date} after "
+                                f"{self.dates[-1]}")
+
+        self.dates.append(date)
+        self._add_records(len(self.dates) - 1, list(asset_dict.keys()), list(asset_dict.values()))
+
+    @staticmethod
+    def _find(sorted_keys, keys):
+        """
+        Indexes of 'keys' in 'sorted_keys' array, -1 if key is not found
+        """
+        if len(sorted_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        pos = np.searchsorted(sorted_keys, keys)
+        pos_valid = np.minimum(pos, len(sorted_keys) - 1)
+        return np.where((pos < len(sorted_keys)) & (sorted_keys[pos_valid] == keys), pos_valid, -1)
+
+    def _sorted_records(self):
+        """
+        Records sorted by (date_idx, asset_idx)
+        :return: tuple of arrays (keys, date_idx, asset_idx, decision_px, exec_px, qty)
+        """
+        n_assets = max(len(self.assets), 1)
+        n = self._n
+        keys = self._date_idx[:n] * n_assets + self._asset_idx[:n]
+        order = np.argsort(keys, kind='mergesort')
+        return (keys[order], self._date_idx[:n][order], self._asset_idx[:n][order],
+                self._dpx[:n][order], self._epx[:n][order], self._qty[:n][order])
+
+    def calc_transactions(self, dm):
+        """
+        Vectorized equivalent of Position._calc_transactions() for all dates of the position
+
+        Assets which are held at the previous date, but missing at the current one are closed at actual asset.price(),
+        closed records (decision_px, exec_px, 0.0) are added to the columnar position and also returned to keep
+        the exit prices in the Position.
+
+        :param dm: DataManager instance (used for costs calculation)
+        :return: tuple (transactions, closed_records)
+            transactions - dict of arrays {'date_idx', 'asset_idx', 'decision_px', 'exec_px', 'qty', 'pnl_decision',
+                          'pnl_execution', 'costs', 'pos_action'}, 'qty' is transaction qty, PnLs include costs
+            closed_records - list of (date, asset, (decision_px, exec_px, 0.0))
+        """
+        n_assets = max(len(self.assets), 1)
+
+        #
+        # Close assets missing at the next date
+        #
+        keys, date_idx, asset_idx, dpx, epx, qty = self._sorted_records()
+        has_next = self._find(keys, keys + n_assets) >= 0
+        closing = np.flatnonzero(~has_next & (date_idx < len(self.dates) - 1) & (qty != 0))
+
+        closed_records = []
+        closed_date_idx = []
+        for i in closing:
+            asset = self.assets[asset_idx[i]]
+            date = self.dates[date_idx[i] + 1]
+            try:
+                decision_price, exec_price = asset.price(date)
+            except AssetExpiredError as exc:
+                log.debug(f"Asset is not closed before expiration. Error: {exc}")
+                continue
+            except QuoteNotFoundError as exc:
+                log.debug(f"QuoteNotFoundError: {exc}")
+                continue
+
+            closed_records.append((date, asset, (decision_price, exec_price, 0.0)))
+            closed_date_idx.append(date_idx[i] + 1)
+
+        if len(closed_records) > 0:
+            self._add_records(closed_date_idx, [r[1] for r in closed_records], [r[2] for r in closed_records])
+            keys, date_idx, asset_idx, dpx, epx, qty = self._sorted_records()
+
+        #
+        # Transactions between previous and current date records
+        #
+        prev = self._find(keys, keys - n_assets)
+        has_prev = prev >= 0
+        prev = np.where(has_prev, prev, 0)
+        prev_qty = np.where(has_prev, qty[prev], 0.0)
+
+        trans_qty = qty - prev_qty
+        pos_action = np.where(has_prev, np.sign(np.abs(qty) - np.abs(prev_qty)), 1).astype(np.int64)
+
+        # Point values are required only for the assets with previous records (the same as ContractBase.dollar_pnl())
+        point_values = np.zeros(n_assets)
+        for a in np.unique(asset_idx[has_prev]):
+            point_values[a] = self.assets[a].point_value
+
+        pnl_decision = np.zeros(len(keys))
+        pnl_execution = np.zeros(len(keys))
+        if np.any(has_prev):
+            pv = point_values[asset_idx[has_prev]]
+            pnl_decision[has_prev] = (dpx[has_prev] - dpx[prev[has_prev]]) * prev_qty[has_prev] * pv
+            pnl_execution[has_prev] = (epx[has_prev] - epx[prev[has_prev]]) * prev_qty[has_prev] * pv
+
+        # Costs are calculated by single call per asset
+        costs = np.zeros(len(keys))
+        if len(keys) > 0:
+            asset_order = np.argsort(asset_idx, kind='mergesort')
+            for grp in np.split(asset_order, np.flatnonzero(np.diff(asset_idx[asset_order])) + 1):
+                costs[grp] = np.asarray(dm.costs_get_array(self.assets[asset_idx[grp[0]]], trans_qty[grp]),
+                                        dtype=np.float64)
+
+        transactions = {
+            'date_idx': date_idx,
+            'asset_idx': asset_idx,
+            'decision_px': dpx,
+            'exec_px': epx,
+            'qty': trans_qty,
+            'pnl_decision': pnl_decision + costs,
+            'pnl_execution': pnl_execution + costs,
+            'costs': costs,
+            'pos_action': pos_action,
+        }
+        return transactions, closed_records
+
+    def _is_option_array(self):
+        return np.array([a.ctype in ('P', 'C') for a in self.assets], dtype=bool)
+
+    def get_pnl_series(self, transactions) -> pd.DataFrame:
+        """
+        Position PnL series (see Position.get_pnl_series())
+        :param transactions: calc_transactions() result
+        :return: pandas.DataFrame
+        """
+        if len(self.dates) == 0:
+            return pd.DataFrame([])
+
+        date_idx = transactions['date_idx']
+        is_option = self._is_option_array()[transactions['asset_idx']] if len(date_idx) > 0 \
+            else np.zeros(0, dtype=bool)
+        abs_qty = np.abs(transactions['qty'])
+
+        def sum_by_date(values):
+            return np.bincount(date_idx, weights=values, minlength=len(self.dates))
+
+        df_result = pd.DataFrame({
+            'dt': self.dates,
+            'costs': sum_by_date(transactions['costs']),
+            'ncontracts_executed': sum_by_date(np.where(is_option, 0.0, abs_qty)),
+            'ncontracts_trades': sum_by_date((~is_option).astype(np.float64)),
+            'noptions_executed': sum_by_date(np.where(is_option, abs_qty, 0.0)),
+            'noptions_trades': sum_by_date(is_option.astype(np.float64)),
+            'pnl_change_decision': sum_by_date(transactions['pnl_decision']),
+            'pnl_change_execution': sum_by_date(transactions['pnl_execution']),
+        }, columns=['dt'] + PNL_COLUMNS)
+
+        df_result.set_index('dt', inplace=True)
+        df_result['equity_decision'] = df_result['pnl_change_decision'].cumsum()
+        df_result['equity_execution'] = df_result['pnl_change_execution'].cumsum()
+        return df_result
+
+    def get_transaction_series(self, transactions, dm) -> pd.DataFrame:
+        """
+        Position transactions series (see Position.get_transaction_series())
+        :param transactions: calc_transactions() result
+        :param dm: DataManager instance (used for ticks sizes)
+        :return: pandas.DataFrame
+        """
+        # Skip zero-transactions (they are used only for PnL calculation)
+        mask = transactions['qty'] != 0
+        date_idx = transactions['date_idx'][mask]
+        asset_idx = transactions['asset_idx'][mask]
+        exec_px = transactions['exec_px'][mask]
+
+        tick_sizes = np.full(max(len(self.assets), 1), np.nan)
+        for a in np.unique(asset_idx):
+            asset = self.assets[a]
+            if asset.ctype in ('P', 'C'):
+                tick_sizes[a] = dm.instrument_info_get(asset.instrument).ticksize_options
+            else:
+                tick_sizes[a] = dm.instrument_info_get(asset.instrument).ticksize
+
+        df_result = pd.DataFrame({
+            'dt': [self.dates[i] for i in date_idx],
+            'asset': [self.assets[a] for a in asset_idx],
+            'costs': transactions['costs'][mask],
+            'decision_px': transactions['decision_px'][mask],
+            'execution_px': exec_px,
+            'execution_px_ticks': np.round(exec_px / tick_sizes[asset_idx]).astype(np.int64),
+            'pos_action': transactions['pos_action'][mask],
+            'qty': transactions['qty'][mask],
+        }, columns=['dt'] + TRANSACTION_COLUMNS)
+
+        return df_result.set_index('dt')
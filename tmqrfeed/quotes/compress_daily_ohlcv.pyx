@@ -8,6 +8,7 @@ from tmqrfeed.position import Position
 DTYPE = np.float
 ctypedef np.float64_t DTYPE_t
 import pandas as pd
+from collections import OrderedDict
 from datetime import timedelta
 
 
@@ -22,12 +23,8 @@ def compress_daily(dfg, asset, asset_session, int decision_time_shift=0):
     if decision_time_shift < 0:
         raise ValueError("'decision_time_shift' arg must be >= 0")
 
-    cdef DTYPE_t _o, _h, _l, _c, _v, _exec_px
-
     npdate_buf = dfg.index.values.astype('datetime64[D]')
-
-    cdef np.uint64_t[:] npdate = npdate_buf.view(np.uint64)
-    cdef np.uint64_t[:] npdatetime = dfg.index.values.astype('datetime64[s]').view(np.uint64)
+    cdef np.int64_t[:] npdatetime = dfg.index.values.astype('datetime64[s]').view(np.int64)
 
     cdef np.ndarray[DTYPE_t, ndim=2] data = dfg.data
 
@@ -38,98 +35,90 @@ def compress_daily(dfg, asset, asset_session, int decision_time_shift=0):
     cdef int iv = dfg.cols['v']
     cdef int count = data.shape[1]
     cdef int i = 0
-    cdef int exec_i = 0
-    cdef np.uint64_t last_date = -1
-    cdef int last_date_idx = -1
-    values = []
-    values_index = []
-
-    position = Position(asset.dm, decision_time_shift=decision_time_shift)
-
-    # Session filter settings
-    cdef np.uint64_t sess_start = -1
-    cdef np.uint64_t sess_decision = -1
-    cdef np.uint64_t sess_execution = -1
-    cdef np.uint64_t sess_next_date = -1
-    dt_sess_start = dt_sess_decision = dt_sess_exec = dt_sess_next = None
-
-
-    cdef int is_newday = 1 #
+    cdef int d = 0
+    cdef np.int64_t t
+
+    # Split series by days (every date change starts new day)
+    day_changes = np.ones(count, dtype=bool)
+    if count > 1:
+        day_changes[1:] = npdate_buf[1:] != npdate_buf[:count - 1]
+    cdef np.int64_t[:] day_idx = np.cumsum(day_changes, dtype=np.int64) - 1
+    days = npdate_buf[day_changes]
+    cdef int n_days = len(days)
+
+    # Session filter settings for every day (local naive epochs, the same as quotes index values)
+    sess_start_buf, sess_decision_buf, sess_execution_buf, _ = asset_session.get_many(days, decision_time_shift,
+                                                                                      local_time=True)
+    cdef np.int64_t[:] sess_start = sess_start_buf
+    cdef np.int64_t[:] sess_decision = sess_decision_buf
+    cdef np.int64_t[:] sess_execution = sess_execution_buf
+
+    # Daily OHLCV + exec values
+    o_buf = np.zeros(n_days, dtype=np.float64)
+    h_buf = np.zeros(n_days, dtype=np.float64)
+    l_buf = np.zeros(n_days, dtype=np.float64)
+    c_buf = np.zeros(n_days, dtype=np.float64)
+    v_buf = np.zeros(n_days, dtype=np.float64)
+    exec_buf = np.zeros(n_days, dtype=np.float64)
+    has_data_buf = np.zeros(n_days, dtype=np.uint8)
+    cdef DTYPE_t[:] _o = o_buf
+    cdef DTYPE_t[:] _h = h_buf
+    cdef DTYPE_t[:] _l = l_buf
+    cdef DTYPE_t[:] _c = c_buf
+    cdef DTYPE_t[:] _v = v_buf
+    cdef DTYPE_t[:] _exec_px = exec_buf
+    cdef np.uint8_t[:] has_data = has_data_buf
 
     for i in range(count):
-        # If new day occurred
-        if last_date != npdate[i]:
-            if not is_newday:
-                # Store previous OHLCV values
-                values.append(
-                    {
-                        'o': _o,
-                        'h': _h,
-                        'l': _l,
-                        'c': _c,
-                        'v': _v,
-                        'exec': _exec_px,
-                    }
-                )
-                values_index.append(dt_sess_decision)
-
-                # Store exec values in position
-                position.set_net_position(dt_sess_decision, {asset: (_c, _exec_px, 1)})
-
-            # Calculate trading session params
-            dt_sess_start, dt_sess_decision, dt_sess_exec, dt_sess_next = asset_session.get(dfg.index[i], decision_time_shift)
-
-            sess_start = np.datetime64(dt_sess_start.replace(tzinfo=None)).astype('datetime64[s]').view(np.uint64)
-            sess_decision = np.datetime64(dt_sess_decision.replace(tzinfo=None)).astype('datetime64[s]').view(np.uint64)
-            sess_execution = np.datetime64(dt_sess_exec.replace(tzinfo=None)).astype('datetime64[s]').view(np.uint64)
-
-            last_date = npdate[i]
-            last_date_idx = i
-            is_newday = 1
-
-        if npdatetime[i] < sess_start or npdatetime[i] > sess_execution:
-            continue
-
+        d = day_idx[i]
+        t = npdatetime[i]
 
+        if t < sess_start[d] or t > sess_execution[d]:
+            continue
 
-        if is_newday:
-            _o = data[io, i]
-            _h = data[ih, i]
-            _l = data[il, i]
-            _c = data[ic, i]
-            _v = data[iv, i]
-            _exec_px = _c
-            exec_i = i
-            is_newday = 0
+        if not has_data[d]:
+            _o[d] = data[io, i]
+            _h[d] = data[ih, i]
+            _l[d] = data[il, i]
+            _c[d] = data[ic, i]
+            _v[d] = data[iv, i]
+            _exec_px[d] = _c[d]
+            has_data[d] = 1
         else:
-            if npdatetime[i] <= sess_decision:
-                _h = max(_h, data[ih, i])
-                _l = min(_l, data[il, i])
-                _c = data[ic, i]
-                _v += data[iv, i]
-                _exec_px = _c
-                exec_i = i
+            if t <= sess_decision[d]:
+                _h[d] = max(_h[d], data[ih, i])
+                _l[d] = min(_l[d], data[il, i])
+                _c[d] = data[ic, i]
+                _v[d] += data[iv, i]
+                _exec_px[d] = _c[d]
             else:
-                _exec_px = data[ic, i]
-                exec_i = i
-
-    if not is_newday:
-        # Process last values
-        values.append(
-            {
-                'o': _o,
-                'h': _h,
-                'l': _l,
-                'c': _c,
-                'v': _v,
-                'exec': _exec_px,
-            }
-        )
-        # Store exec values
-        position.set_net_position(dt_sess_decision, {asset: (_c, _exec_px, 1)})
-
-        values_index.append(dt_sess_decision)
-
-    df_result = pd.DataFrame(values, index=values_index)
+                _exec_px[d] = data[ic, i]
+
+    mask = has_data_buf.astype(bool)
+    if not mask.any():
+        df_result = pd.DataFrame([], index=[])
+        df_result.index.rename('dt', inplace=True)
+        return df_result, Position(asset.dm, decision_time_shift=decision_time_shift)
+
+    _, sess_decision_utc, _, _ = asset_session.get_many(days[mask], decision_time_shift)
+    values_index = list(pd.DatetimeIndex(sess_decision_utc * 1000000000).tz_localize('UTC')
+                        .tz_convert(asset_session.tz).to_pydatetime())
+
+    df_result = pd.DataFrame({
+        'c': c_buf[mask],
+        'exec': exec_buf[mask],
+        'h': h_buf[mask],
+        'l': l_buf[mask],
+        'o': o_buf[mask],
+        'v': v_buf[mask],
+    }, index=pd.DatetimeIndex(values_index), columns=['c', 'exec', 'h', 'l', 'o', 'v'])
     df_result.index.rename('dt', inplace=True)
+
+    # Build position in bulk (values are valid by design, so position sanity checks are skipped)
+    position_dict = OrderedDict([(dt, {asset: (c, exec_px, 1)})
+                                 for dt, c, exec_px in zip(values_index,
+                                                           c_buf[mask].tolist(),
+                                                           exec_buf[mask].tolist())])
+    position = Position(asset.dm, position_dict, decision_time_shift=decision_time_shift)
+
     return df_result, position
@@ -8,8 +8,14 @@ pyximport.install(setup_args={"include_dirs": np.get_include()})
 from tmqrfeed.quotes.compress_daily_ohlcv import compress_daily
 from tmqrfeed.quotes.dataframegetter import DataFrameGetter
 from tmqrfeed.position import Position
-from tmqr.settings import QDATE_MAX
+from tmqr.settings import QDATE_MAX, QUOTES_CONTFUT_CACHE_DIR
+from tmqr.serialization import object_load_decompress, object_save_compress
+from tmqr.logs import log
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import hashlib
+import os
+import tempfile
 
 
 class QuoteContFut(QuoteBase):
@@ -28,6 +34,17 @@ class QuoteContFut(QuoteBase):
             * 'date_start' - start date of quote series
             * 'date_end' - end date of quote series
             * 'decision_time_shift' - (important for indexes!) - calculate continuous futures series N minutes prior decision time
+            * 'bulk_size' - number of futures contracts fetched from the DB by single request (default: 8)
+            * 'prev_series' - previously built series of the same QuoteContFut (enables incremental build mode)
+            * 'prev_position' - previously built position of the same QuoteContFut (required if 'prev_series' is set)
+            * 'cache_dir' - directory to store built series and position, cached build is used as
+                            'prev_series'/'prev_position' for the next incremental build
+                            (default: QUOTES_CONTFUT_CACHE_DIR, None - cache is disabled)
+
+        Incremental build mode: the last day of 'prev_series' is rebuilt (it could be incomplete), only contracts which
+        are active since that day are fetched from the DB, and new days are appended using the same roll offset logic.
+        Cached builds are keyed by the build settings, the asset session and the data engine, the cache is overwritten
+        only by the builds which extend the cached series.
 
         Output columns are: o, h, l, c, v (all in lowe-case)
         """
@@ -38,6 +55,10 @@ class QuoteContFut(QuoteBase):
         self.date_start = kwargs.get('date_start', self.dm.datafeed.date_start)
         self.date_end = kwargs.get('date_end', self.dm.datafeed.date_end)
         self.decision_time_shift = kwargs.get('decision_time_shift', 0)
+        self.bulk_size = kwargs.get('bulk_size', 8)
+        self.prev_series = kwargs.get('prev_series', None)
+        self.prev_position = kwargs.get('prev_position', None)
+        self.cache_dir = kwargs.get('cache_dir', QUOTES_CONTFUT_CACHE_DIR)
 
         if self.timeframe is None:
             raise ArgumentError("'timeframe' kwarg is not set")
@@ -45,6 +66,10 @@ class QuoteContFut(QuoteBase):
             raise ArgumentError("Only 'D' timeframe supported")
         if self.decision_time_shift < 0:
             raise ArgumentError("'decision_time_shift' kwarg must be >= 0")
+        if self.bulk_size < 1:
+            raise ArgumentError("'bulk_size' kwarg must be >= 1")
+        if self.prev_series is not None and self.prev_position is None:
+            raise ArgumentError("'prev_position' kwarg must be set if 'prev_series' is set")
 
         self.instrument = instrument
 
@@ -77,6 +102,90 @@ class QuoteContFut(QuoteBase):
 
         return position
 
+    def _get_cache_path(self, asset_session):
+        """
+        Path of the cached build
+        :param asset_session: session used for the build
+        :return: path or None if cache is disabled
+        """
+        if self.cache_dir is None:
+            return None
+
+        # Builds of different sessions or data sources must not be mixed
+        source_hash = hashlib.sha1(repr((asset_session.serialize(),
+                                         self.dm.datafeed.data_engine.engine_id)).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'contfut',
+                            f"{self.instrument}_{self.fut_offset}_{self.decision_time_shift}_"
+                            f"{self.date_start:%Y%m%d}_{source_hash[:16]}.lz4")
+
+    def _cache_load(self, path, series_only=False):
+        """
+        Load previously built series and position from the cache
+        :param path: cached build path
+        :param series_only: skip position deserialization
+        :return: (series, position) or (None, None) if not found
+        """
+        if path is None or not os.path.exists(path):
+            return None, None
+
+        with open(path, 'rb') as fh:
+            data = object_load_decompress(fh.read())
+        if series_only:
+            return data['series'], None
+        return data['series'], Position.deserialize(data['position'], datamanager=self.dm)
+
+    def _cache_save(self, path, series, position, cached_series):
+        """
+        Save the build to the cache, if it extends the cached series
+        :param path: cached build path
+        :param series: built series
+        :param position: built position
+        :param cached_series: currently cached series (None if not loaded)
+        :return:
+        """
+        if path is None or len(series) == 0:
+            return
+
+        if cached_series is None:
+            cached_series, _ = self._cache_load(path, series_only=True)
+        if cached_series is not None and len(cached_series) > 0 and series.index[-1] <= cached_series.index[-1]:
+            # Keep the longer cached history (i.e. backtest with earlier 'date_end')
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(object_save_compress({'series': series, 'position': position.serialize()}))
+        os.replace(tmp_path, path)
+
+    def _get_incremental_base(self, prev_series, prev_position):
+        """
+        Get series and position which are not need to be rebuilt in incremental mode
+        :param prev_series: previously built series
+        :param prev_position: previously built position
+        :return: (base_series, base_position) or (None, None) if full build is required
+        """
+        if prev_series is None or len(prev_series) < 2 or prev_series.index[-1].date() > self.date_end.date():
+            return None, None
+
+        # The last day of previous build could be incomplete, so rebuild it
+        base_last_dt = prev_series.index[-2]
+        base_series = prev_series[prev_series.index <= base_last_dt]
+        base_position = Position(self.dm,
+                                 OrderedDict([(dt, pos_rec) for dt, pos_rec in prev_position._position.items()
+                                              if dt < base_last_dt]),
+                                 **prev_position.kwargs)
+        return base_series, base_position
+
+    @staticmethod
+    def _position_since(position, dt):
+        """
+        Copy of the position records with dates >= dt
+        """
+        return Position(position.dm,
+                        OrderedDict([(d, pos_rec) for d, pos_rec in position._position.items() if d >= dt]),
+                        **position.kwargs)
+
     def build(self):
         """
         Launch Quotes build process
@@ -92,10 +201,27 @@ class QuoteContFut(QuoteBase):
         # Get deafult asset session
         asset_session = self.dm.session_get()
 
+        cache_path = self._get_cache_path(asset_session)
+        cached_series = None
+
+        prev_series, prev_position = self.prev_series, self.prev_position
+        if prev_series is None:
+            prev_series, prev_position = self._cache_load(cache_path)
+            cached_series = prev_series
+
+        base_series, base_position = self._get_incremental_base(prev_series, prev_position)
+        if base_series is not None:
+            base_last_dt = base_series.index[-1]
+            # Fetch one day more to get complete trading session of the base last day
+            incremental_date_start = base_last_dt.date() - timedelta(days=1)
+            log.debug(f"{self}: incremental build since {base_last_dt}")
+        else:
+            base_last_dt = None
+            incremental_date_start = self.date_start.date()
+
         # Build price series
-        # 1. Iterate chains
-        df_data = []
-        positions_list = []
+        # 1. Iterate chains and collect contracts ranges
+        contract_ranges = []
         for fut_chain_row in chain_values:
             fut_contract = fut_chain_row[0]
             date_start = fut_chain_row[1]
@@ -105,29 +231,59 @@ class QuoteContFut(QuoteBase):
                 # Prevent loading too many contracts
                 break
 
-            try:
-                # 2. Get futures raw series
-                series = self.dm.series_get(fut_contract, date_start=max(date_start, self.date_start.date()),
-                                            date_end=min(date_end, self.date_end.date()))
+            if base_last_dt is not None and date_end < base_last_dt.date():
+                # Contract is expired before the incremental build start
+                continue
+
+            contract_ranges.append((fut_contract,
+                                    max(date_start, self.date_start.date(), incremental_date_start),
+                                    min(date_end, self.date_end.date()),
+                                    date_end))
+
+        df_data = []
+        positions_list = []
+        ref_series = None
+        if base_series is not None:
+            df_data.append(base_series)
+            positions_list.append(base_position)
+            ref_series = base_series
+
+        for i in range(0, len(contract_ranges), self.bulk_size):
+            contracts_batch = contract_ranges[i:i + self.bulk_size]
+
+            # 2. Get futures raw series (single DB request for the whole batch)
+            series_dict = self.dm.series_get_many([(c, d_start, d_end) for c, d_start, d_end, _ in contracts_batch])
+
+            for fut_contract, _, _, date_end in contracts_batch:
+                series = series_dict.get(fut_contract.ticker, None)
+                if series is None:
+                    # Intraday quotes not found
+                    continue
 
                 # 3. Do resampling (timeframe compression)
                 series, position = compress_daily(DataFrameGetter(series), fut_contract, asset_session,
                                                   self.decision_time_shift)
 
-
                 # 4. Append compressed series to continuous futures series
                 if len(series) > 0:
                     # Fix: issue if last contract expired but new contract has not enough data (real-time)
 
-                    if len(df_data) == 0:
+                    if ref_series is None:
                         df_data.append(series)
                     else:
-                        df_data.append(self._calculate_fut_offset_series(df_data[-1], series))
+                        df_data.append(self._calculate_fut_offset_series(ref_series, series))
 
-                    # Make sure that we have closed futures after rollover
-                    positions_list.append(self._apply_future_rollover(position, date_end))
+                    if len(df_data[-1]) > 0:
+                        ref_series = df_data[-1]
 
-            except IntradayQuotesNotFoundError:
-                continue
+                    if base_last_dt is not None:
+                        # Base position records are not rebuilt
+                        position = self._position_since(position, base_last_dt)
+
+                    # Make sure that we have closed futures after rollover
+                    if len(position._position) > 0:
+                        positions_list.append(self._apply_future_rollover(position, date_end))
 
-        return self.merge_series(df_data), Position.merge(self.dm, positions_list)
+        result_series, result_position = self.merge_series(df_data), Position.merge(self.dm, positions_list)
+        self._cache_save(cache_path, result_series, result_position, cached_series)
+        return result_series, result_position
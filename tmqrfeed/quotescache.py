@@ -0,0 +1,280 @@
+import hashlib
+import os
+import tempfile
+import time as systime
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from tmqr.errors import ArgumentError, QuoteNotFoundError
+from tmqr.logs import log
+from tmqrfeed.cache import CacheRegion
+
+
+class QuotesDiskCache:
+    """
+    Local content-addressed disk cache for compressed quotes blobs fetched from the DB
+
+    Every blob is stored as is (i.e. lz4-pickled bytes) in the file named by SHA1 hash of the cache key.
+    The cache size is bounded by 'max_size' bytes, least recently used files are evicted first (down to
+    'low_watermark' fraction of 'max_size', to avoid scanning the cache directory on every put() of the full cache).
+    File access time is used as LRU stamp, file modification time is used as entry creation time.
+    """
+
+    def __init__(self, cache_dir, max_size, intraday_settle_days=2, low_watermark=0.9):
+        """
+        Initialize quotes disk cache
+        :param cache_dir: path to the cache directory (created if not exists)
+        :param max_size: max size of the cache in bytes
+        :param intraday_settle_days: number of the last closed days which intraday day-blobs are not cached
+        :param low_watermark: cache size after eviction as fraction of 'max_size'
+        """
+        if not cache_dir:
+            raise ArgumentError("'cache_dir' must be set")
+        if max_size <= 0:
+            raise ArgumentError("'max_size' must be > 0")
+        if intraday_settle_days < 0:
+            raise ArgumentError("'intraday_settle_days' must be >= 0")
+        if not 0 < low_watermark <= 1:
+            raise ArgumentError("'low_watermark' must be in (0, 1] range")
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.intraday_settle_days = intraday_settle_days
+        self.low_watermark = low_watermark
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._size = sum(size for path, size, atime in self._scan())
+
+    def is_intraday_day_cacheable(self, dt):
+        """
+        Intraday day-blobs are immutable only for closed days, the current (still open) day must be fetched from DB.
+        The last 'intraday_settle_days' closed days are not cached too, because a day-blob could be read before
+        the nightly DB update has completed it.
+        :param dt: day-blob date ('dt' field of the intraday collection, UTC)
+        :return: True if day-blob could be cached
+        """
+        return dt.date() < datetime.utcnow().date() - timedelta(days=self.intraday_settle_days)
+
+    def _get_path(self, key):
+        key_hash = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key_hash[:2], key_hash)
+
+    def _scan(self):
+        """
+        Iterate over all cache files
+        :return: generator of (path, size, atime)
+        """
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir():
+                continue
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith('.tmp'):
+                    # Skip incomplete writes
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    # Removed by another process
+                    continue
+                yield entry.path, st.st_size, st.st_atime
+
+    @property
+    def size(self):
+        """
+        Approximate size of the cache in bytes (other processes could share the cache directory)
+        """
+        return self._size
+
+    def get(self, key, max_age=None):
+        """
+        Get blob from the cache
+        :param key: cache key
+        :param max_age: max age of cache entry in seconds (None - entry never expires)
+        :return: bytes or None if key not found or expired
+        """
+        path = self._get_path(key)
+        try:
+            if max_age is not None and systime.time() - os.stat(path).st_mtime > max_age:
+                return None
+
+            with open(path, 'rb') as fh:
+                data = fh.read()
+
+            # Set LRU stamp, but keep creation time
+            os.utime(path, (systime.time(), os.stat(path).st_mtime))
+            return data
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        """
+        Store blob in the cache (atomically), evicts least recently used entries if the cache is full
+        :param key: cache key
+        :param data: bytes
+        :return:
+        """
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            replaced_size = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced_size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._size += len(data) - replaced_size
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until cache size is below 'low_watermark' fraction of 'max_size'
+        :return:
+        """
+        files = sorted(self._scan(), key=lambda x: x[2])
+        total_size = sum(f[1] for f in files)
+        target_size = self.max_size * self.low_watermark
+
+        n_removed = 0
+        for path, size, atime in files:
+            if total_size <= target_size:
+                break
+            try:
+                os.remove(path)
+                n_removed += 1
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+        self._size = total_size
+        log.debug(f"QuotesDiskCache: {n_removed} entries evicted, cache size: {total_size} bytes")
+
+    def clear(self):
+        """
+        Remove all entries from the cache
+        :return:
+        """
+        for path, size, atime in list(self._scan()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+
+class IntradayPriceCache:
+    """
+    In-memory cache of intraday quotes arrays (UTC epoch seconds and close prices, see find_quotes_arrays())
+
+    Quotes are loaded by chunks of 'chunk_days' UTC days, so every contract's chunk is fetched from the DB once
+    instead of fetching a one-day window for every price request.
+    The cache size is bounded by 'max_size' bytes, least recently used chunks of all tickers are evicted first.
+    Chunks including the current (still open) day are never cached.
+    """
+    EPOCH_DATE = date(1970, 1, 1)
+
+    def __init__(self, max_size, chunk_days, region_name='intraday_prices'):
+        """
+        Initialize intraday price cache
+        :param max_size: max size of the cached arrays in bytes
+        :param chunk_days: number of days in every cached chunk
+        :param region_name: name of the cache region (see tmqrfeed.cache)
+        """
+        if max_size <= 0:
+            raise ArgumentError("'max_size' must be > 0")
+        if chunk_days <= 0:
+            raise ArgumentError("'chunk_days' must be > 0")
+
+        self.max_size = max_size
+        self.chunk_days = chunk_days
+
+        # {(tckr, chunk_id): (epochs, close)}
+        self.region = CacheRegion(region_name, max_size=max_size,
+                                  sizeof_func=lambda arrays: arrays[0].nbytes + arrays[1].nbytes)
+
+    @property
+    def size(self):
+        """
+        Size of the cached arrays in bytes
+        """
+        return self.region.size
+
+    @property
+    def hits(self):
+        return self.region.hits
+
+    @property
+    def misses(self):
+        return self.region.misses
+
+    @property
+    def evictions(self):
+        return self.region.evictions
+
+    def __len__(self):
+        return len(self.region)
+
+    def _day_number(self, d):
+        return (d - self.EPOCH_DATE).days
+
+    def is_cacheable(self, date_end):
+        """
+        Check if the chunk containing 'date_end' is closed (i.e. ends before the current UTC day)
+        """
+        chunk_end = (self._day_number(date_end) // self.chunk_days + 1) * self.chunk_days - 1
+        return chunk_end < self._day_number(datetime.utcnow().date())
+
+    def get_window(self, tckr, date_start, date_end, loader):
+        """
+        Get quotes arrays of the ticker for the period, missing chunks are loaded by 'loader'
+        :param tckr: full qualified ticker
+        :param date_start: first UTC day of the period (datetime.date)
+        :param date_end: last UTC day of the period, inclusive (datetime.date)
+        :param loader: callable(tckr, date_start, date_end) -> (epochs, close) arrays,
+                       QuoteNotFoundError is treated as empty chunk
+        :return: tuple (epochs, close) of bars inside the period (could be empty)
+        """
+        day_start = self._day_number(date_start)
+        day_end = self._day_number(date_end)
+
+        chunks = []
+        for chunk_id in range(day_start // self.chunk_days, day_end // self.chunk_days + 1):
+            key = (tckr, chunk_id)
+            arrays = self.region.get(key, None)
+            if arrays is None:
+                arrays = self._load(tckr, chunk_id, loader)
+                self.region.put(key, arrays)
+            chunks.append(arrays)
+
+        if len(chunks) == 1:
+            epochs, close = chunks[0]
+        else:
+            epochs = np.concatenate([c[0] for c in chunks])
+            close = np.concatenate([c[1] for c in chunks])
+
+        i_start, i_end = np.searchsorted(epochs, [day_start * 86400, (day_end + 1) * 86400], side='left')
+        return epochs[i_start:i_end], close[i_start:i_end]
+
+    def _load(self, tckr, chunk_id, loader):
+        chunk_start = self.EPOCH_DATE + timedelta(days=chunk_id * self.chunk_days)
+        chunk_end = chunk_start + timedelta(days=self.chunk_days - 1)
+        try:
+            return loader(tckr, chunk_start, chunk_end)
+        except QuoteNotFoundError:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+    def clear(self):
+        """
+        Remove all entries from the cache
+        """
+        self.region.clear()
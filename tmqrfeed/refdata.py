@@ -0,0 +1,193 @@
+'''
+Process-wide reference data store
+
+Reference data (instruments info, contracts info, futures chains, options chains aggregations and risk free rates)
+is the same for all DataManager instances of the process, so it's fetched from the DB once and shared read-only.
+Every entry is stored with the version stamp of its data set (see set_refdata_version()), entries of the old version
+are re-fetched after the DB update scripts stamp the new version. Data sets which were never stamped are not stored.
+'''
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from datetime import datetime
+
+from tmqr.errors import ArgumentError
+from tmqr.settings import REFDATA_STORE_ENABLED, REFDATA_STORE_DIR
+
+COLLECTION_REFDATA_VERSION = 'refdata_version'
+
+#
+# Reference data sets (version stamps names)
+#
+REFDATA_ASSET_INDEX = 'asset_index'
+REFDATA_RFR = 'rfr'
+
+#
+# Reference data kinds
+#
+REFDATA_INSTRUMENT_INFO = 'instrument_info'
+REFDATA_CONTRACT_INFO = 'contract_info'
+REFDATA_FUTURES_CHAIN = 'futures_chain'
+REFDATA_OPTION_CHAINS = 'option_chains'
+REFDATA_RFR_SERIES = 'rfr_series'
+
+REFDATA_KINDS = {
+    REFDATA_INSTRUMENT_INFO: REFDATA_ASSET_INDEX,
+    REFDATA_CONTRACT_INFO: REFDATA_ASSET_INDEX,
+    REFDATA_FUTURES_CHAIN: REFDATA_ASSET_INDEX,
+    REFDATA_OPTION_CHAINS: REFDATA_ASSET_INDEX,
+    REFDATA_RFR_SERIES: REFDATA_RFR,
+}
+
+
+class ReferenceDataStore:
+    """
+    In-memory (and optionally disk-backed) store of versioned reference data
+
+    IMPORTANT: stored values are shared between all data engines of the process, they must never be changed
+    """
+
+    def __init__(self, disk_dir=None):
+        """
+        Initialize reference data store
+        :param disk_dir: directory to share the entries between processes (None - memory only)
+        """
+        self.disk_dir = disk_dir
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        # {(kind, key): (version, value)}
+        self._data = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _get_path(self, kind, key):
+        key_hash = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, kind, key_hash)
+
+    def _disk_load(self, kind, key, version):
+        try:
+            with open(self._get_path(kind, key), 'rb') as fh:
+                disk_key, disk_version, value = pickle.load(fh)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if disk_key != key or disk_version != version:
+            return None
+        return value
+
+    def _disk_save(self, kind, key, version, value):
+        path = self._get_path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump((key, version, value), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, kind, key, version, loader):
+        """
+        Get reference data entry, the entry is loaded if it's not stored yet or stored with other version
+        :param kind: reference data kind (see REFDATA_KINDS)
+        :param key: entry key (any picklable hashable value)
+        :param version: actual version stamp of the data set (None - never stamped, the entry is always loaded)
+        :param loader: callable() -> value, loader exceptions are not cached
+        :return: stored value (must not be changed)
+        """
+        if kind not in REFDATA_KINDS:
+            raise ArgumentError(f"Unknown reference data kind: {kind}")
+
+        if version is None:
+            # The DB update of never stamped data set couldn't be detected
+            self.misses += 1
+            return loader()
+
+        rec = self._data.get((kind, key), None)
+        if rec is not None and rec[0] == version:
+            self.hits += 1
+            return rec[1]
+
+        self.misses += 1
+        value = None
+        if self.disk_dir is not None:
+            value = self._disk_load(kind, key, version)
+
+        if value is None:
+            value = loader()
+            if self.disk_dir is not None:
+                self._disk_save(kind, key, version, value)
+
+        with self._lock:
+            self._data[(kind, key)] = (version, value)
+        return value
+
+    def clear(self):
+        """
+        Remove all in-memory entries (disk entries are invalidated by the version stamp only)
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_shared_store = None
+
+
+def get_shared_store():
+    """
+    Get process-wide reference data store
+    :return: ReferenceDataStore or None if the store is disabled (see REFDATA_STORE_ENABLED setting)
+    """
+    global _shared_store
+    if _shared_store is None and REFDATA_STORE_ENABLED:
+        _shared_store = ReferenceDataStore(REFDATA_STORE_DIR)
+    return _shared_store
+
+
+def set_shared_store(store):
+    """
+    Set (or disable if None) process-wide reference data store
+    :param store: ReferenceDataStore instance or None
+    :return:
+    """
+    global _shared_store
+    _shared_store = store
+
+
+def set_refdata_version(db, name, version=None):
+    """
+    Stamp the new version of the reference data set, must be called by the DB update scripts
+    :param db: pymongo database
+    :param name: reference data set name (REFDATA_ASSET_INDEX or REFDATA_RFR)
+    :param version: version stamp (default: current UTC time)
+    :return:
+    """
+    if name not in (REFDATA_ASSET_INDEX, REFDATA_RFR):
+        raise ArgumentError(f"Unknown reference data set: {name}")
+
+    db[COLLECTION_REFDATA_VERSION].replace_one({'_id': name},
+                                               {'_id': name,
+                                                'version': version if version is not None else datetime.utcnow()},
+                                               upsert=True)
+
+
+def get_refdata_version(db, name):
+    """
+    Get the version stamp of the reference data set
+    :param db: pymongo database
+    :param name: reference data set name (REFDATA_ASSET_INDEX or REFDATA_RFR)
+    :return: version stamp or None if never stamped
+    """
+    doc = db[COLLECTION_REFDATA_VERSION].find_one({'_id': name})
+    return doc['version'] if doc is not None else None
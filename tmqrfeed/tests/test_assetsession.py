@@ -1,10 +1,12 @@
 import unittest
 
+import numpy as np
+import pandas as pd
 import pytz
 
 from tmqr.errors import *
 from tmqr.settings import *
-from tmqrfeed.assetsession import AssetSession
+from tmqrfeed.assetsession import AssetSession, SESSION_EPOCH_NONE
 
 class AssetSessionTestCase(unittest.TestCase):
     def setUp(self):
@@ -281,3 +283,58 @@ class AssetSessionTestCase(unittest.TestCase):
         sess = AssetSession(s_correct, tz2)
         self.assertEqual(str(s_correct), str(sess))
         self.assertEqual(str(s_correct), repr(sess))
+
+    def test_session_get_many(self):
+        tz = pytz.timezone(self.info_dic['timezone'])
+        sess = AssetSession(self.info_dic['trading_session'], tz)
+
+        dates = [datetime(2010, 12, 30, 12, 45), datetime(2010, 12, 31), datetime(2010, 12, 31, 23, 59),
+                 datetime(2011, 1, 1, 12, 45), datetime(2011, 3, 13), datetime(2011, 11, 6)]
+
+        for shift in [0, 3]:
+            start, decision, execution, next_sess = sess.get_many(pd.DatetimeIndex(dates).tz_localize(tz), shift)
+            self.assertEqual(len(dates), len(start))
+            self.assertEqual(np.int64, start.dtype)
+
+            for i, d in enumerate(dates):
+                exp_start, exp_decision, exp_execution, exp_next_sess = sess.get(d, shift)
+                self.assertEqual(exp_start, pd.Timestamp(start[i], unit='s', tz='UTC'))
+                self.assertEqual(exp_decision, pd.Timestamp(decision[i], unit='s', tz='UTC'))
+                self.assertEqual(exp_execution, pd.Timestamp(execution[i], unit='s', tz='UTC'))
+                if exp_next_sess is None:
+                    self.assertEqual(SESSION_EPOCH_NONE, next_sess[i])
+                else:
+                    self.assertEqual(exp_next_sess, pd.Timestamp(next_sess[i], unit='s', tz='UTC'))
+
+        # Naive dates are local session dates
+        start, decision, execution, next_sess = sess.get_many(dates)
+        self.assertEqual(tz.localize(datetime(2010, 12, 30, 10, 40)), pd.Timestamp(decision[0], unit='s', tz='UTC'))
+
+        self.assertRaises(ArgumentError, sess.get_many, dates, -1)
+        self.assertRaises(SettingsError, AssetSession(self.info_dic['trading_session'][1:], tz).get_many, dates)
+
+    def test_session_get_many_local_time(self):
+        tz = pytz.timezone(self.info_dic['timezone'])
+        sess = AssetSession(self.info_dic['trading_session'], tz)
+
+        days = np.array(['2010-12-30', '2011-01-01', '2011-03-13', '2011-11-06'], dtype='datetime64[D]')
+        start, decision, execution, next_sess = sess.get_many(days, 3, local_time=True)
+
+        for i, d in enumerate(pd.DatetimeIndex(days).to_pydatetime()):
+            exp_start, exp_decision, exp_execution, exp_next_sess = sess.get(d, 3)
+            self.assertEqual(exp_start.replace(tzinfo=None), datetime.utcfromtimestamp(start[i]))
+            self.assertEqual(exp_decision.replace(tzinfo=None), datetime.utcfromtimestamp(decision[i]))
+            self.assertEqual(exp_execution.replace(tzinfo=None), datetime.utcfromtimestamp(execution[i]))
+            if exp_next_sess is None:
+                self.assertEqual(SESSION_EPOCH_NONE, next_sess[i])
+            else:
+                self.assertEqual(exp_next_sess.replace(tzinfo=None), datetime.utcfromtimestamp(next_sess[i]))
+
+    def test_session_get_memoized(self):
+        tz = pytz.timezone(self.info_dic['timezone'])
+        sess = AssetSession(self.info_dic['trading_session'], tz)
+
+        self.assertEqual(sess.get(datetime(2010, 12, 31, 1, 0)), sess.get(tz.localize(datetime(2010, 12, 31, 23, 0))))
+        self.assertEqual(1, len(sess._sess_cache))
+        self.assertNotEqual(sess.get(datetime(2010, 12, 31), 1), sess.get(datetime(2010, 12, 31), 0))
+        self.assertEqual(2, len(sess._sess_cache))
@@ -0,0 +1,145 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from tmqr.errors import ArgumentError
+from tmqrfeed.cache import CacheRegion, CacheManager, sizeof
+
+
+class CacheRegionTestCase(unittest.TestCase):
+    def test_init(self):
+        region = CacheRegion('test', max_entries=10, max_size=100, ttl=5)
+        self.assertEqual('test', region.name)
+        self.assertEqual(10, region.max_entries)
+        self.assertEqual(100, region.max_size)
+        self.assertEqual(5, region.ttl)
+
+        self.assertRaises(ArgumentError, CacheRegion, 'test', max_entries=0)
+        self.assertRaises(ArgumentError, CacheRegion, 'test', max_size=0)
+        self.assertRaises(ArgumentError, CacheRegion, 'test', ttl=0)
+
+    def test_dict_interface(self):
+        region = CacheRegion('test')
+        region['a'] = 1
+        self.assertTrue('a' in region)
+        self.assertFalse('b' in region)
+        self.assertEqual(1, region['a'])
+        self.assertEqual(1, region.get('a'))
+        self.assertEqual(None, region.get('b'))
+        self.assertEqual((None, None), region.get('b', (None, None)))
+        self.assertRaises(KeyError, region.__getitem__, 'b')
+
+        self.assertEqual(1, region.setdefault('a', 2))
+        self.assertEqual(3, region.setdefault('c', 3))
+        self.assertEqual(['a', 'c'], region.keys())
+        self.assertEqual(2, len(region))
+
+        self.assertEqual(3, region.pop('c'))
+        self.assertEqual(None, region.pop('c'))
+        del region['a']
+        self.assertRaises(KeyError, region.__delitem__, 'a')
+        self.assertEqual(0, len(region))
+
+    def test_stats(self):
+        region = CacheRegion('test', max_entries=1)
+        region['a'] = 1
+        region.get('a')
+        region.get('b')
+        region['b'] = 2
+
+        stats = region.stats()
+        self.assertEqual('test', stats['name'])
+        self.assertEqual(1, stats['entries'])
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(1, stats['evictions'])
+        self.assertEqual(0.5, stats['hit_ratio'])
+
+        region.clear()
+        self.assertEqual(0, len(region))
+        self.assertEqual(1, region.stats()['hits'])
+
+    def test_lru_max_entries(self):
+        region = CacheRegion('test', max_entries=2)
+        region['a'] = 1
+        region['b'] = 2
+        region.get('a')
+        region['c'] = 3
+        self.assertEqual(['a', 'c'], region.keys())
+
+        # Overwrite doesn't evict
+        region['a'] = 4
+        self.assertEqual(['c', 'a'], region.keys())
+        self.assertEqual(1, region.evictions)
+
+    def test_lru_max_size(self):
+        region = CacheRegion('test', max_size=100)
+        region['a'] = np.zeros(5)
+        region['b'] = np.zeros(5)
+        self.assertEqual(80, region.size)
+
+        region['c'] = np.zeros(5)
+        self.assertEqual(['b', 'c'], region.keys())
+        self.assertEqual(80, region.size)
+
+        # Too large entry is kept alone
+        region['d'] = np.zeros(100)
+        self.assertEqual(['d'], region.keys())
+        self.assertEqual(800, region.size)
+
+        region.pop('d')
+        self.assertEqual(0, region.size)
+
+        region = CacheRegion('test', max_size=100, sizeof_func=lambda x: 60)
+        region['a'] = 1
+        region['b'] = 2
+        self.assertEqual(['b'], region.keys())
+
+    def test_ttl(self):
+        region = CacheRegion('test', ttl=10)
+        with patch('tmqrfeed.cache.systime.time') as mock_time:
+            mock_time.return_value = 100
+            region['a'] = 1
+            mock_time.return_value = 109
+            self.assertTrue('a' in region)
+            self.assertEqual(1, region['a'])
+
+            mock_time.return_value = 111
+            self.assertFalse('a' in region)
+            self.assertEqual(None, region.get('a'))
+            self.assertEqual(0, len(region))
+            self.assertEqual(1, region.evictions)
+
+    def test_sizeof(self):
+        self.assertEqual(80, sizeof(np.zeros(10)))
+        df = pd.DataFrame({'a': np.zeros(10)})
+        self.assertEqual(int(df.memory_usage(index=True).sum()), sizeof(df))
+        self.assertTrue(sizeof((np.zeros(10), np.zeros(10))) > 160)
+        self.assertTrue(sizeof({'a': np.zeros(10)}) > 80)
+
+
+class CacheManagerTestCase(unittest.TestCase):
+    def test_region(self):
+        cache = CacheManager({'prices': {'max_entries': 5}})
+        region = cache.region('prices', max_entries=10, ttl=3)
+        self.assertEqual(5, region.max_entries)
+        self.assertEqual(3, region.ttl)
+        self.assertTrue(region is cache.region('prices'))
+        self.assertTrue(region is cache['prices'])
+        self.assertTrue('prices' in cache)
+
+        other = cache.add_region(CacheRegion('other'))
+        self.assertRaises(ArgumentError, cache.add_region, CacheRegion('other'))
+        self.assertEqual(['prices', 'other'], cache.regions())
+
+        region['a'] = 1
+        other['a'] = 1
+        self.assertEqual([1, 1], [s['entries'] for s in cache.stats()])
+
+        cache.clear('prices')
+        self.assertEqual([0, 1], [s['entries'] for s in cache.stats()])
+        cache.clear()
+        self.assertEqual([0, 0], [s['entries'] for s in cache.stats()])
+        cache.log_stats()
@@ -8,7 +8,7 @@ import numpy as np
 import pandas as pd
 
 from tmqr.errors import *
-from tmqrfeed.chains import OptionChain
+from tmqrfeed.chains import OptionChain, OptionChainRecord
 from tmqrfeed.contracts import FutureContract, OptionContract
 from tmqrfeed.manager import DataManager
 
@@ -35,6 +35,12 @@ class OptionChainTestCase(unittest.TestCase):
         self.assertRaises(ChainNotFoundError, OptionChain, {}, self.expiration,
                           self.underlying, self.dm)
 
+    def test_tickers(self):
+        tickers = self.opt_chain.tickers
+        self.assertEqual(len(self.chain_list[self.expiration]) * 2, len(tickers))
+        call, put = list(self.chain_list[self.expiration].values())[0]
+        self.assertEqual([call.ticker, put.ticker], tickers[:2])
+
     def test_mixed_opt_codes(self):
         self.expiration = datetime.datetime(2011, 1, 21, 0, 0)
         opt_dict = self.chain_list[self.expiration].copy()
@@ -52,6 +58,41 @@ class OptionChainTestCase(unittest.TestCase):
         chain = OptionChain(opt_dict, self.expiration, self.underlying, self.dm)
         self.assertEqual('OPTCODE', chain.opt_code)
 
+    def test_option_chain_record(self):
+        rec = OptionChainRecord([90.0, 89.0, 91.0],
+                                ['US.C.F-ZB-H11-110322.110121@90.0', 'US.C.F-ZB-H11-110322.110121@89.0',
+                                 'US.C.F-ZB-H11-110322.110121@91.0'],
+                                ['US.P.F-ZB-H11-110322.110121@90.0', 'US.P.F-ZB-H11-110322.110121@89.0',
+                                 'US.P.F-ZB-H11-110322.110121@91.0'],
+                                underlying=self.underlying, datamanager=self.dm)
+
+        self.assertEqual([89.0, 90.0, 91.0], list(rec))
+        self.assertEqual(3, len(rec))
+        self.assertEqual({''}, rec.opt_codes)
+        self.assertEqual(['US.C.F-ZB-H11-110322.110121@89.0', 'US.P.F-ZB-H11-110322.110121@89.0'], rec.tickers[:2])
+        self.assertTrue(90.0 in rec)
+        self.assertFalse(90.5 in rec)
+        self.assertRaises(KeyError, rec.__getitem__, 90.5)
+        self.assertEqual(0, len(rec._contracts))
+
+        call, put = rec[np.float64(90.0)]
+        self.assertEqual('US.C.F-ZB-H11-110322.110121@90.0', call.ticker)
+        self.assertEqual('US.P.F-ZB-H11-110322.110121@90.0', put.ticker)
+        self.assertTrue(call.underlying is self.underlying)
+        self.assertTrue(call is rec[90.0][0])
+        self.assertEqual(1, len(rec._contracts))
+
+        self.assertRaises(ArgumentError, OptionChainRecord, [90.0], [], [], self.underlying, self.dm)
+        self.assertRaises(ArgumentError, OptionChainRecord, [90.0, 90.0], ['C1', 'C2'], ['P1', 'P2'],
+                          self.underlying, self.dm)
+
+        rec = OptionChainRecord([89.0], ['US.C.F-ZB-H11-110322.110121.OPTCODE@89.0'],
+                                ['US.P.F-ZB-H11-110322.110121.OPTCODE@89.0'],
+                                underlying=self.underlying, datamanager=self.dm)
+        chain = OptionChain(rec, self.expiration, self.underlying, self.dm)
+        self.assertEqual('OPTCODE', chain.opt_code)
+        self.assertEqual(0, len(rec._contracts))
+
     def test_repr_and_str(self):
         self.assertEqual(str(self.opt_chain), f'Chain: {self.underlying} {self.expiration.date()}')
         self.assertEqual(str(self.opt_chain), self.opt_chain.__repr__())
@@ -492,3 +533,71 @@ class OptionChainTestCase(unittest.TestCase):
 
             self.assertRaises(ChainNotFoundError, self.opt_chain._find_by_delta, dt, 0.8, 'P', error_limit=5,
                               strike_limit=1)
+
+    def _make_vectorized_dm(self, missing_strikes, ul_px=1270.0):
+        def dm_price_get_sideeffect(asset, date):
+            if isinstance(asset, FutureContract):
+                return ul_px, ul_px + 1
+            if isinstance(asset, OptionContract):
+                if asset.strike in missing_strikes:
+                    raise OptionsEODQuotesNotFoundError()
+                # IV smile
+                iv = 0.8 + abs(asset.strike - ul_px) / 1000.0
+                return iv, iv + 0.01
+
+        def dm_price_get_many_sideeffect(assets, date):
+            result = []
+            for asset in assets:
+                try:
+                    result.append(dm_price_get_sideeffect(asset, date))
+                except QuoteNotFoundError:
+                    result.append((float('nan'), float('nan')))
+            return result
+
+        dm = MagicMock(self.opt_chain.dm)
+        dm.price_get.side_effect = dm_price_get_sideeffect
+        dm.price_get_many.side_effect = dm_price_get_many_sideeffect
+        dm.riskfreerate_get.return_value = 0.01
+        return dm
+
+    def test__find_by_delta_vectorized(self):
+        dt = datetime.datetime(2011, 1, 19, 0, 0)
+        strikes = list(self.opt_chain._strike_array)
+        atm_index = self.opt_chain._get_atm_index(1270.0)
+
+        missing_cases = [
+            set(),
+            set(strikes[atm_index - 6:atm_index - 2]) | set(strikes[atm_index + 2:atm_index + 5]),
+            set(strikes[atm_index + 1:atm_index + 3]) | set(strikes[atm_index - 3:atm_index - 1]),
+            set(strikes),
+        ]
+
+        for missing_strikes in missing_cases:
+            self.opt_chain.dm = self._make_vectorized_dm(missing_strikes)
+            for opttype in ['C', 'P']:
+                for delta in [0.05, 0.15, 0.25, 0.35, 0.45, 0.55, 0.65, 0.75, 0.85, 0.95]:
+                    for error_limit in [1, 2, 5]:
+                        for strike_limit in [3, 30]:
+                            args = (dt, delta, opttype, error_limit, strike_limit)
+                            try:
+                                expected = self.opt_chain._find_by_delta(*args)
+                            except ChainNotFoundError:
+                                self.assertRaises(ChainNotFoundError, self.opt_chain._find_by_delta_vectorized, *args)
+                                continue
+
+                            expected_context = expected._pricing_context
+                            opt = self.opt_chain._find_by_delta_vectorized(*args)
+                            self.assertEqual(expected, opt, args)
+                            self.assertEqual(expected_context, opt._pricing_context)
+                            self.assertAlmostEqual(expected.delta(dt), opt.delta(dt))
+
+        self.assertRaises(ArgumentError, self.opt_chain._find_by_delta_vectorized, dt, 0, 'C', 10)
+        self.assertRaises(ArgumentError, self.opt_chain._find_by_delta_vectorized, dt, 1, 'C', 10)
+        self.assertRaises(ArgumentError, self.opt_chain._find_by_delta_vectorized, dt, 0.3, 'C', 10, 0)
+
+    def test_find_vectorized(self):
+        with patch('tmqrfeed.chains.OptionChain._find_by_delta_vectorized') as mock__find_by_delta_vectorized:
+            self.opt_chain.find(datetime.datetime(2011, 1, 19, 0, 0), 0.3, 'c', how='delta', vectorized=True)
+            self.assertTrue(mock__find_by_delta_vectorized.called)
+            self.assertEqual((datetime.datetime(2011, 1, 19, 0, 0), 0.3, 'C', 5, 30),
+                             mock__find_by_delta_vectorized.call_args[0])
@@ -197,6 +197,28 @@ class ContractsTestCase(unittest.TestCase):
         self.assertRaises(ArgumentError, ContractBase.deserialize, 'US.   .AAPL')
         self.assertRaises(ArgumentError, ContractBase.deserialize, 'US.AAPL')
 
+    def test_intern(self):
+        dm = mock.MagicMock(DataManager())
+        dm2 = mock.MagicMock(DataManager())
+
+        c = ContractBase.intern('US.F.ES.M83.830520', dm)
+        self.assertEqual(type(c), FutureContract)
+        self.assertTrue(c is ContractBase.deserialize('US.F.ES.M83.830520', dm))
+        self.assertTrue(c is FutureContract.intern('US.F.ES.M83.830520', dm))
+        self.assertFalse(c is ContractBase.intern('US.F.ES.M83.830520', dm2))
+        self.assertFalse(c is FutureContract('US.F.ES.M83.830520', dm))
+        self.assertRaises(ArgumentError, FutureContract.intern, 'US.S.AAPL', dm)
+
+        opt = OptionContract.intern('US.C.F-ES-M83-830520.830420@89.0', dm)
+        self.assertTrue(opt.underlying is c)
+        ul = FutureContract('US.F.ES.M83.830520', dm)
+        opt2 = OptionContract.intern('US.P.F-ES-M83-830520.830420@89.0', dm, underlying=ul)
+        self.assertTrue(opt2.underlying is ul)
+
+        # Contracts use slots
+        self.assertRaises(AttributeError, setattr, c, 'some_attr', 1)
+        self.assertRaises(AttributeError, setattr, opt, 'some_attr', 1)
+
     def test_to_expiry_days(self):
         dm = mock.MagicMock(DataManager())
 
@@ -35,3 +35,19 @@ class CostsTestCase(unittest.TestCase):
         self.assertEqual(-20 * 10, Costs(-10, 20).calc_costs(opt1, 10))
 
         self.assertEqual(-20 * 10, Costs(-10, 20).calc_costs(opt2, 10))
+
+    def test_calc_costs_array(self):
+        fut = ContractBase("US.S.AAPL")
+        fut.ctype = 'F'
+
+        opt = ContractBase("US.C.AAPL")
+        opt.ctype = 'C'
+
+        self.assertEqual([-100, -100, 0], list(Costs(10, 20).calc_costs_array(fut, [10, -10, 0])))
+        self.assertEqual([-200, -200, 0], list(Costs(-10, -20).calc_costs_array(opt, [10, -10, 0])))
+
+        class CustomCosts(Costs):
+            def calc_costs(self, asset, qty):
+                return -1.0
+
+        self.assertEqual([-1, -1], list(CustomCosts().calc_costs_array(fut, [10, -10])))
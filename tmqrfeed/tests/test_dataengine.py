@@ -3,8 +3,12 @@ from unittest.mock import patch
 from tmqr.serialization import *
 from tmqrfeed.contracts import FutureContract
 from tmqrfeed.dataengines import *
+from tmqrfeed.refdata import ReferenceDataStore
 import lz4
 import pytz
+import shutil
+import tempfile
+from datetime import timedelta
 
 
 class DataEngineTestCase(unittest.TestCase):
@@ -150,6 +154,201 @@ class DataEngineTestCase(unittest.TestCase):
 
             self.assertRaises(DBDataCorruptionError, deng.db_get_raw_series, 'US.F.CL.Q12.120720', SRC_INTRADAY)
 
+    def test_get_raw_series_many_intraday(self):
+        deng = DataEngineMongo()
+
+        def make_df(dt, v):
+            return pd.DataFrame([{'dt': dt, 'c': v}]).set_index('dt').tz_localize('UTC')
+
+        with patch('pymongo.collection.Collection.find') as mock_find:
+            mock_find.return_value = [
+                {'tckr': 'US.F.CL.Q12', 'dt': datetime(2012, 1, 4),
+                 'ohlc': object_save_compress(make_df(datetime(2012, 1, 4, 10), 4))},
+                {'tckr': 'US.F.CL.U12', 'dt': datetime(2012, 1, 3),
+                 'ohlc': object_save_compress(make_df(datetime(2012, 1, 3, 10), 30))},
+                {'tckr': 'US.F.CL.Q12', 'dt': datetime(2012, 1, 3),
+                 'ohlc': object_save_compress(make_df(datetime(2012, 1, 3, 10), 3))},
+            ]
+            result = deng.db_get_raw_series_many({'US.F.CL.Q12': (date(2012, 1, 1), date(2012, 2, 1)),
+                                                  'US.F.CL.U12': (None, None),
+                                                  'US.F.CL.V12': (None, None),
+                                                  },
+                                                 SRC_INTRADAY)
+
+            request = mock_find.call_args[0][0]
+            self.assertEqual({'$or': [
+                {'tckr': 'US.F.CL.Q12', 'dt': {'$gte': datetime(2012, 1, 1), '$lte': datetime(2012, 2, 1)}},
+                {'tckr': {'$in': ['US.F.CL.U12', 'US.F.CL.V12']}},
+            ]}, request)
+
+            self.assertEqual(2, len(result))
+            self.assertTrue('US.F.CL.V12' not in result)
+
+            df, qtype = result['US.F.CL.Q12']
+            self.assertEqual(QTYPE_INTRADAY, qtype)
+            self.assertEqual([3, 4], list(df['c']))
+            self.assertEqual(pytz.UTC, df.index.tz)
+
+            df, qtype = result['US.F.CL.U12']
+            self.assertEqual([30], list(df['c']))
+
+            # Single ticker request doesn't use '$or'
+            mock_find.reset_mock()
+            mock_find.return_value = []
+            self.assertEqual({}, deng.db_get_raw_series_many({'US.F.CL.Q12': (None, None)}, SRC_INTRADAY))
+            self.assertEqual({'tckr': {'$in': ['US.F.CL.Q12']}}, mock_find.call_args[0][0])
+
+            # Empty request
+            mock_find.reset_mock()
+            self.assertEqual({}, deng.db_get_raw_series_many({}, SRC_INTRADAY))
+            self.assertEqual(False, mock_find.called)
+
+    def test_get_raw_series_many_errors(self):
+        deng = DataEngineMongo()
+        self.assertRaises(DataSourceNotFoundError, deng.db_get_raw_series_many, {'US.F.CL.Q12': (None, None)},
+                          'UNKNOWN_SOURCE')
+
+        with patch('pymongo.collection.Collection.find') as mock_find:
+            mock_find.return_value = [{'tckr': 'US.F.CL.Q12', 'dt': datetime(2012, 1, 3),
+                                       'ohlc': lz4.block.compress(pickle.dumps('NON_DATAFRAME_OBJECT'))}]
+            self.assertRaises(DBDataCorruptionError, deng.db_get_raw_series_many, {'US.F.CL.Q12': (None, None)},
+                              SRC_INTRADAY)
+
+    def test_get_raw_series_intraday_quotes_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            deng = DataEngineMongo(quotes_cache_dir=cache_dir, quotes_cache_intraday_settle_days=0)
+            today = datetime.combine(datetime.utcnow().date(), time(0, 0))
+            yesterday = today - timedelta(days=1)
+
+            db_records = [
+                {'tckr': 'US.F.CL.Q12', 'dt': yesterday,
+                 'ohlc': object_save_compress(pd.DataFrame([{'dt': yesterday, 'c': 1}]).set_index('dt'))},
+                {'tckr': 'US.F.CL.Q12', 'dt': today,
+                 'ohlc': object_save_compress(pd.DataFrame([{'dt': today, 'c': 2}]).set_index('dt'))},
+            ]
+
+            def find(request, projection=None, **kwargs):
+                if projection is not None:
+                    return [{'tckr': r['tckr'], 'dt': r['dt']} for r in db_records]
+                return [r for r in db_records if r['dt'] in request['dt']['$in']]
+
+            with patch('pymongo.collection.Collection.find') as mock_find:
+                mock_find.side_effect = find
+                df, qtype = deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+                self.assertEqual([1, 2], list(df['c']))
+                self.assertEqual({'tckr': 'US.F.CL.Q12', 'dt': {'$in': [yesterday, today]}},
+                                 mock_find.call_args[0][0])
+
+                # Closed day is loaded from cache, the current day is always requested from the DB
+                df, qtype = deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+                self.assertEqual([1, 2], list(df['c']))
+                self.assertEqual({'tckr': 'US.F.CL.Q12', 'dt': {'$in': [today]}}, mock_find.call_args[0][0])
+
+                # Bulk request uses the same cache
+                result = deng.db_get_raw_series_many({'US.F.CL.Q12': (None, None)}, SRC_INTRADAY)
+                self.assertEqual([1, 2], list(result['US.F.CL.Q12'][0]['c']))
+                self.assertEqual({'tckr': 'US.F.CL.Q12', 'dt': {'$in': [today]}}, mock_find.call_args[0][0])
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_get_raw_series_intraday_quotes_cache_partial_hit_order(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            deng = DataEngineMongo(quotes_cache_dir=cache_dir, quotes_cache_intraday_settle_days=0)
+            today = datetime.combine(datetime.utcnow().date(), time(0, 0))
+            days = [today - timedelta(days=3), today - timedelta(days=2), today - timedelta(days=1)]
+
+            db_records = [{'tckr': 'US.F.CL.Q12', 'dt': d,
+                           'ohlc': object_save_compress(pd.DataFrame([{'dt': d, 'c': i}]).set_index('dt'))}
+                          for i, d in enumerate(days)]
+
+            # Only the middle day is cached
+            deng.quotes_cache.put(deng._source_intraday_cache_key('US.F.CL.Q12', days[1]), db_records[1]['ohlc'])
+
+            def find(request, projection=None, **kwargs):
+                if projection is not None:
+                    return [{'tckr': r['tckr'], 'dt': r['dt']} for r in db_records]
+                return [r for r in db_records if r['dt'] in request['dt']['$in']]
+
+            with patch('pymongo.collection.Collection.find') as mock_find:
+                mock_find.side_effect = find
+                df, qtype = deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+                self.assertEqual({'tckr': 'US.F.CL.Q12', 'dt': {'$in': [days[0], days[2]]}},
+                                 mock_find.call_args[0][0])
+                self.assertEqual([0, 1, 2], list(df['c']))
+                self.assertTrue(df.index.is_monotonic_increasing)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_get_raw_series_eod_options_quotes_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            deng = DataEngineMongo(quotes_cache_dir=cache_dir, quotes_cache_options_eod_max_age=100)
+            with patch('pymongo.collection.Collection.find_one') as mock_find_one:
+                blob = object_save_compress(pd.DataFrame([{'iv': 0.1, 'dt': datetime(2011, 1, 1)}]).set_index('dt'))
+                mock_find_one.side_effect = lambda request: {'_id': request['_id'], 'data': blob}
+                df, qtype = deng.db_get_raw_series('US.F.CL.Q12.120720', SRC_OPTIONS_EOD)
+                df, qtype = deng.db_get_raw_series('US.F.CL.Q12.120720', SRC_OPTIONS_EOD)
+                self.assertEqual(1, mock_find_one.call_count)
+                self.assertEqual(QTYPE_OPTIONS_EOD, qtype)
+                self.assertEqual(0.1, df['iv'][0])
+
+                # Cache entry expired
+                deng.quotes_cache_options_eod_max_age = -1
+                deng.db_get_raw_series('US.F.CL.Q12.120720', SRC_OPTIONS_EOD)
+                self.assertEqual(2, mock_find_one.call_count)
+
+                mock_find_one.side_effect = None
+                mock_find_one.return_value = None
+                deng.quotes_cache.clear()
+                self.assertRaises(OptionsEODQuotesNotFoundError, deng.db_get_raw_series, 'US.F.CL.Q13.130720',
+                                  SRC_OPTIONS_EOD)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_get_raw_series_many_eod_options(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            deng = DataEngineMongo(quotes_cache_dir=cache_dir, quotes_cache_options_eod_max_age=100)
+
+            def make_blob(iv):
+                return object_save_compress(pd.DataFrame([{'iv': iv, 'dt': datetime(2011, 1, 1)}]).set_index('dt'))
+
+            with patch('pymongo.collection.Collection.find') as mock_find:
+                mock_find.return_value = [{'_id': 'US.C.F-CL-Q12.120720@50.0', 'data': make_blob(0.1)},
+                                          {'_id': 'US.P.F-CL-Q12.120720@50.0', 'data': make_blob(0.2)}]
+                result = deng.db_get_raw_series_many({'US.C.F-CL-Q12.120720@50.0': (None, None),
+                                                      'US.P.F-CL-Q12.120720@50.0': (None, None),
+                                                      'US.C.F-CL-Q12.120720@51.0': (None, None),
+                                                      }, SRC_OPTIONS_EOD)
+                self.assertEqual(1, mock_find.call_count)
+                self.assertEqual({'_id': {'$in': ['US.C.F-CL-Q12.120720@50.0',
+                                                  'US.P.F-CL-Q12.120720@50.0',
+                                                  'US.C.F-CL-Q12.120720@51.0']}},
+                                 mock_find.call_args[0][0])
+                self.assertEqual(2, len(result))
+                df, qtype = result['US.P.F-CL-Q12.120720@50.0']
+                self.assertEqual(QTYPE_OPTIONS_EOD, qtype)
+                self.assertEqual(0.2, df['iv'][0])
+
+                # Cached records are not requested from the DB
+                mock_find.reset_mock()
+                mock_find.return_value = []
+                result = deng.db_get_raw_series_many({'US.C.F-CL-Q12.120720@50.0': (None, None),
+                                                      'US.C.F-CL-Q12.120720@51.0': (None, None),
+                                                      }, SRC_OPTIONS_EOD)
+                self.assertEqual({'_id': {'$in': ['US.C.F-CL-Q12.120720@51.0']}}, mock_find.call_args[0][0])
+                self.assertEqual(0.1, result['US.C.F-CL-Q12.120720@50.0'][0]['iv'][0])
+
+                deng.quotes_cache.clear()
+                mock_find.return_value = [{'_id': 'US.C.F-CL-Q12.120720@50.0',
+                                           'data': lz4.block.compress(pickle.dumps('NON_DATAFRAME_OBJECT'))}]
+                self.assertRaises(DBDataCorruptionError, deng.db_get_raw_series_many,
+                                  {'US.C.F-CL-Q12.120720@50.0': (None, None)}, SRC_OPTIONS_EOD)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
     def test_db_get_option_chains(self):
         deng = DataEngineMongo()
 
@@ -245,6 +444,44 @@ class DataEngineTestCase(unittest.TestCase):
             mock_find.return_value = None
             self.assertRaises(DataEngineNotFoundError, deng.db_get_rfr_series, 'US')
 
+    def test_db_get_contract_info_refdata_store(self):
+        store = ReferenceDataStore()
+        versions = {'asset_index': 1}
+
+        def find_one(query, *args, **kwargs):
+            if '_id' in query:
+                return {'_id': query['_id'], 'version': versions[query['_id']]}
+            return {'tckr': query['tckr']}
+
+        with patch('pymongo.collection.Collection.find_one') as mock_find_one:
+            mock_find_one.side_effect = find_one
+
+            deng = DataEngineMongo(refdata_store=store)
+            ci = deng.db_get_contract_info('US.F.CL.Q12.120720')
+            self.assertEqual({'tckr': 'US.F.CL.Q12.120720'}, ci)
+            # Version stamp + contract info
+            self.assertEqual(2, mock_find_one.call_count)
+
+            # Other data engine of the process shares the store
+            deng2 = DataEngineMongo(refdata_store=store)
+            self.assertTrue(ci is deng2.db_get_contract_info('US.F.CL.Q12.120720'))
+            self.assertTrue(ci is deng.db_get_contract_info('US.F.CL.Q12.120720'))
+            self.assertEqual(3, mock_find_one.call_count)
+            self.assertEqual(2, store.hits)
+
+            # New version stamp reloads the data for new data engines
+            versions['asset_index'] = 2
+            deng3 = DataEngineMongo(refdata_store=store)
+            ci3 = deng3.db_get_contract_info('US.F.CL.Q12.120720')
+            self.assertEqual(ci, ci3)
+            self.assertFalse(ci is ci3)
+            self.assertEqual(5, mock_find_one.call_count)
+
+            # Store disabled
+            deng4 = DataEngineMongo(refdata_store=None)
+            self.assertFalse(ci3 is deng4.db_get_contract_info('US.F.CL.Q12.120720'))
+            self.assertEqual(6, mock_find_one.call_count)
+
     def test_db_load_alpha(self):
         deng = DataEngineMongo()
 
@@ -0,0 +1,149 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, date
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytz
+
+from tmqr.errors import *
+from tmqr.settings import *
+from tmqrfeed.dataengines import DataEngineColumnar
+from tmqrfeed.datafeed import DataFeed
+
+
+class DataEngineColumnarTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.deng = DataEngineColumnar(data_dir=self.data_dir)
+
+        self.intraday_df = pd.DataFrame([
+            {'dt': datetime(2012, 1, 3, 10, 0), 'o': 1, 'h': 2, 'l': 0.5, 'c': 1.5, 'v': 10},
+            {'dt': datetime(2012, 1, 3, 10, 1), 'o': 2, 'h': 3, 'l': 1.5, 'c': 2.5, 'v': 20},
+            {'dt': datetime(2012, 1, 4, 10, 0), 'o': 3, 'h': 4, 'l': 2.5, 'c': 3.5, 'v': 30},
+            {'dt': datetime(2012, 1, 5, 23, 59), 'o': 4, 'h': 5, 'l': 3.5, 'c': 4.5, 'v': 40},
+        ]).set_index('dt').tz_localize('UTC')[['o', 'h', 'l', 'c', 'v']]
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_init(self):
+        self.assertEqual(self.data_dir, self.deng.data_dir)
+        self.assertRaises(ArgumentError, DataEngineColumnar)
+
+    def test_write_read_intraday(self):
+        self.deng.db_write_series('US.F.CL.Q12', SRC_INTRADAY, self.intraday_df)
+
+        df, qtype = self.deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+        self.assertEqual(QTYPE_INTRADAY, qtype)
+        self.assertEqual(pytz.UTC, df.index.tz)
+        self.assertEqual(list(self.intraday_df.columns), list(df.columns))
+        self.assertTrue(df.equals(self.intraday_df.astype(float)))
+
+        df, qtype = self.deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY,
+                                                date_start=date(2012, 1, 4), date_end=date(2012, 1, 5))
+        self.assertEqual([3.5, 4.5], list(df['c']))
+
+        df, qtype = self.deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY, date_end=date(2012, 1, 3))
+        self.assertEqual([1.5, 2.5], list(df['c']))
+
+        self.assertRaises(IntradayQuotesNotFoundError, self.deng.db_get_raw_series, 'US.F.CL.Q12', SRC_INTRADAY,
+                          date_start=date(2012, 1, 6))
+        self.assertRaises(IntradayQuotesNotFoundError, self.deng.db_get_raw_series, 'US.F.CL.U12', SRC_INTRADAY)
+        self.assertRaises(DataSourceNotFoundError, self.deng.db_get_raw_series, 'US.F.CL.Q12', 'UNKNOWN')
+
+    def test_write_read_tz(self):
+        df_pacific = self.intraday_df.tz_convert('US/Pacific')
+        self.deng.db_write_series('US.F.CL.Q12', SRC_INTRADAY, df_pacific)
+        df, qtype = self.deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+        self.assertEqual(str(pytz.timezone('US/Pacific')), str(df.index.tz))
+        self.assertEqual(list(df_pacific.index), list(df.index))
+
+        self.assertRaises(ArgumentError, self.deng.db_write_series, 'US.F.CL.Q12', SRC_INTRADAY, 'NON_DATAFRAME')
+
+    def test_write_read_options_eod(self):
+        eod_df = pd.DataFrame([{'iv': 0.1, 'dt': datetime(2011, 1, 1)},
+                               {'iv': 0.2, 'dt': datetime(2011, 1, 2)}]).set_index('dt')
+        self.deng.db_write_series('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD, eod_df)
+
+        df, qtype = self.deng.db_get_raw_series('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD)
+        self.assertEqual(QTYPE_OPTIONS_EOD, qtype)
+        self.assertEqual(None, df.index.tz)
+        self.assertEqual(0.1, df.at[datetime(2011, 1, 1), 'iv'])
+        self.assertEqual(datetime(2011, 1, 2), self.deng.db_get_last_quote_date('US.C.F-CL-Q12.120720@50.0',
+                                                                                SRC_OPTIONS_EOD))
+
+        self.assertRaises(OptionsEODQuotesNotFoundError, self.deng.db_get_raw_series, 'US.P.F-CL-Q12.120720@50.0',
+                          SRC_OPTIONS_EOD)
+        self.assertRaises(OptionsEODQuotesNotFoundError, self.deng.db_get_last_quote_date,
+                          'US.P.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD)
+
+    def test_get_last_quote_date(self):
+        self.deng.db_write_series('US.F.CL.Q12', SRC_INTRADAY, self.intraday_df)
+        self.assertEqual(pytz.utc.localize(datetime(2012, 1, 5, 23, 59)),
+                         self.deng.db_get_last_quote_date('US.F.CL.Q12', SRC_INTRADAY))
+        self.assertRaises(IntradayQuotesNotFoundError, self.deng.db_get_last_quote_date, 'US.F.CL.U12', SRC_INTRADAY)
+
+    def test_get_raw_series_many(self):
+        self.deng.db_write_series('US.F.CL.Q12', SRC_INTRADAY, self.intraday_df)
+        result = self.deng.db_get_raw_series_many({'US.F.CL.Q12': (date(2012, 1, 5), None),
+                                                   'US.F.CL.U12': (None, None)}, SRC_INTRADAY)
+        self.assertEqual(['US.F.CL.Q12'], list(result.keys()))
+        self.assertEqual([4.5], list(result['US.F.CL.Q12'][0]['c']))
+
+    def test_reference_data_not_found(self):
+        self.assertEqual([], self.deng.db_get_option_chains('US.F.CL.Q12'))
+        self.assertEqual([], self.deng.db_get_futures_chain('US.CL'))
+        self.assertRaises(ArgumentError, self.deng.db_get_instrument_info, 'CL')
+        self.assertRaises(DataEngineNotFoundError, self.deng.db_get_instrument_info, 'US.CL')
+        self.assertRaises(DataEngineNotFoundError, self.deng.db_get_contract_info, 'US.F.CL.Q12')
+        self.assertRaises(DataEngineNotFoundError, self.deng.db_get_rfr_series, 'US')
+
+    def test_export_instrument(self):
+        option_chains = [{'_id': {'date': datetime(2012, 7, 20)},
+                          'chain': [{'tckr': 'US.C.F-CL-Q12.120720@50.0', 'strike': 50.0, 'type': 'C'}]}]
+        eod_df = pd.DataFrame([{'iv': 0.1, 'dt': datetime(2011, 1, 1)}]).set_index('dt')
+
+        def get_raw_series(tckr, source_type, **kwargs):
+            if tckr == 'US.F.CL.Q12':
+                return self.intraday_df, QTYPE_INTRADAY
+            if tckr == 'US.C.F-CL-Q12.120720@50.0':
+                return eod_df, QTYPE_OPTIONS_EOD
+            raise IntradayQuotesNotFoundError()
+
+        src = MagicMock()
+        src.db_get_instrument_info.return_value = {'instrument': 'US.CL', 'tickvalue': 10.0}
+        src.db_get_rfr_series.side_effect = DataEngineNotFoundError()
+        src.db_get_futures_chain.return_value = [{'tckr': 'US.F.CL.U12'}, {'tckr': 'US.F.CL.Q12'}]
+        src.db_get_contract_info.side_effect = lambda tckr: {'tckr': tckr, 'exp': {
+            'US.F.CL.Q12': datetime(2012, 7, 20),
+            'US.F.CL.U12': datetime(2012, 8, 20),
+        }.get(tckr, datetime(2012, 7, 20))}
+        src.db_get_option_chains.side_effect = lambda tckr: option_chains if tckr == 'US.F.CL.Q12' else []
+        src.db_get_raw_series.side_effect = get_raw_series
+
+        self.deng.export_instrument(src, 'US.CL')
+
+        self.assertEqual({'instrument': 'US.CL', 'tickvalue': 10.0}, self.deng.db_get_instrument_info('US.CL'))
+        self.assertEqual([{'tckr': 'US.F.CL.Q12'}, {'tckr': 'US.F.CL.U12'}],
+                         self.deng.db_get_futures_chain('US.CL'))
+        self.assertEqual([{'tckr': 'US.F.CL.U12'}],
+                         self.deng.db_get_futures_chain('US.CL', datetime(2012, 8, 1)))
+        self.assertEqual(datetime(2012, 7, 20), self.deng.db_get_contract_info('US.F.CL.Q12')['exp'])
+        self.assertEqual(option_chains, self.deng.db_get_option_chains('US.F.CL.Q12'))
+        self.assertEqual('US.C.F-CL-Q12.120720@50.0',
+                         self.deng.db_get_contract_info('US.C.F-CL-Q12.120720@50.0')['tckr'])
+
+        df, qtype = self.deng.db_get_raw_series('US.F.CL.Q12', SRC_INTRADAY)
+        self.assertEqual(len(self.intraday_df), len(df))
+        df, qtype = self.deng.db_get_raw_series('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD)
+        self.assertEqual([0.1], list(df['iv']))
+        self.assertRaises(IntradayQuotesNotFoundError, self.deng.db_get_raw_series, 'US.F.CL.U12', SRC_INTRADAY)
+
+    def test_datafeed_integration(self):
+        self.deng.db_write_series('US.F.CL.Q12', SRC_INTRADAY, self.intraday_df)
+        dfeed = DataFeed(data_engine_cls=DataEngineColumnar, data_engine_settings={'data_dir': self.data_dir})
+        df = dfeed.get_raw_series('US.F.CL.Q12', SRC_INTRADAY, timezone='US/Pacific')
+        self.assertEqual(pytz.timezone('US/Pacific'), df.index.tz)
+        self.assertEqual(4, len(df))
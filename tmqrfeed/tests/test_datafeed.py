@@ -1,8 +1,10 @@
+import gc
 import os
 import pickle
 import unittest
+import weakref
 from collections import OrderedDict
-from datetime import time
+from datetime import date, time
 from unittest import mock
 
 import numpy as np
@@ -11,7 +13,7 @@ import pytz
 
 from tmqr.errors import *
 from tmqrfeed.assetsession import AssetSession
-from tmqrfeed.chains import FutureChain
+from tmqrfeed.chains import FutureChain, OptionChainRecord
 from tmqrfeed.contractinfo import ContractInfo
 from tmqrfeed.contracts import *
 from tmqrfeed.dataengines import DataEngineMongo
@@ -29,7 +31,9 @@ class DataFeedTestCase(unittest.TestCase):
         self.assertEqual(dfeed.data_engine_settings, {})
         self.assertEqual(dfeed.date_start, QDATE_MIN)
         self.assertEqual(dfeed.date_end, QDATE_MAX)
-        self.assertEqual(dfeed._cache_instrument_info, {})
+        self.assertEqual(0, len(dfeed._cache_instrument_info))
+        self.assertTrue('instrument_info' in dfeed.cache)
+        self.assertTrue('intraday_prices' in dfeed.cache)
 
     def test_init_kwargs(self):
         dfeed = DataFeed(data_engine_settings={'test': 'ok'},
@@ -199,6 +203,29 @@ class DataFeedTestCase(unittest.TestCase):
             mock_db_get_raw_series.return_value = source_df, 'UNKNOWN_QTYPE'
             self.assertRaises(NotImplementedError, dfeed.get_raw_series, 'US.F.CL.Q83.830720', SRC_INTRADAY)
 
+    def test_get_raw_series_many(self):
+        with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series_many') as mock_db_get_many:
+            data = [
+                {'dt': datetime(2008, 10, 10, 10, 40), 'v': 1},
+                {'dt': datetime(2008, 10, 10, 10, 41), 'v': 0},
+            ]
+            source_df = pd.DataFrame(data).set_index('dt').tz_localize('UTC')
+            mock_db_get_many.return_value = {'US.F.CL.Q83': (source_df, QTYPE_INTRADAY)}
+            dfeed = DataFeed()
+
+            tckr_ranges = {'US.F.CL.Q83': (None, None), 'US.F.CL.U83': (None, None)}
+            result = dfeed.get_raw_series_many(tckr_ranges, SRC_INTRADAY, timezone='US/Pacific')
+            self.assertEqual(tckr_ranges, mock_db_get_many.call_args[0][0])
+            self.assertEqual(SRC_INTRADAY, mock_db_get_many.call_args[0][1])
+
+            self.assertEqual(['US.F.CL.Q83'], list(result.keys()))
+            self.assertEqual(pytz.timezone('US/Pacific'), result['US.F.CL.Q83'].index.tz)
+            self.assertEqual(0, len(dfeed._cache_price_data))
+
+            # Test not implemented stuff
+            mock_db_get_many.return_value = {'US.F.CL.Q83': (source_df, 'UNKNOWN_QTYPE')}
+            self.assertRaises(NotImplementedError, dfeed.get_raw_series_many, tckr_ranges, SRC_INTRADAY)
+
     def test_get_raw_series_eod(self):
         info_dic = {
             'futures_months': [3, 6, 9, 12],
@@ -313,6 +340,18 @@ class DataFeedTestCase(unittest.TestCase):
 
             self.assertRaises(ArgumentError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
                               [tz.localize(datetime(2008, 10, 10, 10, 39))])
+            self.assertRaises(ArgumentError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
+                              [datetime(2008, 10, 10, 10, 39)], timezone=tz)
+
+            # Previous bar price if no exact bar, quote not found before the first bar
+            result = dfeed.get_raw_prices('US.F.CL.Q83.830720', SRC_INTRADAY,
+                                          [tz.localize(datetime(2008, 10, 10, 10, 0)),
+                                           tz.localize(datetime(2008, 10, 10, 10, 40)),
+                                           tz.localize(datetime(2008, 10, 10, 12, 0))],
+                                          timezone=tz)
+            self.assertEqual([1, 1, 0], result)
+            self.assertRaises(IntradayQuotesNotFoundError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
+                              [tz.localize(datetime(2008, 10, 10, 0, 28))], timezone=tz)
 
             # Test not implemented stuff
             source_df = pd.DataFrame(data).set_index('dt').tz_convert("UTC")
@@ -320,6 +359,66 @@ class DataFeedTestCase(unittest.TestCase):
             self.assertRaises(NotImplementedError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
                               [tz.localize(datetime(2008, 10, 10, 10, 39))], timezone='US/Pacific')
 
+    def test_get_raw_price_intraday_cache(self):
+        tz = pytz.timezone("US/Pacific")
+        data = [
+            {'dt': tz.localize(datetime(2011, 12, 19, 10, 40)), 'c': 1},
+            {'dt': tz.localize(datetime(2011, 12, 19, 10, 45)), 'c': 2},
+            {'dt': tz.localize(datetime(2011, 12, 20, 10, 40)), 'c': 3},
+            {'dt': tz.localize(datetime(2011, 12, 20, 10, 45)), 'c': 4},
+        ]
+        source_df = pd.DataFrame(data).set_index('dt').tz_convert("UTC")
+
+        with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series') as mock_db_get_raw_series:
+            mock_db_get_raw_series.return_value = source_df, QTYPE_INTRADAY
+            dfeed = DataFeed(intraday_cache_chunk_days=30)
+
+            for d in [datetime(2011, 12, 19), datetime(2011, 12, 20)]:
+                decision, execution = tz.localize(d.replace(hour=10, minute=40)), tz.localize(d.replace(hour=10,
+                                                                                                        minute=45))
+                result = dfeed.get_raw_prices('US.F.CL.Q83.830720', SRC_INTRADAY, [decision, execution],
+                                              timezone=tz, date_start=decision, date_end=execution)
+                self.assertEqual([1, 2] if d.day == 19 else [3, 4], result)
+
+            # Whole chunk is fetched once
+            self.assertEqual(1, mock_db_get_raw_series.call_count)
+            self.assertEqual({'date_start': date(2011, 11, 22), 'date_end': date(2011, 12, 21)},
+                             mock_db_get_raw_series.call_args[1])
+
+            # Quotes of the previous day are not used
+            self.assertRaises(IntradayQuotesNotFoundError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
+                              [tz.localize(datetime(2011, 12, 20, 0, 30))], timezone=tz,
+                              date_start=tz.localize(datetime(2011, 12, 20, 0, 30)),
+                              date_end=tz.localize(datetime(2011, 12, 20, 0, 30)))
+            self.assertRaises(IntradayQuotesNotFoundError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720', SRC_INTRADAY,
+                              [tz.localize(datetime(2011, 12, 21, 10, 40))], timezone=tz,
+                              date_start=tz.localize(datetime(2011, 12, 21, 10, 40)),
+                              date_end=tz.localize(datetime(2011, 12, 21, 10, 40)))
+            self.assertEqual(1, mock_db_get_raw_series.call_count)
+
+            # Cache is disabled
+            dfeed = DataFeed(intraday_cache_max_size=None)
+            dfeed.get_raw_prices('US.F.CL.Q83.830720', SRC_INTRADAY, [decision, execution],
+                                 timezone=tz, date_start=decision, date_end=execution)
+            self.assertEqual(decision, mock_db_get_raw_series.call_args[1]['date_start'])
+
+    def test_get_raw_prices_many(self):
+        def get_raw_prices(tckr, source_type, dt_list, **kwargs):
+            if tckr == 'US.C.F-CL-Q12.120720@50.0':
+                return [0.1, 0.2]
+            raise OptionsEODQuotesNotFoundError()
+
+        with mock.patch('tmqrfeed.datafeed.DataFeed.get_raw_prices') as mock_get_raw_prices:
+            mock_get_raw_prices.side_effect = get_raw_prices
+            dfeed = DataFeed()
+            dt_list = [datetime(2011, 1, 1, 10, 39), datetime(2011, 1, 1, 10, 45)]
+            result = dfeed.get_raw_prices_many(['US.C.F-CL-Q12.120720@50.0', 'US.C.F-CL-Q12.120720@51.0'],
+                                               SRC_OPTIONS_EOD, dt_list, timezone='US/Pacific')
+            self.assertEqual({'US.C.F-CL-Q12.120720@50.0': [0.1, 0.2]}, result)
+            self.assertEqual(('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD, dt_list),
+                             mock_get_raw_prices.call_args_list[0][0])
+            self.assertEqual({'timezone': 'US/Pacific'}, mock_get_raw_prices.call_args_list[0][1])
+
     def test_get_raw_price_options_eod(self):
         tz = pytz.timezone("US/Pacific")
         with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series') as mock_db_get_raw_series:
@@ -415,6 +514,62 @@ class DataFeedTestCase(unittest.TestCase):
             self.assertEqual(result[0], 6)
             self.assertEqual(result[1], 7)
 
+    def test_get_raw_price_options_eod_stale_data(self):
+        tz = pytz.timezone("US/Pacific")
+        with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series') as mock_db_get_raw_series:
+            data = [
+                {'dt': datetime(2011, 1, 6, 23, 59, 59), 'iv': 6.0},
+                {'dt': datetime(2011, 1, 7, 23, 59, 59), 'iv': 7.0},
+                {'dt': datetime(2011, 1, 11, 23, 59, 59), 'iv': 11.0},
+            ]
+            source_df = pd.DataFrame(data).set_index('dt').tz_localize("UTC")
+            mock_db_get_raw_series.return_value = source_df, QTYPE_OPTIONS_EOD
+            dfeed = DataFeed()
+
+            # Friday quote is valid on Saturday and Monday, Tuesday quote is stale on Thursday
+            self.assertRaises(OptionsEODQuotesNotFoundError, dfeed.get_raw_prices, 'US.F.CL.Q83.830720',
+                              SRC_OPTIONS_EOD, [tz.localize(datetime(2011, 1, 8, 10, 39)),
+                                                tz.localize(datetime(2011, 1, 10, 10, 39)),
+                                                tz.localize(datetime(2011, 1, 12, 10, 39)),
+                                                tz.localize(datetime(2011, 1, 13, 10, 39)),
+                                                ], timezone=tz)
+
+            result = dfeed.get_raw_prices('US.F.CL.Q83.830720', SRC_OPTIONS_EOD,
+                                          [tz.localize(datetime(2011, 1, 8, 10, 39)),
+                                           tz.localize(datetime(2011, 1, 10, 10, 39)),
+                                           tz.localize(datetime(2011, 1, 11, 10, 39)),
+                                           ], timezone=tz)
+            self.assertEqual([7.0, 7.0, 11.0], result)
+
+            result = dfeed.get_raw_prices('US.F.CL.Q83.830720', SRC_OPTIONS_EOD,
+                                          [tz.localize(datetime(2011, 1, 6, 10, 39)),
+                                           tz.localize(datetime(2011, 1, 10, 10, 39)),
+                                           tz.localize(datetime(2011, 1, 11, 10, 39)),
+                                           ], timezone=tz, data_options_use_prev_date=True)
+            self.assertTrue(np.isnan(result[0]))
+            self.assertEqual([7.0, 7.0], result[1:])
+
+            # IV arrays are cached per ticker
+            self.assertTrue(dfeed._cache_options_iv['US.F.CL.Q83.830720'][0]() is source_df)
+
+    def test_options_eod_iv_arrays_price_data_eviction(self):
+        dfeed = DataFeed()
+        dfseries = pd.DataFrame({'iv': [1.0, 2.0]}, index=[datetime(2011, 1, 1, 23, 59, 59),
+                                                           datetime(2011, 1, 2, 23, 59, 59)])
+        dfeed._cache_price_data['US.F.CL.Q83.830720'] = (dfseries, QTYPE_OPTIONS_EOD)
+        arrays = dfeed._options_eod_iv_arrays('US.F.CL.Q83.830720', dfseries)
+        self.assertTrue(arrays is dfeed._options_eod_iv_arrays('US.F.CL.Q83.830720', dfseries))
+
+        # IV arrays cache must not keep the evicted price data frame alive
+        df_ref = weakref.ref(dfseries)
+        del dfseries
+        dfeed.cache.clear('price_data')
+        gc.collect()
+        self.assertEqual(None, df_ref())
+
+        dfseries2 = pd.DataFrame({'iv': [3.0]}, index=[datetime(2011, 1, 3, 23, 59, 59)])
+        self.assertEqual([3.0], list(dfeed._options_eod_iv_arrays('US.F.CL.Q83.830720', dfseries2)[2]))
+
     def test_get_raw_price_options_eod_caching(self):
         tz = pytz.timezone("US/Pacific")
         with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series') as mock_db_get_raw_series:
@@ -445,6 +600,58 @@ class DataFeedTestCase(unittest.TestCase):
             self.assertEqual(True, np.all(df.index == source_df.index))
             self.assertEqual(True, np.all(df['iv'] == source_df['iv']))
 
+    def test_prefetch_options_eod(self):
+        tz = pytz.timezone("US/Pacific")
+        source_df = pd.DataFrame([
+            {'dt': datetime(2011, 1, 1, 23, 59, 59), 'iv': 1.0},
+            {'dt': datetime(2011, 1, 2, 23, 59, 59), 'iv': 2.0},
+        ]).set_index('dt').tz_localize("UTC")
+
+        with mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series_many') as mock_get_many, \
+                mock.patch('tmqrfeed.dataengines.DataEngineMongo.db_get_raw_series') as mock_get_raw_series:
+            mock_get_many.return_value = {'US.C.F-CL-Q12.120720@50.0': (source_df, QTYPE_OPTIONS_EOD)}
+            dfeed = DataFeed()
+
+            for background in [False, True]:
+                dfeed._cache_price_data = {}
+                mock_get_many.reset_mock()
+                future = dfeed.prefetch_options_eod(['US.C.F-CL-Q12.120720@50.0', 'US.P.F-CL-Q12.120720@50.0'],
+                                                    background=background)
+                self.assertEqual(background, future is not None)
+
+                self.assertEqual([2.0], dfeed.get_raw_prices('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD,
+                                                             [tz.localize(datetime(2011, 1, 2, 10, 39))],
+                                                             timezone=tz))
+                self.assertEqual(1, mock_get_many.call_count)
+                self.assertEqual(({'US.C.F-CL-Q12.120720@50.0': (None, None),
+                                   'US.P.F-CL-Q12.120720@50.0': (None, None)}, SRC_OPTIONS_EOD),
+                                 mock_get_many.call_args[0])
+                self.assertFalse(mock_get_raw_series.called)
+                self.assertTrue('US.C.F-CL-Q12.120720@50.0' not in dfeed._prefetch_pending)
+
+            # Cached tickers are not fetched again
+            mock_get_many.reset_mock()
+            dfeed.prefetch_options_eod(['US.C.F-CL-Q12.120720@50.0'])
+            self.assertFalse(mock_get_many.called)
+
+            # Prefetch errors are not fatal
+            dfeed._cache_price_data = {}
+            mock_get_many.side_effect = Exception('DB error')
+            mock_get_raw_series.return_value = source_df, QTYPE_OPTIONS_EOD
+            dfeed.prefetch_options_eod(['US.C.F-CL-Q12.120720@50.0'], background=True)
+            self.assertEqual([1.0], dfeed.get_raw_prices('US.C.F-CL-Q12.120720@50.0', SRC_OPTIONS_EOD,
+                                                         [tz.localize(datetime(2011, 1, 1, 10, 39))],
+                                                         timezone=tz))
+            self.assertTrue(mock_get_raw_series.called)
+
+    def test_prefetch_option_chain(self):
+        dfeed = DataFeed()
+        chain = mock.MagicMock()
+        chain.tickers = ['US.C.F-CL-Q12.120720@50.0', 'US.P.F-CL-Q12.120720@50.0']
+        with mock.patch('tmqrfeed.datafeed.DataFeed.prefetch_options_eod') as mock_prefetch:
+            dfeed.prefetch_option_chain(chain, background=True)
+            mock_prefetch.assert_called_once_with(chain.tickers, background=True)
+
     def test_get_options_chains(self):
         fn = os.path.abspath(os.path.join(__file__, '../', 'option_chain_list_es.pkl'))
 
@@ -469,7 +676,9 @@ class DataFeedTestCase(unittest.TestCase):
                 strike_count = 0
                 for k, v in optchain_call_args.items():
                     self.assertEqual(datetime, type(k))
-                    self.assertEqual(OrderedDict, type(v))
+                    self.assertEqual(OptionChainRecord, type(v))
+                    # Contracts are created on access only
+                    self.assertEqual(0, len(v._contracts))
 
                     prev_strike = 0.0
                     for strike, opts in v.items():
@@ -15,7 +15,7 @@ import os
 
 from tmqrfeed.assetsession import AssetSession
 from tmqrfeed.quotes.dataframegetter import DataFrameGetter
-from tmqrfeed.fast_data_handling import find_quotes
+from tmqrfeed.fast_data_handling import find_quotes, find_quotes_arrays
 from tmqrfeed.contracts import ContractBase
 
 class FastDataHandlingTestCase(unittest.TestCase):
@@ -136,3 +136,28 @@ class FastDataHandlingTestCase(unittest.TestCase):
         self.assertEqual(dpx, idx_list[0][1])
 
         self.assertEqual(epx, idx_list[1][1])
+
+    def test_find_quotes_arrays(self):
+        df = pd.read_csv(os.path.abspath(os.path.join(__file__, '../', 'fut_series.csv')), parse_dates=True,
+                         index_col=0)
+        df.index = df.index.tz_localize(pytz.utc).tz_convert(self.tz)
+        df = df.drop([df.ix['2011-12-20 10:40'].name])
+
+        epochs = df.index.values.astype('datetime64[s]').view(np.int64)
+        close = df['c'].values.astype(np.float64)
+
+        start, decision, execution, next_sess_date = self.sess.get(pd.Timestamp('2011-12-20'))
+        targets = np.array([decision.timestamp(), execution.timestamp(), epochs[0] - 60], dtype=np.int64)
+        prices, idx = find_quotes_arrays(epochs, close, targets)
+
+        idx_list = find_quotes(df, [decision, execution])
+        self.assertEqual(pd.Timestamp('2011-12-20 10:39:00-0800'), df.index[idx[0]])
+        self.assertEqual([px for dt, px in idx_list], list(prices[:2]))
+        self.assertEqual(execution, df.index[idx[1]])
+
+        # Quote is not found
+        self.assertEqual(-1, idx[2])
+        self.assertTrue(np.isnan(prices[2]))
+
+        prices, idx = find_quotes_arrays(epochs, close, np.array([], dtype=np.int64))
+        self.assertEqual(0, len(prices))
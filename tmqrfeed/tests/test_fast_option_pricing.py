@@ -10,18 +10,92 @@ import pyximport
 from tmqr.errors import *
 
 pyximport.install(setup_args={"include_dirs": np.get_include()})
-from tmqrfeed.fast_option_pricing import blackscholes, blackscholes_greeks, GREEK_DELTA
+from tmqrfeed.fast_option_pricing import *
 
 
 class FastOptionsPricingTestCase(unittest.TestCase):
     def test_greeks(self):
         self.assertEqual(GREEK_DELTA, 0)
+        self.assertEqual(GREEK_GAMMA, 1)
+        self.assertEqual(GREEK_VEGA, 2)
+        self.assertEqual(GREEK_THETA, 3)
+        self.assertEqual(GREEK_RHO, 4)
 
-        self.assertEqual((1,), blackscholes_greeks(1, 110, 100, 0, 0, 0.1))
-        self.assertEqual((0,), blackscholes_greeks(1, 90, 100, 0, 0, 0.1))
-        self.assertEqual((-1,), blackscholes_greeks(0, 90, 100, 0, 0, 0.1))
-        self.assertEqual((0,), blackscholes_greeks(0, 110, 100, 0, 0, 0.1))
+        self.assertEqual((1, 0, 0, 0, 0), blackscholes_greeks(1, 110, 100, 0, 0, 0.1))
+        self.assertEqual((0, 0, 0, 0, 0), blackscholes_greeks(1, 90, 100, 0, 0, 0.1))
+        self.assertEqual((-1, 0, 0, 0, 0), blackscholes_greeks(0, 90, 100, 0, 0, 0.1))
+        self.assertEqual((0, 0, 0, 0, 0), blackscholes_greeks(0, 110, 100, 0, 0, 0.1))
+
+        # Zero rate and zero drift ATM option: d1 = 0
+        self.assertAlmostEqual(0.5, blackscholes_greeks(1, 100, 100, 0.23, 0.0, 1e-12)[GREEK_DELTA])
+        self.assertAlmostEqual(-0.5, blackscholes_greeks(0, 100, 100, 0.23, 0.0, 1e-12)[GREEK_DELTA])
+
+    def test_greeks_finite_differences(self):
+        h = 0.00001
+        for iscall in [0, 1]:
+            for ulprice in [80.0, 100.0, 120.0]:
+                def px(ul=ulprice, t=0.25, rfr=0.02, iv=0.3):
+                    return blackscholes(iscall, ul, 100.0, t, rfr, iv)
+
+                delta, gamma, vega, theta, rho = blackscholes_greeks(iscall, ulprice, 100.0, 0.25, 0.02, 0.3)
+
+                self.assertAlmostEqual((px(ul=ulprice + h) - px(ul=ulprice - h)) / (2 * h), delta, 6)
+                self.assertAlmostEqual((px(ul=ulprice + 0.001) - 2 * px() + px(ul=ulprice - 0.001)) / 0.000001,
+                                       gamma, 4)
+                self.assertAlmostEqual((px(iv=0.3 + h) - px(iv=0.3 - h)) / (2 * h), vega, 4)
+                self.assertAlmostEqual(-(px(t=0.25 + h) - px(t=0.25 - h)) / (2 * h), theta, 4)
+                self.assertAlmostEqual((px(rfr=0.02 + h) - px(rfr=0.02 - h)) / (2 * h), rho, 4)
+
+        # Put-call parity: C - P = S - K * exp(-rT)
+        self.assertAlmostEqual(blackscholes(1, 105, 100, 0.5, 0.03, 0.25) - blackscholes(0, 105, 100, 0.5, 0.03, 0.25),
+                               105 - 100 * np.exp(-0.03 * 0.5), 10)
+
+    def test_price_greeks(self):
+        result = blackscholes_price_greeks(1, 105, 100, 0.5, 0.03, 0.25)
+        self.assertEqual(blackscholes(1, 105, 100, 0.5, 0.03, 0.25), result[0])
+        self.assertEqual(blackscholes_greeks(1, 105, 100, 0.5, 0.03, 0.25), result[1:])
 
         # TODO: check why ATM delta != 0.5 !!!
         # self.assertEqual(-0.5, blackscholes_greeks(0, 100, 100, 0.23, 0, 0.1))
         # self.assertEqual(0.5, blackscholes_greeks(1, 100, 100, 0.23, 0, 0.1))
+
+    def test_blackscholes_array(self):
+        iscall = [1, 0, 1, 0, 1, 0]
+        ulprice = [100, 100, 110, 110, 90, 90]
+        toexpiry = [0.1, 0.1, 0.5, 0.5, 0, 0]
+
+        prices = blackscholes_array(iscall, ulprice, 100, toexpiry, 0.01, 0.2)
+        self.assertEqual(np.float64, prices.dtype)
+        self.assertEqual(6, len(prices))
+        for i in range(6):
+            self.assertEqual(blackscholes(iscall[i], ulprice[i], 100, toexpiry[i], 0.01, 0.2), prices[i])
+
+        # Expiration payoff
+        self.assertEqual(0.0, prices[4])
+        self.assertEqual(10.0, prices[5])
+
+        # Scalars are allowed
+        self.assertEqual(1, len(blackscholes_array(1, 100, 100, 0.1, 0.01, 0.2)))
+        self.assertEqual(0, len(blackscholes_array([], [], [], [], [], [])))
+
+    def test_blackscholes_greeks_array(self):
+        iscall = [1, 0, 1, 0]
+        ulprice = [100, 100, 110, 110]
+        toexpiry = [0.1, 0.1, 0.5, 0.5]
+        greeks = blackscholes_greeks_array(iscall, ulprice, 100, toexpiry, 0.01, 0.2)
+        self.assertEqual(5, len(greeks))
+
+        for i in range(4):
+            self.assertEqual(blackscholes_greeks(iscall[i], ulprice[i], 100, toexpiry[i], 0.01, 0.2),
+                             tuple(g[i] for g in greeks))
+
+        delta, gamma, vega, theta, rho = blackscholes_greeks_array([1, 1, 0, 0], [110, 90, 90, 110], 100, 0, 0, 0.1)
+        self.assertEqual([1, 0, -1, 0], list(delta))
+        self.assertEqual([0, 0, 0, 0], list(gamma))
+        self.assertEqual([0, 0, 0, 0], list(vega))
+        self.assertEqual([0, 0, 0, 0], list(theta))
+        self.assertEqual([0, 0, 0, 0], list(rho))
+
+        price, delta, gamma, vega, theta, rho = blackscholes_price_greeks_array(iscall, ulprice, 100, toexpiry, 0.01,
+                                                                                0.2)
+        self.assertEqual(list(blackscholes_array(iscall, ulprice, 100, toexpiry, 0.01, 0.2)), list(price))
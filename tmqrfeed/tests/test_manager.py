@@ -8,6 +8,7 @@ from tmqrfeed.manager import DataManager
 from tmqrfeed.chains import *
 from tmqrfeed.position import Position
 from tmqrfeed.costs import Costs
+import numpy as np
 import pytz
 from tmqrfeed.assetsession import AssetSession
 from tmqrfeed.instrumentinfo import InstrumentInfo
@@ -554,6 +555,22 @@ class DataManagerTestCase(unittest.TestCase):
         self.assertRaises(ArgumentError, dm.chains_options_get, "T.TEST", datetime.datetime(2011, 1, 1), error_limit=0)
         self.assertRaises(ArgumentError, dm.chains_options_get, "T.TEST", datetime.datetime(2011, 1, 1), error_limit=-1)
 
+
+    def test_chains_options_get_prefetch(self):
+        self.assertRaises(ArgumentError, DataManager, options_prefetch='wrong')
+
+        for options_prefetch, call_count, background in [(None, 0, None), ('sync', 1, False),
+                                                         ('background', 1, True)]:
+            dm = DataManager(options_prefetch=options_prefetch)
+            with patch('tmqrfeed.manager.DataManager.chains_futures_get') as mock_chains_futures_get, \
+                    patch('tmqrfeed.datafeed.DataFeed.get_option_chains') as mock_get_option_chains, \
+                    patch('tmqrfeed.datafeed.DataFeed.prefetch_option_chain') as mock_prefetch:
+                fut, chain = dm.chains_options_get("TEST", datetime.datetime(2011, 1, 1))
+                self.assertEqual(mock_get_option_chains.return_value.find.return_value, chain)
+                self.assertEqual(call_count, mock_prefetch.call_count)
+                if call_count > 0:
+                    self.assertEqual((chain,), mock_prefetch.call_args[0])
+                    self.assertEqual({'background': background}, mock_prefetch.call_args[1])
     def test_chains_get_option_offset_skipped(self):
         def mock_opt_chain_find_sideeffect(date, opt_offset, **kwargs):
             return (opt_offset, kwargs.get('min_days', -1))
@@ -619,20 +636,28 @@ class DataManagerTestCase(unittest.TestCase):
         px_data = (1, 2)
 
         dm._price_set_cached(opt, dt, px_data)
-        self.assertTrue(opt not in dm._cache_single_price)
+        self.assertTrue((opt, dt) not in dm._cache_single_price)
 
         dm._price_set_cached(fut, dt, px_data)
-        self.assertTrue(fut in dm._cache_single_price)
-        self.assertEqual(px_data, dm._cache_single_price[fut][dt])
+        self.assertTrue((fut, dt) in dm._cache_single_price)
+        self.assertEqual(px_data, dm._cache_single_price[(fut, dt)])
 
         dm._price_set_cached(stk, dt, px_data)
-        self.assertTrue(stk in dm._cache_single_price)
-        self.assertEqual(px_data, dm._cache_single_price[stk][dt])
+        self.assertTrue((stk, dt) in dm._cache_single_price)
+        self.assertEqual(px_data, dm._cache_single_price[(stk, dt)])
 
         self.assertEqual((None, None), dm._price_get_cached(opt, dt))
         self.assertEqual(px_data, dm._price_get_cached(fut, dt))
         self.assertEqual(px_data, dm._price_get_cached(stk, dt))
 
+        # Cache size is bounded by settings
+        dm = DataManager(cache_settings={'single_price': {'max_entries': 1}})
+        dm._price_set_cached(fut, dt, px_data)
+        dm._price_set_cached(stk, dt, px_data)
+        self.assertEqual((None, None), dm._price_get_cached(fut, dt))
+        self.assertEqual(px_data, dm._price_get_cached(stk, dt))
+        self.assertEqual(1, dm.cache['single_price'].evictions)
+
     def test__price_get_positions_cached(self):
         dm = DataManager()
         dm._primary_positions = None
@@ -715,6 +740,44 @@ class DataManagerTestCase(unittest.TestCase):
                         self.assertRaises(AssetExpiredError, dm.price_get, fut, dt)
 
 
+    def test_price_get_many(self):
+        with patch('tmqrfeed.manager.DataManager._price_get_positions_cached') as mock__price_get_positions_cached:
+            with patch('tmqrfeed.datafeed.DataFeed.get_raw_prices_many') as mock_get_raw_prices_many:
+                dm = DataManager()
+                dm.session_set(session_instance=AssetSession([{
+                    'decision': '10:40', 'dt': datetime.datetime(1900, 1, 1), 'execution': '10:45', 'start': '00:32'
+                }], pytz.timezone('US/Pacific')))
+                stk = ContractBase('US.S.AAPL', datamanager=dm)
+                fut = FutureContract('US.F.CL.G12.120120', datamanager=dm)
+                fut2 = FutureContract('US.F.CL.H12.120220', datamanager=dm)
+                dt = datetime.datetime(2011, 1, 1)
+
+                mock__price_get_positions_cached.side_effect = lambda a, d: (1, 1) if a is stk else (None, None)
+                dm._price_set_cached(fut2, dt, (2, 2))
+                mock_get_raw_prices_many.return_value = {'US.F.CL.G12.120120': [3, 4]}
+
+                self.assertEqual([(1, 1), (3, 4), (2, 2)], dm.price_get_many([stk, fut, fut2], dt,
+                                                                             source_type=SRC_INTRADAY,
+                                                                             data_options_use_prev_date=False))
+                self.assertEqual(1, mock_get_raw_prices_many.call_count)
+                self.assertEqual(['US.F.CL.G12.120120'], mock_get_raw_prices_many.call_args[0][0])
+                self.assertEqual(SRC_INTRADAY, mock_get_raw_prices_many.call_args[1]['source_type'])
+                self.assertEqual([dm.session_get().get(dt)[1], dm.session_get().get(dt)[2]],
+                                 mock_get_raw_prices_many.call_args[1]['dt_list'])
+                # Prices are cached
+                self.assertEqual((3, 4), dm._price_get_cached(fut, dt))
+
+                # Missing quotes
+                mock_get_raw_prices_many.reset_mock()
+                mock_get_raw_prices_many.return_value = {}
+                result = dm.price_get_many([fut, stk], datetime.datetime(2011, 1, 2), source_type=SRC_INTRADAY,
+                                           data_options_use_prev_date=False)
+                self.assertTrue(np.isnan(result[0][0]) and np.isnan(result[0][1]))
+                self.assertEqual((1, 1), result[1])
+
+                # Asset expired error
+                self.assertRaises(AssetExpiredError, dm.price_get_many, [FutureContract('US.F.CL.G12.100120')], dt)
+
     def test_costs_set_get(self):
         dm = DataManager()
         stk = ContractBase('US.S.AAPL', datamanager=dm)
@@ -731,6 +794,10 @@ class DataManagerTestCase(unittest.TestCase):
 
         self.assertRaises(CostsNotFoundError, dm.costs_get, stk2, 10)
 
+        # Costs are not cached data
+        dm.cache.clear()
+        self.assertEqual(cst.calc_costs(stk, 10), dm.costs_get(stk, 10))
+
     def test_quotes(self):
         dm = DataManager()
 
@@ -838,6 +905,34 @@ class DataManagerTestCase(unittest.TestCase):
         self.assertEqual(qdata.index[0], datetime.datetime(2011, 2, 1))
         self.assertEqual(qdata.index[-1], datetime.datetime(2011, 4, 10))
 
+    def test_set_quotes_range__cached_view(self):
+        dm = DataManager()
+
+        data = pd.DataFrame({'c': np.arange(100.0)},
+                            index=pd.date_range(start=datetime.datetime(2011, 1, 1), periods=100))
+        dm._primary_quotes = data
+        self.assertEqual((0, 100), dm.quotes_range_offsets())
+
+        dm.quotes_range_set(datetime.datetime(2011, 1, 5), datetime.datetime(2011, 2, 1, 12))
+        qdata = dm.quotes()
+        self.assertTrue(qdata is dm.quotes())
+        self.assertTrue(qdata.equals(data.ix[datetime.datetime(2011, 1, 5):datetime.datetime(2011, 2, 1, 12)]))
+        self.assertEqual((4, 32), dm.quotes_range_offsets())
+
+        # Quotes range change invalidates the view
+        dm.quotes_range_set(range_end=datetime.datetime(2011, 1, 10))
+        self.assertEqual(10, len(dm.quotes()))
+        self.assertEqual((0, 10), dm.quotes_range_offsets())
+
+        # Quotes change invalidates the view
+        dm._primary_quotes = data.iloc[5:]
+        self.assertEqual(5, len(dm.quotes()))
+        self.assertEqual(datetime.datetime(2011, 1, 6), dm.quotes().index[0])
+
+        dm.quotes_range_set(datetime.datetime(2012, 1, 1))
+        self.assertEqual(0, len(dm.quotes()))
+        self.assertEqual((95, 95), dm.quotes_range_offsets())
+
     def test_session_set_instrument(self):
         with patch('tmqrfeed.datafeed.DataFeed.get_instrument_info') as mock_get_instrument_info:
             dm = DataManager()
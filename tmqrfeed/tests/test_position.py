@@ -7,6 +7,7 @@ from tmqr.errors import *
 from tmqrfeed.contracts import *
 from tmqrfeed.manager import DataManager
 from tmqrfeed.position import Position, PositionReadOnlyView
+from tmqrfeed.fast_option_pricing import blackscholes_greeks_array
 import pandas as pd
 import numpy as np
 import pickle
@@ -1002,9 +1003,12 @@ class PositionTestCase(unittest.TestCase):
             opt2: (301, 302, -4.0)
         }
         positions[datetime(2011, 1, 3)] = {fut: (102, 103, 1.0), opt1: (202, 203, 0.0)}
+        for asset in (fut, opt1, opt2):
+            asset.point_value = 1.0
 
         dm = MagicMock(DataManager())
         dm.price_get.return_value = (501, 502)
+        dm.costs_get_array.side_effect = lambda asset, qty: -np.abs(qty)
 
         p = Position(dm, position_dict=positions)
         df = p.get_pnl_series()
@@ -1024,6 +1028,64 @@ class PositionTestCase(unittest.TestCase):
         self.assertTrue(np.all(df['equity_decision'] == df['pnl_change_decision'].cumsum()))
         self.assertTrue(np.all(df['equity_execution'] == df['pnl_change_execution'].cumsum()))
 
+        self.assertEqual([-2, -6, -803], list(df['pnl_change_decision']))
+        self.assertEqual([-2, -6, -803], list(df['pnl_change_execution']))
+        self.assertEqual([-2, -8, -7], list(df['costs']))
+        self.assertEqual([2, 1, 0], list(df['ncontracts_executed']))
+        self.assertEqual([1, 1, 1], list(df['ncontracts_trades']))
+        self.assertEqual([0, 7, 7], list(df['noptions_executed']))
+        self.assertEqual([0, 2, 2], list(df['noptions_trades']))
+
+        # Closed asset record is added to the position
+        self.assertEqual((501, 502, 0.0), positions[datetime(2011, 1, 3)][opt2])
+
+    def test_get_pnl_series_incremental(self):
+        dm = MagicMock(DataManager())
+        dm.costs_get_array.side_effect = lambda asset, qty: -np.abs(qty)
+        dm.price_get.return_value = (104, 105)
+
+        fut = ContractBase("US.S.AAPL", dm)
+        fut._point_value = 1.0
+        dates = [datetime(2011, 1, i) for i in range(1, 6)]
+
+        p = Position(dm)
+        p_full = Position(dm)
+        for i, dt in enumerate(dates):
+            for pos in (p, p_full):
+                pos.set_net_position(dt, {fut: (100 + i, 101 + i, 1.0 + i % 2)})
+            df = p.get_pnl_series()
+            # All dates except the last one are stored in the ledger
+            self.assertEqual(i, len(p._pnl_ledger))
+
+        # The last date could be changed after the PnL calculation
+        p.add_net_position(dates[-1], {fut: (104, 105, 1.0)})
+        p_full.add_net_position(dates[-1], {fut: (104, 105, 1.0)})
+
+        with patch('tmqrfeed.position.Position._calc_transactions_columnar',
+                   wraps=p._calc_transactions_columnar) as mock_calc:
+            df = p.get_pnl_series()
+            self.assertEqual(dates[-2:], mock_calc.call_args[0][0])
+
+        df_full = Position(dm, position_dict=p_full._position).get_pnl_series()
+        self.assertTrue(np.allclose(df_full.values, df.values))
+        self.assertEqual(list(df_full.index), list(df.index))
+        self.assertEqual([-1, 0, 1, 0, 2], list(df['pnl_change_decision']))
+
+        df_since = p.get_pnl_series(since=dates[3])
+        self.assertEqual(dates[3:], list(df_since.index))
+        self.assertEqual(list(df['equity_decision'])[3:], list(df_since['equity_decision']))
+
+        # Ledger is serialized with the position
+        p2 = Position.deserialize(p.serialize(), dm)
+        self.assertTrue(np.allclose(p._pnl_ledger.values, p2._pnl_ledger.values))
+
+        # Ledger which doesn't match the position dates is ignored
+        p2._pnl_ledger.index = [datetime(2010, 1, i) for i in range(1, 5)]
+        self.assertTrue(np.allclose(df.values, p2.get_pnl_series().values))
+
+        p.reset_pnl_ledger()
+        self.assertEqual(None, p._pnl_ledger)
+
     def test_almost_expired_ratio(self):
         dm = MagicMock(DataManager())
         dm.price_get.return_value = (1.0, 2.0)
@@ -1237,6 +1299,70 @@ class PositionTestCase(unittest.TestCase):
                          1 * 1 + 1 * 3 + -1 * -4
                          )
 
+    def test_get_greeks_series(self):
+        dm = MagicMock(DataManager())
+        positions = OrderedDict()
+        fut = MagicMock(ContractBase("US.S.AAPL"))
+        fut.ctype = 'F'
+        fut.delta.return_value = 1.0
+
+        def make_option(ctype, ul_px):
+            opt = MagicMock()
+            opt.ctype = ctype
+            opt.strike = 100.0
+            opt.to_expiration_days.return_value = 30
+            opt.to_expiration_years_from_days.side_effect = lambda d: d / 365.0
+            opt.get_pricing_context.side_effect = lambda dt: (dt, ul_px, ul_px, 0.2, 0.2, 0.01)
+            return opt
+
+        opt1 = make_option('C', 101.0)
+        opt2 = make_option('P', 99.0)
+        opt_no_quotes = make_option('P', 99.0)
+        opt_no_quotes.get_pricing_context.side_effect = QuoteNotFoundError()
+
+        positions[datetime(2011, 1, 2)] = {
+            fut: (101, 102, 1.0),
+            opt1: (201, 202, 3.0),
+            opt2: (301, 302, -4.0)
+        }
+        positions[datetime(2011, 1, 3)] = {
+            fut: (101, 102, 2.0),
+            opt1: (201, 202, 0.0),
+        }
+        positions[datetime(2011, 1, 4)] = {
+            fut: (101, 102, 2.0),
+            opt_no_quotes: (201, 202, 1.0),
+        }
+
+        p = Position(dm, positions)
+
+        dates = [datetime(2011, 1, 1), datetime(2011, 1, 2), datetime(2011, 1, 3), datetime(2011, 1, 4)]
+        greeks = p.get_greeks_series(dates)
+        self.assertEqual(['delta', 'gamma', 'vega', 'theta', 'rho'], list(greeks.columns))
+        self.assertEqual(dates, list(greeks.index))
+
+        exp_greeks1 = blackscholes_greeks_array(1, 101.0, 100.0, 30 / 365.0, 0.01, 0.2)
+        exp_greeks2 = blackscholes_greeks_array(0, 99.0, 100.0, 30 / 365.0, 0.01, 0.2)
+
+        # No position
+        self.assertEqual([0.0, 0.0, 0.0, 0.0, 0.0], list(greeks.loc[datetime(2011, 1, 1)]))
+
+        for i, name in enumerate(['delta', 'gamma', 'vega', 'theta', 'rho']):
+            self.assertAlmostEqual((1.0 if name == 'delta' else 0.0) + exp_greeks1[i][0] * 3 - exp_greeks2[i][0] * 4,
+                                   greeks.at[datetime(2011, 1, 2), name])
+
+        # Zero qty is skipped
+        self.assertEqual([2.0, 0.0, 0.0, 0.0, 0.0], list(greeks.loc[datetime(2011, 1, 3)]))
+
+        # Quotes not found
+        self.assertEqual([0.0, 0.0, 0.0, 0.0, 0.0], list(greeks.loc[datetime(2011, 1, 4)]))
+
+        # All position dates by default
+        self.assertEqual(dates[1:], list(p.get_greeks_series().index))
+
+        # Net position greeks
+        self.assertEqual(greeks.loc[datetime(2011, 1, 2)].to_dict(), p.get_greeks(datetime(2011, 1, 2)))
+
     def test_last_transaction_date(self):
         import pytz
         tz = pytz.UTC
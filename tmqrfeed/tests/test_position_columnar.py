@@ -0,0 +1,106 @@
+import unittest
+from collections import OrderedDict
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from tmqr.errors import *
+from tmqrfeed.contracts import ContractBase
+from tmqrfeed.costs import Costs
+from tmqrfeed.manager import DataManager
+from tmqrfeed.position import Position
+from tmqrfeed.position_columnar import PositionColumnar
+
+
+class PositionColumnarTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dm = MagicMock(DataManager())
+        costs = Costs(per_contract=1.0, per_option=0.5)
+        self.dm.costs_get.side_effect = costs.calc_costs
+        self.dm.costs_get_array.side_effect = costs.calc_costs_array
+
+        self.fut = ContractBase("US.S.AAPL", self.dm)
+        self.fut.ctype = 'F'
+        self.fut._point_value = 2.0
+
+        self.opt = ContractBase("US.C.AAPL", self.dm)
+        self.opt.ctype = 'C'
+        self.opt._point_value = 1.0
+
+        def price_get(asset, date):
+            if asset is self.opt:
+                raise QuoteNotFoundError()
+            return 501, 502
+
+        self.dm.price_get.side_effect = price_get
+
+    def test_append(self):
+        pc = PositionColumnar(capacity=1)
+        pc.append(datetime(2011, 1, 1), {self.fut: (100, 101, 2)})
+        pc.append(datetime(2011, 1, 2), {})
+        pc.append(datetime(2011, 1, 3), {self.fut: (102, 103, 1), self.opt: (10, 11, 3)})
+
+        self.assertEqual(3, len(pc))
+        self.assertEqual([self.fut, self.opt], pc.assets)
+        self.assertEqual([0, 2, 2], list(pc._date_idx[:3]))
+        self.assertEqual([0, 0, 1], list(pc._asset_idx[:3]))
+        self.assertEqual([2, 1, 3], list(pc._qty[:3]))
+
+        self.assertRaises(ArgumentError, pc.append, datetime(2011, 1, 3), {})
+
+        pc2 = PositionColumnar.from_position_dict(OrderedDict([(datetime(2011, 1, 1), {self.fut: (100, 101, 2)}),
+                                                               (datetime(2011, 1, 2), {}),
+                                                               (datetime(2011, 1, 3), {self.fut: (102, 103, 1),
+                                                                                       self.opt: (10, 11, 3)})]))
+        self.assertEqual(pc.dates, pc2.dates)
+        self.assertEqual(list(pc._dpx[:3]), list(pc2._dpx[:3]))
+
+    def test_calc_transactions_equals_position_calc_transactions(self):
+        def position_dict():
+            return OrderedDict([
+                (datetime(2011, 1, 1), {self.fut: (100, 101, 2), self.opt: (10, 11, -1)}),
+                (datetime(2011, 1, 2), {self.fut: (101, 102, 3)}),
+                (datetime(2011, 1, 3), {self.opt: (12, 13, 1)}),
+                (datetime(2011, 1, 4), {}),
+                (datetime(2011, 1, 5), {self.fut: (104, 105, -1)}),
+            ])
+
+        # Reference transactions
+        pos = Position(self.dm, position_dict=position_dict())
+        expected = []
+        prev_pos = None
+        for dt, pos_rec in pos._position.items():
+            for asset, trans in pos._calc_transactions(dt, pos_rec, prev_pos).items():
+                expected.append((dt, asset.ticker, trans))
+            prev_pos = pos_rec
+
+        pos_dict = position_dict()
+        pc = PositionColumnar.from_position_dict(pos_dict)
+        transactions, closed_records = pc.calc_transactions(self.dm)
+
+        # Futures closed on 2011-01-03, option is not closed on 2011-01-04 (QuoteNotFoundError)
+        self.assertEqual([(datetime(2011, 1, 3), self.fut, (501, 502, 0.0))], closed_records)
+
+        result = []
+        for i in range(len(transactions['date_idx'])):
+            result.append((pc.dates[transactions['date_idx'][i]], pc.assets[transactions['asset_idx'][i]].ticker,
+                           tuple(transactions[k][i] for k in ('decision_px', 'exec_px', 'qty', 'pnl_decision',
+                                                              'pnl_execution', 'costs', 'pos_action'))))
+        self.assertEqual(sorted(expected), sorted(result))
+
+    def test_get_transaction_series(self):
+        pos = Position(self.dm, position_dict=OrderedDict([
+            (datetime(2011, 1, 1), {self.fut: (100, 101, 2)}),
+            (datetime(2011, 1, 2), {self.fut: (101, 102.5, 2)}),
+            (datetime(2011, 1, 3), {self.fut: (102, 103, -1)}),
+        ]))
+        self.dm.instrument_info_get.return_value.ticksize = 0.5
+
+        df = pos.get_transaction_series()
+        self.assertEqual([datetime(2011, 1, 1), datetime(2011, 1, 3)], list(df.index))
+        self.assertEqual([2, -3], list(df['qty']))
+        self.assertEqual([1, -1], list(df['pos_action']))
+        self.assertEqual([-2, -3], list(df['costs']))
+        self.assertEqual([202, 206], list(df['execution_px_ticks']))
+        self.assertEqual([self.fut, self.fut], list(df['asset']))
@@ -181,3 +181,32 @@ class CompressDailyOHLCVCythonizedTestCase(unittest.TestCase):
         self.assertEqual(row['c'], 97.44)
         self.assertEqual(row['v'], 150482)
         self.assertEqual(row['exec'], 97.39)
+
+    def test_compress_session_change(self):
+        df = pd.read_csv(os.path.abspath(os.path.join(__file__, '../', 'fut_series_for_contfut1.csv.gz')),
+                         parse_dates=True, index_col=0, compression='gzip')
+        df.index = df.index.tz_localize(pytz.utc).tz_convert(self.tz)
+        sess = AssetSession([
+            {'decision': '10:40', 'dt': datetime(1900, 1, 1), 'execution': '10:45', 'start': '00:32'},
+            {'decision': '11:40', 'dt': datetime(2012, 1, 5), 'execution': '11:45', 'start': '01:30'},
+        ], self.tz)
+        asset_mock = MagicMock(ContractBase("US.S.GOOG"))
+
+        comp_df, holdings = compress_daily(DataFrameGetter(df), asset_mock, sess, decision_time_shift=2)
+
+        self.assertEqual(['c', 'exec', 'h', 'l', 'o', 'v'], list(comp_df.columns))
+        self.assertEqual(list(comp_df.index), list(holdings._position.keys()))
+
+        for dt, row in comp_df.iterrows():
+            exp_start, exp_decision, exp_exec, _ = sess.get(dt.replace(tzinfo=None), 2)
+            self.assertEqual(exp_decision, dt)
+
+            day_df = df[(df.index >= exp_start) & (df.index <= exp_exec)]
+            dec_df = day_df[day_df.index <= exp_decision]
+            self.assertEqual(day_df['o'][0], row['o'])
+            self.assertEqual(dec_df['h'].max(), row['h'])
+            self.assertEqual(dec_df['l'].min(), row['l'])
+            self.assertEqual(dec_df['c'][-1], row['c'])
+            self.assertAlmostEqual(dec_df['v'].sum(), row['v'])
+            self.assertEqual(day_df['c'][-1], row['exec'])
+            self.assertEqual({asset_mock: (row['c'], row['exec'], 1)}, holdings._position[dt])
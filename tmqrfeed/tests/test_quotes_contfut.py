@@ -8,6 +8,9 @@ pyximport.install(setup_args={"include_dirs": np.get_include()})
 import unittest
 from tmqrfeed.quotes.quote_contfut import QuoteContFut
 from unittest.mock import MagicMock
+from unittest import mock
+import shutil
+import tempfile
 import pandas as pd
 import os
 import pytz
@@ -232,6 +235,165 @@ class QuoteContFutTestCase(unittest.TestCase):
 
 
 
+    def test_build_bulk_series_get(self):
+        fut1 = MagicMock(ContractBase("US.F.Fut1"))
+        fut1.ticker = 'US.F.Fut1'
+        fut2 = MagicMock(ContractBase("US.F.Fut2"))
+        fut2.ticker = 'US.F.Fut2'
+        fut3 = MagicMock(ContractBase("US.F.Fut3"))
+        fut3.ticker = 'US.F.Fut3'
+        fut_late = MagicMock(ContractBase("US.F.FutLate"))
+        fut_late.ticker = 'US.F.FutLate'
+
+        dm = MagicMock()
+        dm.session_get.return_value = self.sess
+        dm.datafeed.get_fut_chain.return_value.get_list.return_value = [
+            (fut1, datetime(2011, 12, 1).date(), datetime(2012, 1, 18).date()),
+            (fut2, datetime(2012, 1, 18).date(), datetime(2012, 2, 20).date()),
+            (fut3, datetime(2012, 2, 20).date(), datetime(2012, 3, 20).date()),
+            (fut_late, datetime(2013, 2, 20).date(), datetime(2013, 3, 20).date()),
+        ]
+        # fut3 has no quotes in the DB
+        dm.series_get_many.side_effect = lambda ranges: {c.ticker: s for c, s in
+                                                         zip([fut1, fut2], [self.series1, self.series2])
+                                                         if c in [r[0] for r in ranges]}
+
+        qcf = QuoteContFut('US.CL', datamanager=dm, timeframe='D',
+                           date_start=datetime(2011, 12, 10), date_end=datetime(2012, 3, 1), bulk_size=2)
+        df, position = qcf.build()
+
+        self.assertEqual(2, dm.series_get_many.call_count)
+        self.assertEqual([(fut1, datetime(2011, 12, 10).date(), datetime(2012, 1, 18).date()),
+                          (fut2, datetime(2012, 1, 18).date(), datetime(2012, 2, 20).date())],
+                         dm.series_get_many.call_args_list[0][0][0])
+        self.assertEqual([(fut3, datetime(2012, 2, 20).date(), datetime(2012, 3, 1).date())],
+                         dm.series_get_many.call_args_list[1][0][0])
+
+        self.assertTrue(df.index.is_monotonic_increasing)
+        self.assertEqual(datetime(2011, 12, 19).date(), df.index[0].date())
+        self.assertEqual(datetime(2012, 2, 20).date(), df.index[-1].date())
+
+        self.assertRaises(ArgumentError, QuoteContFut, 'US.CL', datamanager=dm, timeframe='D', bulk_size=0)
+
+    def _make_incremental_build_dm(self):
+        fut1 = MagicMock(ContractBase("US.F.Fut1"))
+        fut1.ticker = 'US.F.Fut1'
+        fut2 = MagicMock(ContractBase("US.F.Fut2"))
+        fut2.ticker = 'US.F.Fut2'
+
+        dm = MagicMock()
+        dm.session_get.return_value = self.sess
+        dm.datafeed.data_engine.engine_id = 'DataEngineMongo:localhost/tmldb_test'
+        dm.datafeed.get_fut_chain.return_value.get_list.return_value = [
+            (fut1, datetime(2011, 12, 1).date(), datetime(2012, 1, 18).date()),
+            (fut2, datetime(2012, 1, 18).date(), datetime(2012, 3, 20).date()),
+        ]
+
+        def series_get_many(ranges):
+            result = {}
+            for c, d_start, d_end in ranges:
+                s = {'US.F.Fut1': self.series1, 'US.F.Fut2': self.series2}[c.ticker]
+                s_dates = s.index.tz_convert('UTC').date
+                result[c.ticker] = s[(s_dates >= d_start) & (s_dates <= d_end)].copy()
+            return result
+
+        dm.series_get_many.side_effect = series_get_many
+        return dm, fut1, fut2
+
+    def test_build_incremental(self):
+        dm, fut1, fut2 = self._make_incremental_build_dm()
+
+        full_df, full_position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=None,
+                                              date_start=datetime(2011, 12, 10),
+                                              date_end=datetime(2012, 3, 1)).build()
+
+        for prev_date_end in [datetime(2012, 1, 10), datetime(2012, 1, 18), datetime(2012, 1, 19),
+                              datetime(2012, 2, 10)]:
+            prev_df, prev_position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=None,
+                                                  date_start=datetime(2011, 12, 10),
+                                                  date_end=prev_date_end).build()
+            dm.series_get_many.reset_mock()
+            df, position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=None,
+                                        date_start=datetime(2011, 12, 10),
+                                        date_end=datetime(2012, 3, 1),
+                                        prev_series=prev_df, prev_position=prev_position).build()
+
+            self.assertTrue(full_df.equals(df), f'prev_date_end: {prev_date_end}')
+            self.assertEqual(list(full_position._position.keys()), list(position._position.keys()))
+            for dt, pos_rec in full_position._position.items():
+                self.assertEqual({a.ticker: v for a, v in pos_rec.items()},
+                                 {a.ticker: v for a, v in position._position[dt].items()})
+
+            # Only contracts active since the last day of the previous build are requested
+            requested = [r[0] for call in dm.series_get_many.call_args_list for r in call[0][0]]
+            if prev_date_end > datetime(2012, 1, 19):
+                self.assertEqual([fut2], requested)
+
+        self.assertRaises(ArgumentError, QuoteContFut, 'US.CL', datamanager=dm, timeframe='D', prev_series=full_df)
+
+    def test_build_incremental_cache(self):
+        dm, fut1, fut2 = self._make_incremental_build_dm()
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with mock.patch('tmqrfeed.position.ContractBase.deserialize') as mock_deserialize:
+                mock_deserialize.side_effect = lambda tckr, datamanager: {'US.F.Fut1': fut1,
+                                                                          'US.F.Fut2': fut2}[tckr]
+
+                prev_df, prev_position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=cache_dir,
+                                                      date_start=datetime(2011, 12, 10),
+                                                      date_end=datetime(2012, 2, 10)).build()
+                dm.series_get_many.reset_mock()
+                df, position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=cache_dir,
+                                            date_start=datetime(2011, 12, 10),
+                                            date_end=datetime(2012, 3, 1)).build()
+                self.assertEqual([fut2], [r[0] for r in dm.series_get_many.call_args[0][0]])
+                self.assertEqual(datetime(2012, 2, 20).date(), df.index[-1].date())
+                self.assertEqual(datetime(2011, 12, 19).date(), df.index[0].date())
+
+                # Cached build is later than requested 'date_end' - full rebuild
+                dm.series_get_many.reset_mock()
+                QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=cache_dir,
+                             date_start=datetime(2011, 12, 10),
+                             date_end=datetime(2012, 2, 1)).build()
+                self.assertEqual([fut1, fut2], [r[0] for r in dm.series_get_many.call_args[0][0]])
+
+                # Shorter build must not overwrite the longer cached history
+                dm.series_get_many.reset_mock()
+                df, position = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=cache_dir,
+                                            date_start=datetime(2011, 12, 10),
+                                            date_end=datetime(2012, 3, 1)).build()
+                self.assertEqual([fut2], [r[0] for r in dm.series_get_many.call_args[0][0]])
+                self.assertEqual(datetime(2012, 2, 20).date(), df.index[-1].date())
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_build_incremental_cache_disabled_by_default(self):
+        dm, fut1, fut2 = self._make_incremental_build_dm()
+        qcont_fut = QuoteContFut('US.CL', datamanager=dm, timeframe='D')
+        self.assertEqual(None, qcont_fut.cache_dir)
+        self.assertEqual(None, qcont_fut._get_cache_path(self.sess))
+
+    def test_build_incremental_cache_path(self):
+        dm, fut1, fut2 = self._make_incremental_build_dm()
+        cache_dir = tempfile.mkdtemp()
+        try:
+            qcont_fut = QuoteContFut('US.CL', datamanager=dm, timeframe='D', cache_dir=cache_dir,
+                                     date_start=datetime(2011, 12, 10))
+            path = qcont_fut._get_cache_path(self.sess)
+            self.assertEqual(path, qcont_fut._get_cache_path(AssetSession(self.info_dic['trading_session'],
+                                                                          self.tz)))
+
+            # Other session
+            sess2 = AssetSession([{'decision': '11:40', 'dt': datetime(1900, 1, 1), 'execution': '11:45',
+                                   'start': '00:32'}], self.tz)
+            self.assertNotEqual(path, qcont_fut._get_cache_path(sess2))
+
+            # Other data engine
+            dm.datafeed.data_engine.engine_id = 'DataEngineMongo:localhost/tmldb_v2'
+            self.assertNotEqual(path, qcont_fut._get_cache_path(self.sess))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
     def test_build(self):
         dm = DataManager()
         dm.session_set('US.CL')
@@ -0,0 +1,204 @@
+import os
+import shutil
+import tempfile
+import time as systime
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from tmqr.errors import ArgumentError, IntradayQuotesNotFoundError
+from tmqrfeed.quotescache import QuotesDiskCache, IntradayPriceCache
+
+
+class QuotesDiskCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_init(self):
+        cache_dir = os.path.join(self.cache_dir, 'sub')
+        cache = QuotesDiskCache(cache_dir, 1000)
+        self.assertEqual(cache_dir, cache.cache_dir)
+        self.assertEqual(1000, cache.max_size)
+        self.assertEqual(0, cache.size)
+        self.assertTrue(os.path.exists(cache_dir))
+
+        self.assertRaises(ArgumentError, QuotesDiskCache, None, 1000)
+        self.assertRaises(ArgumentError, QuotesDiskCache, self.cache_dir, 0)
+
+    def test_init_existing_size(self):
+        cache = QuotesDiskCache(self.cache_dir, 1000)
+        cache.put('key1', b'1234')
+        cache.put('key2', b'123456')
+
+        self.assertEqual(10, QuotesDiskCache(self.cache_dir, 1000).size)
+
+    def test_put_get(self):
+        cache = QuotesDiskCache(self.cache_dir, 1000)
+        self.assertEqual(None, cache.get('key1'))
+
+        cache.put('key1', b'1234')
+        self.assertEqual(b'1234', cache.get('key1'))
+        self.assertEqual(4, cache.size)
+
+        # Overwrite
+        cache.put('key1', b'4321')
+        self.assertEqual(b'4321', cache.get('key1'))
+
+        # Shared cache dir
+        self.assertEqual(b'4321', QuotesDiskCache(self.cache_dir, 1000).get('key1'))
+
+    def test_get_max_age(self):
+        cache = QuotesDiskCache(self.cache_dir, 1000)
+        cache.put('key1', b'1234')
+        self.assertEqual(b'1234', cache.get('key1', max_age=100))
+
+        path = cache._get_path('key1')
+        os.utime(path, (systime.time(), systime.time() - 200))
+        self.assertEqual(None, cache.get('key1', max_age=100))
+        self.assertEqual(b'1234', cache.get('key1'))
+
+    def test_evict_lru(self):
+        cache = QuotesDiskCache(self.cache_dir, 10)
+        cache.put('key1', b'1234')
+        cache.put('key2', b'1234')
+        os.utime(cache._get_path('key1'), (systime.time() - 100, systime.time() - 100))
+        os.utime(cache._get_path('key2'), (systime.time() - 200, systime.time() - 200))
+
+        # key1 is used recently
+        self.assertEqual(b'1234', cache.get('key1'))
+
+        cache.put('key3', b'1234')
+        self.assertEqual(8, cache.size)
+        self.assertEqual(None, cache.get('key2'))
+        self.assertEqual(b'1234', cache.get('key1'))
+        self.assertEqual(b'1234', cache.get('key3'))
+
+    def test_clear(self):
+        cache = QuotesDiskCache(self.cache_dir, 1000)
+        cache.put('key1', b'1234')
+        cache.clear()
+        self.assertEqual(0, cache.size)
+        self.assertEqual(None, cache.get('key1'))
+
+    def test_put_overwrite_size(self):
+        cache = QuotesDiskCache(self.cache_dir, 1000)
+        cache.put('key1', b'1234')
+        cache.put('key1', b'123456')
+        self.assertEqual(6, cache.size)
+        self.assertEqual(6, QuotesDiskCache(self.cache_dir, 1000).size)
+
+    def test_evict_low_watermark(self):
+        cache = QuotesDiskCache(self.cache_dir, 20, low_watermark=0.5)
+        for i in range(5):
+            cache.put(f'key{i}', b'1234')
+            os.utime(cache._get_path(f'key{i}'), (systime.time() - 100 + i, systime.time() - 100 + i))
+
+        # 24 bytes > 20 -> evicted down to 10 bytes
+        cache.put('key5', b'1234')
+        self.assertEqual(8, cache.size)
+        self.assertEqual(None, cache.get('key3'))
+        self.assertEqual(b'1234', cache.get('key4'))
+        self.assertEqual(b'1234', cache.get('key5'))
+
+        with self.assertRaises(ArgumentError):
+            QuotesDiskCache(self.cache_dir, 20, low_watermark=0)
+
+    def test_is_intraday_day_cacheable(self):
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        cache = QuotesDiskCache(self.cache_dir, 1000, intraday_settle_days=0)
+        self.assertEqual(True, cache.is_intraday_day_cacheable(today - timedelta(days=1)))
+        self.assertEqual(False, cache.is_intraday_day_cacheable(today))
+        self.assertEqual(False, cache.is_intraday_day_cacheable(today + timedelta(days=1)))
+
+    def test_is_intraday_day_cacheable_settle_days(self):
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        cache = QuotesDiskCache(self.cache_dir, 1000, intraday_settle_days=2)
+        self.assertEqual(True, cache.is_intraday_day_cacheable(today - timedelta(days=3)))
+        self.assertEqual(False, cache.is_intraday_day_cacheable(today - timedelta(days=2)))
+        self.assertEqual(False, cache.is_intraday_day_cacheable(today - timedelta(days=1)))
+
+
+class IntradayPriceCacheTestCase(unittest.TestCase):
+    def make_arrays(self, date_start, date_end):
+        # Two bars per day: 10:00 and 20:00 UTC
+        days = np.arange(np.datetime64(date_start), np.datetime64(date_end) + 1).astype('datetime64[s]').view(np.int64)
+        epochs = np.sort(np.concatenate([days + 10 * 3600, days + 20 * 3600]))
+        return epochs, epochs.astype(np.float64)
+
+    def test_init(self):
+        cache = IntradayPriceCache(1000, 10)
+        self.assertEqual(1000, cache.max_size)
+        self.assertEqual(10, cache.chunk_days)
+        self.assertEqual(0, cache.size)
+
+        self.assertRaises(ArgumentError, IntradayPriceCache, 0, 10)
+        self.assertRaises(ArgumentError, IntradayPriceCache, 1000, 0)
+
+    def test_get_window(self):
+        cache = IntradayPriceCache(10 ** 6, 10)
+        loader = MagicMock(side_effect=lambda tckr, ds, de: self.make_arrays(ds, de))
+
+        epochs, close = cache.get_window('US.F.CL.Q12', date(2012, 1, 3), date(2012, 1, 4), loader)
+        self.assertEqual(4, len(epochs))
+        self.assertEqual(datetime(2012, 1, 3, 10), datetime.utcfromtimestamp(epochs[0]))
+        self.assertEqual(datetime(2012, 1, 4, 20), datetime.utcfromtimestamp(epochs[-1]))
+        self.assertEqual(list(epochs.astype(np.float64)), list(close))
+
+        # Chunks are aligned to the epoch
+        self.assertEqual(('US.F.CL.Q12', date(2012, 1, 1), date(2012, 1, 10)), loader.call_args[0])
+        self.assertEqual(1, loader.call_count)
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assertEqual(20 * 8 * 2, cache.size)
+
+        cache.get_window('US.F.CL.Q12', date(2012, 1, 5), date(2012, 1, 5), loader)
+        self.assertEqual(1, loader.call_count)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # Window across chunks
+        epochs, close = cache.get_window('US.F.CL.Q12', date(2012, 1, 10), date(2012, 1, 11), loader)
+        self.assertEqual(2, loader.call_count)
+        self.assertEqual(4, len(epochs))
+        self.assertTrue(np.all(np.diff(epochs) > 0))
+
+        # Missing data
+        loader.side_effect = IntradayQuotesNotFoundError()
+        epochs, close = cache.get_window('US.F.CL.U12', date(2012, 1, 5), date(2012, 1, 5), loader)
+        self.assertEqual(0, len(epochs))
+        cache.get_window('US.F.CL.U12', date(2012, 1, 5), date(2012, 1, 5), loader)
+        self.assertEqual(3, loader.call_count)
+
+        cache.clear()
+        self.assertEqual(0, cache.size)
+        self.assertEqual(0, len(cache))
+
+    def test_eviction(self):
+        # One chunk is 10 days * 2 bars * 16 bytes
+        cache = IntradayPriceCache(700, 10)
+        loader = MagicMock(side_effect=lambda tckr, ds, de: self.make_arrays(ds, de))
+
+        cache.get_window('US.F.CL.Q12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        cache.get_window('US.F.CL.U12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        self.assertEqual(2, len(cache))
+
+        # The least recently used is evicted
+        cache.get_window('US.F.CL.Q12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        cache.get_window('US.F.CL.V12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(640, cache.size)
+
+        cache.get_window('US.F.CL.Q12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        self.assertEqual(3, loader.call_count)
+        cache.get_window('US.F.CL.U12', date(2012, 1, 3), date(2012, 1, 3), loader)
+        self.assertEqual(4, loader.call_count)
+
+    def test_is_cacheable(self):
+        cache = IntradayPriceCache(1000, 10)
+        self.assertTrue(cache.is_cacheable(date(2012, 1, 3)))
+        self.assertFalse(cache.is_cacheable(datetime.utcnow().date()))
+        self.assertFalse(cache.is_cacheable(datetime.utcnow().date() + timedelta(days=20)))
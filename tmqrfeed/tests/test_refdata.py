@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tmqr.errors import ArgumentError, DataEngineNotFoundError
+from tmqrfeed.refdata import *
+
+
+class ReferenceDataStoreTestCase(unittest.TestCase):
+    def test_get(self):
+        store = ReferenceDataStore()
+        loader = MagicMock(return_value={'tckr': 'US.ES'})
+
+        value = store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', 1, loader)
+        self.assertEqual({'tckr': 'US.ES'}, value)
+        self.assertTrue(value is store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', 1, loader))
+        self.assertEqual(1, loader.call_count)
+        self.assertEqual(1, store.hits)
+        self.assertEqual(1, store.misses)
+
+        # Kinds are stored separately
+        store.get(REFDATA_CONTRACT_INFO, 'US.ES', 1, loader)
+        self.assertEqual(2, loader.call_count)
+        self.assertEqual(2, len(store))
+
+        # Version changed
+        store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', 2, loader)
+        self.assertEqual(3, loader.call_count)
+        store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', 2, loader)
+        self.assertEqual(3, loader.call_count)
+
+        self.assertRaises(ArgumentError, store.get, 'unknown', 'US.ES', 1, loader)
+
+        store.clear()
+        self.assertEqual(0, len(store))
+
+    def test_get_version_none_not_stored(self):
+        disk_dir = tempfile.mkdtemp()
+        try:
+            store = ReferenceDataStore(disk_dir)
+            loader = MagicMock(return_value={'tckr': 'US.ES'})
+
+            self.assertEqual({'tckr': 'US.ES'}, store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', None, loader))
+            store.get(REFDATA_INSTRUMENT_INFO, 'US.ES', None, loader)
+            self.assertEqual(2, loader.call_count)
+            self.assertEqual(0, len(store))
+            self.assertFalse(os.path.exists(os.path.join(disk_dir, REFDATA_INSTRUMENT_INFO)))
+        finally:
+            shutil.rmtree(disk_dir, ignore_errors=True)
+
+    def test_get_loader_error_not_cached(self):
+        store = ReferenceDataStore()
+        loader = MagicMock(side_effect=DataEngineNotFoundError())
+
+        self.assertRaises(DataEngineNotFoundError, store.get, REFDATA_CONTRACT_INFO, 'US.ES', 1, loader)
+        self.assertRaises(DataEngineNotFoundError, store.get, REFDATA_CONTRACT_INFO, 'US.ES', 1, loader)
+        self.assertEqual(2, loader.call_count)
+        self.assertEqual(0, len(store))
+
+    def test_get_disk(self):
+        disk_dir = tempfile.mkdtemp()
+        try:
+            store = ReferenceDataStore(disk_dir)
+            loader = MagicMock(return_value=['US.F.CL.Q12.120720'])
+            store.get(REFDATA_FUTURES_CHAIN, ('US.CL', None), 1, loader)
+            self.assertEqual(1, loader.call_count)
+            self.assertTrue(os.path.exists(os.path.join(disk_dir, REFDATA_FUTURES_CHAIN)))
+
+            # Other process store
+            store2 = ReferenceDataStore(disk_dir)
+            self.assertEqual(['US.F.CL.Q12.120720'],
+                             store2.get(REFDATA_FUTURES_CHAIN, ('US.CL', None), 1, loader))
+            self.assertEqual(1, loader.call_count)
+
+            # Disk entries of the old version are reloaded
+            loader.return_value = ['US.F.CL.U12.120820']
+            self.assertEqual(['US.F.CL.U12.120820'],
+                             store2.get(REFDATA_FUTURES_CHAIN, ('US.CL', None), 2, loader))
+            self.assertEqual(2, loader.call_count)
+
+            store3 = ReferenceDataStore(disk_dir)
+            self.assertEqual(['US.F.CL.U12.120820'],
+                             store3.get(REFDATA_FUTURES_CHAIN, ('US.CL', None), 2, loader))
+            self.assertEqual(2, loader.call_count)
+        finally:
+            shutil.rmtree(disk_dir)
+
+    def test_shared_store(self):
+        try:
+            set_shared_store(None)
+            with patch('tmqrfeed.refdata.REFDATA_STORE_ENABLED', False):
+                self.assertEqual(None, get_shared_store())
+
+            with patch('tmqrfeed.refdata.REFDATA_STORE_ENABLED', True):
+                store = get_shared_store()
+                self.assertTrue(isinstance(store, ReferenceDataStore))
+                self.assertTrue(store is get_shared_store())
+
+            store = ReferenceDataStore()
+            set_shared_store(store)
+            self.assertTrue(store is get_shared_store())
+        finally:
+            set_shared_store(None)
+
+    def test_refdata_version(self):
+        db = MagicMock()
+        with patch('tmqrfeed.refdata.datetime') as mock_dt:
+            mock_dt.utcnow.return_value = 'now'
+            set_refdata_version(db, REFDATA_ASSET_INDEX)
+        db[COLLECTION_REFDATA_VERSION].replace_one.assert_called_with({'_id': 'asset_index'},
+                                                                      {'_id': 'asset_index', 'version': 'now'},
+                                                                      upsert=True)
+        self.assertRaises(ArgumentError, set_refdata_version, db, 'unknown')
+
+        db[COLLECTION_REFDATA_VERSION].find_one.return_value = None
+        self.assertEqual(None, get_refdata_version(db, REFDATA_RFR))
+        db[COLLECTION_REFDATA_VERSION].find_one.return_value = {'_id': 'rfr', 'version': 'now'}
+        self.assertEqual('now', get_refdata_version(db, REFDATA_RFR))
@@ -108,28 +108,17 @@ class IndexEXOBase(IndexBase):
 
         if old_delta_series is None or len(old_delta_series) == 0:
             # Adding delta series to the EXO dataframe
-            delta_series = pd.Series(0.0, index=self.data.index)
-            for i, dt in enumerate(self.data.index):
-                try:
-                    delta_series[i] = pos.delta(dt)
-                except NotFoundError:
-                    pass
-
+            delta_series = pos.get_greeks_series(self.data.index)['delta']
         else:
             # Updating delta series
             delta_series = pd.Series(0.0, index=self.data.index)
             # Rewriting by old delta series
             delta_series[old_delta_series.index] = old_delta_series
 
-            for i, dt in enumerate(reversed(self.data.index)):
-                if dt < old_delta_series.index[-1]:
-                    # just update recent days
-                    break
-                try:
-                    delta_series[-(i + 1)] = pos.delta(dt)
-                except NotFoundError:
-                    pass
-
+            # just update recent days
+            update_index = self.data.index[self.data.index >= old_delta_series.index[-1]]
+            if len(update_index) > 0:
+                delta_series[update_index] = pos.get_greeks_series(update_index)['delta']
 
         self.data['delta'] = delta_series
 
@@ -0,0 +1,33 @@
+'''
+Export instruments quotes and reference data from the MongoDB to the local columnar quotes store (DataEngineColumnar)
+
+Usage:
+    python export_columnar_quotes.py <data_dir> US.ES US.CL ... [--date-start 2010-01-01] [--no-options]
+
+Then use the store by: DataManager(data_engine_cls=DataEngineColumnar, data_engine_settings={'data_dir': <data_dir>})
+'''
+import argparse
+from datetime import datetime
+
+from tmqr.logs import log
+from tmqrfeed.dataengines import DataEngineMongo, DataEngineColumnar
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export MongoDB quotes to the columnar quotes store')
+    parser.add_argument('data_dir', help='columnar quotes store directory')
+    parser.add_argument('instruments', nargs='+', help='full-qualified instrument names <Market>.<Name>')
+    parser.add_argument('--date-start', default=None, help='export contracts expired after date (YYYY-MM-DD)')
+    parser.add_argument('--no-options', action='store_true', help="don't export options chains and EOD quotes")
+    args = parser.parse_args()
+
+    date_start = datetime.strptime(args.date_start, '%Y-%m-%d') if args.date_start else None
+
+    mongo_engine = DataEngineMongo()
+    columnar_engine = DataEngineColumnar(data_dir=args.data_dir)
+
+    for instrument in args.instruments:
+        log.info(f"Exporting {instrument}")
+        columnar_engine.export_instrument(mongo_engine, instrument,
+                                          date_start=date_start,
+                                          export_options=not args.no_options)
+    log.info("Done")
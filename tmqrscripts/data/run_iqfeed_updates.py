@@ -41,6 +41,7 @@ from tmqrfeed import DataManager
 from tmqr.logs import log
 from tmqr.settings import *
 from tmqr.serialization import object_save_compress, object_load_decompress
+from tmqrfeed.refdata import set_refdata_version, REFDATA_RFR
 import pytz
 import numpy as np
 import pandas as pd
@@ -205,6 +206,7 @@ class TMQRIQFeedBarListener(iq.VerboseBarListener):
                                                               'rfr_series': object_save_compress(rfr_series),
                                                               'last_rfr': last_rfr},
                                                              upsert=True)
+            set_refdata_version(self.db_v2, REFDATA_RFR)
 
 
     def check_bar_integrity(self,  bar_time_est, bar_data, iqticker):
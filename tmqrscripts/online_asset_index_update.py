@@ -13,6 +13,7 @@ from pymongo import MongoClient
 
 
 from tmqr.settings import *
+from tmqrfeed.refdata import set_refdata_version, REFDATA_ASSET_INDEX
 
 
 # set up database connection
@@ -231,3 +232,6 @@ for iid, instr in instruments.items():
     # if res['exchangesymbol'] == 'ES':
     #    print(res)
     #    break
+
+# Invalidate shared reference data stores (instruments / contracts / chains) of the running processes
+set_refdata_version(local_db, REFDATA_ASSET_INDEX)
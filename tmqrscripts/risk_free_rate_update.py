@@ -12,6 +12,7 @@ import pymongo
 from pymongo import MongoClient
 from tmqr.settings import *
 from tmqrfeed.manager import DataManager
+from tmqrfeed.refdata import set_refdata_version, REFDATA_RFR
 from tradingcore.messages import *
 from tradingcore.signalapp import SignalApp, APPCLASS_DATA
 
@@ -53,6 +54,7 @@ rec = {
     'rfr_series': lz4.block.compress(pickle.dumps(rfr_series))
 }
 quotes_collection.replace_one({'market': 'US'}, rec, upsert=True)
+set_refdata_version(local_db, REFDATA_RFR)
 
 
 # if len(rfr_series.ix[:datetime(2001, 4, 29, 12, 3).date()].tail(1)) > 0:
@@ -0,0 +1,153 @@
+'''
+Process-based parallel tasks runner for the index / alpha generation scripts
+
+Every task is executed in a separate process, so a hanging task could be terminated after timeout
+without affecting other tasks. Tasks could depend on other tasks (i.e. alphas must run after EXO index update),
+dependent tasks are not started (and marked as failed) if any of their dependencies has failed or timed out.
+'''
+import multiprocessing
+import time as systime
+from collections import OrderedDict
+
+from tmqr.errors import ArgumentError
+from tmqr.logs import log
+
+TASK_STATUS_PENDING = 'pending'
+TASK_STATUS_RUNNING = 'running'
+TASK_STATUS_OK = 'ok'
+TASK_STATUS_FAILED = 'failed'
+TASK_STATUS_TIMEOUT = 'timeout'
+
+
+class ParallelTaskRunner:
+    def __init__(self, max_workers=4, task_timeout=None, poll_interval=0.2):
+        """
+        Initialize tasks runner
+        :param max_workers: max number of concurrently running tasks
+                            (all index tasks share the same MongoDB server, so this is max load per DB server)
+        :param task_timeout: max running time of each task in seconds (None - no timeout)
+        :param poll_interval: tasks status polling interval in seconds
+        """
+        if max_workers < 1:
+            raise ArgumentError("'max_workers' must be >= 1")
+
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        self.poll_interval = poll_interval
+        self._tasks = OrderedDict()
+
+    def add_task(self, name, target, args=(), depends_on=None):
+        """
+        Add task to the run queue
+        :param name: unique task name
+        :param target: picklable callable (module level function) executed in the separate process
+        :param args: target args
+        :param depends_on: list of task names which must be finished before the task is started
+        :return:
+        """
+        if name in self._tasks:
+            raise ArgumentError(f"Task '{name}' is already added")
+
+        depends_on = list(depends_on or [])
+        for dep in depends_on:
+            if dep not in self._tasks:
+                raise ArgumentError(f"Task '{name}' depends on unknown task '{dep}' (dependencies must be added first)")
+
+        self._tasks[name] = {
+            'name': name,
+            'target': target,
+            'args': args,
+            'depends_on': depends_on,
+            'status': TASK_STATUS_PENDING,
+            'process': None,
+            'time_start': None,
+            'wall_time': None,
+        }
+
+    def _is_ready(self, task):
+        for dep in task['depends_on']:
+            if self._tasks[dep]['status'] in (TASK_STATUS_PENDING, TASK_STATUS_RUNNING):
+                return False
+        return True
+
+    def _failed_dependencies(self, task):
+        return [dep for dep in task['depends_on']
+                if self._tasks[dep]['status'] in (TASK_STATUS_FAILED, TASK_STATUS_TIMEOUT)]
+
+    def _start(self, task):
+        task['process'] = multiprocessing.Process(target=task['target'], args=task['args'], name=task['name'])
+        task['time_start'] = systime.time()
+        task['status'] = TASK_STATUS_RUNNING
+        task['process'].start()
+        log.info(f"ParallelTaskRunner: started '{task['name']}'")
+
+    def _check(self, task):
+        """
+        Check running task status, terminate the task on timeout
+        :return: True if the task is finished
+        """
+        process = task['process']
+        wall_time = systime.time() - task['time_start']
+
+        if process.is_alive():
+            if self.task_timeout is None or wall_time < self.task_timeout:
+                return False
+
+            process.terminate()
+            process.join()
+            task['status'] = TASK_STATUS_TIMEOUT
+            log.error(f"ParallelTaskRunner: '{task['name']}' terminated by timeout ({self.task_timeout}s)")
+        else:
+            process.join()
+            if process.exitcode == 0:
+                task['status'] = TASK_STATUS_OK
+            else:
+                task['status'] = TASK_STATUS_FAILED
+                log.error(f"ParallelTaskRunner: '{task['name']}' failed with exit code {process.exitcode}")
+
+        task['wall_time'] = wall_time
+        task['process'] = None
+        log.info(f"ParallelTaskRunner: finished '{task['name']}' status: {task['status']} time: {wall_time:0.1f}s")
+        return True
+
+    def run(self):
+        """
+        Run all tasks, dependent tasks are started when all their dependencies are finished successfully,
+        if any dependency has failed or timed out the dependent task is skipped and marked as failed
+        :return: list of tasks summary dicts {'name', 'status', 'wall_time'} in order of tasks adding
+        """
+        pending = list(self._tasks.values())
+        running = []
+        time_start = systime.time()
+
+        while len(pending) > 0 or len(running) > 0:
+            running = [t for t in running if not self._check(t)]
+
+            for task in list(pending):
+                if len(running) >= self.max_workers:
+                    break
+                if self._is_ready(task):
+                    pending.remove(task)
+                    failed_deps = self._failed_dependencies(task)
+                    if len(failed_deps) > 0:
+                        task['status'] = TASK_STATUS_FAILED
+                        log.error(f"ParallelTaskRunner: '{task['name']}' skipped, dependencies failed: {failed_deps}")
+                        continue
+                    self._start(task)
+                    running.append(task)
+
+            if len(running) > 0:
+                systime.sleep(self.poll_interval)
+
+        summary = self.summary()
+        self.log_summary(summary, systime.time() - time_start)
+        return summary
+
+    def summary(self):
+        return [{'name': t['name'], 'status': t['status'], 'wall_time': t['wall_time']} for t in self._tasks.values()]
+
+    @staticmethod
+    def log_summary(summary, total_wall_time):
+        log.info(f"ParallelTaskRunner: {len(summary)} tasks finished in {total_wall_time:0.1f}s")
+        for t in sorted(summary, key=lambda x: -(x['wall_time'] or 0)):
+            log.info(f"{t['name']:<60} {t['status']:<8} {t['wall_time'] or 0:>8.1f}s")
@@ -1,4 +1,4 @@
-from tmqrscripts.run_indexes.run_indexes_v2018 import IndexGenerationScript
+from tmqrscripts.run_indexes.run_indexes_v2018 import IndexGenerationScript, PARALLEL_TASK_TIMEOUT
 from datetime import datetime
 
 import argparse
@@ -48,6 +48,18 @@ parser.add_argument("-te",
                     required=False,
                     type=bool)
 
+parser.add_argument("-p",
+                    "--parallel",
+                    help="Run indexes and alphas in N parallel processes",
+                    required=False,
+                    type=int)
+
+parser.add_argument("-t",
+                    "--task_timeout",
+                    help="Max run time of each index or alpha in seconds (parallel mode only)",
+                    required=False,
+                    type=int)
+
 args = parser.parse_args()
 
 indexGenerationScript = IndexGenerationScript(
@@ -56,7 +68,12 @@ indexGenerationScript = IndexGenerationScript(
     date_end=args.date_end, override_run_alpha=args.alphas, try_run_all_exos_live_and_test=args.try_run_all_exos_live_and_test, instrument=args.instrument,
     run_only_test_exos=args.run_only_test_exos)
 
-indexGenerationScript.run_main_index_alpha_script()
+if args.parallel:
+    indexGenerationScript.run_main_index_alpha_script_parallel(
+        max_workers=args.parallel,
+        task_timeout=args.task_timeout if args.task_timeout else PARALLEL_TASK_TIMEOUT)
+else:
+    indexGenerationScript.run_main_index_alpha_script()
 
 
 
@@ -21,6 +21,7 @@ except:
 from tmqrscripts.index_scripts.settings_index import *
 from tmqr.settings import *
 from tmqrfeed.manager import DataManager
+from tmqrfeed.refdata import get_shared_store, set_shared_store, ReferenceDataStore
 from tmqrindex import IndexBase
 
 
@@ -30,6 +31,7 @@ import os
 from datetime import datetime, time, timedelta
 import pytz
 from tmqr.errors import DataEngineNotFoundError, QuoteNotFoundError
+from tmqrscripts.run_indexes.parallel_runner import ParallelTaskRunner
 # import threading
 
 # log.disabled = True
@@ -45,6 +47,22 @@ https://10.0.1.2:8889/notebooks/indexes/index_deployment_samples/Step%202%20-%20
 https://10.0.1.2:8889/notebooks/indexes/index_deployment_samples/Step%203%20-%20Getting%20indexes%20trading%20session%20params.ipynb
 '''
 
+#
+# Parallel run settings
+#
+PARALLEL_MAX_WORKERS = 4
+PARALLEL_TASK_TIMEOUT = 3600  # seconds
+
+
+def _run_index_task(init_kwargs, instrument_symbol, last_bar_update, exo_i, exo_alpha_run, instrument_specific):
+    '''
+    parallel index / alpha process entry point, the script is re-created to get process own DB connections
+    '''
+    igs = IndexGenerationScript(**init_kwargs)
+    igs.run_through_each_index_threads(instrument_symbol, last_bar_update, INDEX_LIST[exo_i], exo_alpha_run,
+                                       instrument_specific)
+
+
 class IndexGenerationScript:
     def __init__(self, override_time_check_run_exo=False, reset_exo_from_beginning = False, date_end = None, override_run_alpha=False, try_run_all_exos_live_and_test = False,
                  instrument=None, run_only_test_exos = False):
@@ -52,6 +70,17 @@ class IndexGenerationScript:
         log.setup('scripts', 'IndexGenerationScript', to_file=True)
         log.info('Running exo alpha update')
 
+        # Constructor kwargs are used to re-create the script in the parallel index processes
+        self.init_kwargs = {
+            'override_time_check_run_exo': override_time_check_run_exo,
+            'reset_exo_from_beginning': reset_exo_from_beginning,
+            'date_end': date_end,
+            'override_run_alpha': override_run_alpha,
+            'try_run_all_exos_live_and_test': try_run_all_exos_live_and_test,
+            'instrument': instrument,
+            'run_only_test_exos': run_only_test_exos,
+        }
+
         if override_time_check_run_exo == None:
             self.override_time_check_run_exo = False
         else:
@@ -85,6 +114,11 @@ class IndexGenerationScript:
 
 
 
+        # All DataManagers of the script (process) share instruments / contracts / chains reference data,
+        # parallel processes also share it via REFDATA_STORE_DIR (if set)
+        if get_shared_store() is None:
+            set_shared_store(ReferenceDataStore(REFDATA_STORE_DIR))
+
         mongo_client_v2 = MongoClient(MONGO_CONNSTR)
         self.mongo_db_v2 = mongo_client_v2[MONGO_DB]
 
@@ -123,11 +157,47 @@ class IndexGenerationScript:
         :param override_run: runs regardless of time
         :return: 
         '''
+        for instrument_symbol, last_bar_update, exo_i, exo_alpha_run, instrument_specific in self.get_index_tasks():
+            self.run_through_each_index_threads(instrument_symbol, last_bar_update, INDEX_LIST[exo_i],
+                                                exo_alpha_run, instrument_specific)
+
+    def run_main_index_alpha_script_parallel(self, max_workers=PARALLEL_MAX_WORKERS, task_timeout=PARALLEL_TASK_TIMEOUT):
+        '''
+        runs the same indexes and alphas as run_main_index_alpha_script() but in parallel processes,
+        alphas of the instrument are started after all EXO indexes of the instrument are finished,
+        if any EXO index of the instrument has failed or timed out its alphas are skipped (marked as failed)
+        :param max_workers: max number of concurrent index / alpha processes (per MongoDB server)
+        :param task_timeout: max run time of each index / alpha in seconds
+        :return: list of tasks summary dicts {'name', 'status', 'wall_time'}
+        '''
+        runner = ParallelTaskRunner(max_workers=max_workers, task_timeout=task_timeout)
+
+        exo_tasks = {}
+        for instrument_symbol, last_bar_update, exo_i, exo_alpha_run, instrument_specific in self.get_index_tasks():
+            task_name = '{0}_{1}_{2}'.format(instrument_symbol, INDEX_LIST[exo_i]['class']._index_name, exo_alpha_run)
+            task_args = (self.init_kwargs, instrument_symbol, last_bar_update, exo_i, exo_alpha_run, instrument_specific)
+
+            if exo_alpha_run == 'exo':
+                exo_tasks.setdefault(instrument_symbol, []).append(task_name)
+                runner.add_task(task_name, _run_index_task, task_args)
+            else:
+                runner.add_task(task_name, _run_index_task, task_args,
+                                depends_on=exo_tasks.get(instrument_symbol, []))
+
+        return runner.run()
+
+    def get_index_tasks(self):
+        '''
+        builds the list of index / alpha runs for all instruments and indexes in settings_index
+        (all EXO runs of instrument go before its alpha runs)
+        :return: list of tuples (instrument_symbol, last_bar_update, INDEX_LIST item index, 'exo'/'alpha', instrument_specific)
+        '''
 
         self.asset_info_collection = self.mongo_db_v2['asset_info']
 
         #instrument_list = ['US.ES', 'US.CL', 'US.ZN', 'US.6C', 'US.6J', 'US.6E', 'US.6B']
 
+        tasks = []
         for instrument in self.asset_info_collection.find({},{'instrument':1}):
         # instrument = {'instrument':'US.ES'}
         # instrument = {'instrument':'US.6J'}
@@ -151,20 +221,17 @@ class IndexGenerationScript:
 
                 for exo_alpha_run in ['exo','alpha']:
 
-                    for exo in INDEX_LIST:
+                    for exo_i, exo in enumerate(INDEX_LIST):
 
                         instrument_specific = 'instrument' in exo and instrument['instrument'] == exo['instrument']
 
                         if instrument_specific or not 'instrument' in exo:
-                            # t = threading.Thread(target=self.run_through_each_index_threads, args=(instrument['instrument'], exo, instrument_specific))
-                            # t.start()
-
                             last_bar_update = None
                             if 'last_bar_update' in instrument:
                                 last_bar_update = instrument['last_bar_update']
 
-                            self.run_through_each_index_threads(instrument['instrument'], last_bar_update, exo, exo_alpha_run, instrument_specific)
-
+                            tasks.append((instrument['instrument'], last_bar_update, exo_i, exo_alpha_run, instrument_specific))
+        return tasks
 
     def run_through_each_index_threads(self, instrument_symbol, last_bar_update, exo_index, exo_alpha_run, instrument_specific = False):
         '''
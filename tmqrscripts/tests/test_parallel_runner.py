@@ -0,0 +1,121 @@
+import os
+import shutil
+import sys
+import tempfile
+import time as systime
+import unittest
+
+from tmqr.errors import ArgumentError
+from tmqrscripts.run_indexes.parallel_runner import ParallelTaskRunner, TASK_STATUS_OK, TASK_STATUS_FAILED, \
+    TASK_STATUS_TIMEOUT, TASK_STATUS_PENDING
+
+
+def _task_log(log_dir, name, duration=0.0):
+    with open(os.path.join(log_dir, name), 'w') as fh:
+        fh.write(f"{systime.time()}\n")
+    systime.sleep(duration)
+    with open(os.path.join(log_dir, name), 'a') as fh:
+        fh.write(f"{systime.time()}\n")
+
+
+def _task_fail():
+    sys.exit(3)
+
+
+def _task_hang():
+    systime.sleep(60)
+
+
+class ParallelTaskRunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def task_times(self, name):
+        with open(os.path.join(self.log_dir, name)) as fh:
+            start, end = [float(l) for l in fh.read().split()]
+        return start, end
+
+    def test_init(self):
+        self.assertRaises(ArgumentError, ParallelTaskRunner, max_workers=0)
+
+    def test_add_task(self):
+        runner = ParallelTaskRunner()
+        runner.add_task('exo', _task_log, (self.log_dir, 'exo'))
+        self.assertRaises(ArgumentError, runner.add_task, 'exo', _task_log, (self.log_dir, 'exo'))
+        self.assertRaises(ArgumentError, runner.add_task, 'alpha', _task_log, (self.log_dir, 'alpha'),
+                          depends_on=['unknown'])
+        self.assertEqual([{'name': 'exo', 'status': TASK_STATUS_PENDING, 'wall_time': None}], runner.summary())
+
+    def test_run_dependencies_order(self):
+        runner = ParallelTaskRunner(max_workers=4, poll_interval=0.01)
+        runner.add_task('exo1', _task_log, (self.log_dir, 'exo1', 0.5))
+        runner.add_task('exo2', _task_log, (self.log_dir, 'exo2', 0.2))
+        runner.add_task('alpha', _task_log, (self.log_dir, 'alpha'), depends_on=['exo1', 'exo2'])
+        summary = runner.run()
+
+        self.assertEqual([TASK_STATUS_OK] * 3, [t['status'] for t in summary])
+        alpha_start = self.task_times('alpha')[0]
+        self.assertTrue(alpha_start >= self.task_times('exo1')[1])
+        self.assertTrue(alpha_start >= self.task_times('exo2')[1])
+
+    def test_run_max_workers(self):
+        runner = ParallelTaskRunner(max_workers=2, poll_interval=0.01)
+        names = [f'task{i}' for i in range(5)]
+        for name in names:
+            runner.add_task(name, _task_log, (self.log_dir, name, 0.3))
+        runner.run()
+
+        intervals = [self.task_times(name) for name in names]
+        for start, end in intervals:
+            n_running = sum(1 for s, e in intervals if s <= start < e)
+            self.assertTrue(n_running <= 2)
+
+    def test_run_timeout(self):
+        runner = ParallelTaskRunner(max_workers=2, task_timeout=0.5, poll_interval=0.01)
+        runner.add_task('hang', _task_hang)
+        runner.add_task('ok', _task_log, (self.log_dir, 'ok'))
+
+        time_start = systime.time()
+        summary = runner.run()
+        self.assertTrue(systime.time() - time_start < 10)
+        self.assertEqual([TASK_STATUS_TIMEOUT, TASK_STATUS_OK], [t['status'] for t in summary])
+
+    def test_run_failed(self):
+        runner = ParallelTaskRunner(max_workers=2, poll_interval=0.01)
+        runner.add_task('fail', _task_fail)
+        runner.add_task('ok', _task_log, (self.log_dir, 'ok'))
+        summary = runner.run()
+        self.assertEqual([TASK_STATUS_FAILED, TASK_STATUS_OK], [t['status'] for t in summary])
+
+    def test_run_failed_dependency_skipped(self):
+        runner = ParallelTaskRunner(max_workers=2, task_timeout=0.5, poll_interval=0.01)
+        runner.add_task('exo_fail', _task_fail)
+        runner.add_task('exo_hang', _task_hang)
+        runner.add_task('alpha1', _task_log, (self.log_dir, 'alpha1'), depends_on=['exo_fail'])
+        runner.add_task('alpha2', _task_log, (self.log_dir, 'alpha2'), depends_on=['exo_hang'])
+        runner.add_task('alpha3', _task_log, (self.log_dir, 'alpha3'), depends_on=['alpha1'])
+        summary = runner.run()
+
+        self.assertEqual([TASK_STATUS_FAILED, TASK_STATUS_TIMEOUT, TASK_STATUS_FAILED, TASK_STATUS_FAILED,
+                          TASK_STATUS_FAILED], [t['status'] for t in summary])
+        for name in ['alpha1', 'alpha2', 'alpha3']:
+            self.assertFalse(os.path.exists(os.path.join(self.log_dir, name)))
+
+    def test_run_summary(self):
+        runner = ParallelTaskRunner(max_workers=2, poll_interval=0.01)
+        runner.add_task('exo', _task_log, (self.log_dir, 'exo', 0.2))
+        runner.add_task('alpha', _task_log, (self.log_dir, 'alpha'), depends_on=['exo'])
+        summary = runner.run()
+
+        self.assertEqual(summary, runner.summary())
+        self.assertEqual(['exo', 'alpha'], [t['name'] for t in summary])
+        self.assertEqual({'name', 'status', 'wall_time'}, set(summary[0].keys()))
+        self.assertTrue(summary[0]['wall_time'] >= 0.2)
+        self.assertTrue(summary[1]['wall_time'] >= 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
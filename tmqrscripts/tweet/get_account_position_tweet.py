@@ -14,8 +14,11 @@ from tmqr.settings import *
 # from tmqrfeed.contracts import ContractBase
 # import pickle
 # from smartcampaign import SmartCampaignBase
-from exobuilder.algorithms.blackscholes import blackscholes, \
-    blackscholes_greeks, blackscholes_gamma, blackscholes_vega, blackscholes_theta
+from exobuilder.algorithms.blackscholes import blackscholes_greeks, blackscholes_gamma, blackscholes_vega, \
+    blackscholes_theta
+import pyximport
+pyximport.install()
+from tmqrfeed.fast_option_pricing import blackscholes_array, blackscholes_price_greeks_array
 import seaborn as sns
 # import ipywidgets as widgets
 # # from IPython.display import clear_output
@@ -276,24 +279,24 @@ class AccountPositionTweet:
         option_price_return_type = 1 returns price only
         option_price_return_type = 2 returns prices and deltas at current price and expiration
         option_price_return_type = 3 returns everything
+        prices are calculated by the same kernel as option_payoff() to keep payoff P&L consistent
         '''
+        iscall = 1 if str(callorput).upper() == 'C' else 0
+        price = blackscholes_array(iscall, underlyingprice, strike, to_expiration_years, riskfreerate, iv)[0]
 
         if option_price_return_type == 1:
-            return blackscholes(callorput, underlyingprice, strike, \
-                                to_expiration_years, riskfreerate, iv)
+            return price
+
+        price_ae = blackscholes_array(iscall, underlyingprice, strike, 0, riskfreerate, iv)[0]
         if option_price_return_type == 2:
-            return blackscholes(callorput, underlyingprice, strike, \
-                                to_expiration_years, riskfreerate, iv), \
+            return price, \
                    blackscholes_greeks(callorput, underlyingprice, strike, to_expiration_years, riskfreerate, iv), \
-                   blackscholes(callorput, underlyingprice, strike, \
-                                0, riskfreerate, iv), \
+                   price_ae, \
                    blackscholes_greeks(callorput, underlyingprice, strike, 0, riskfreerate, iv),
         else:
-            return blackscholes(callorput, underlyingprice, strike, \
-                                to_expiration_years, riskfreerate, iv), \
+            return price, \
                    blackscholes_greeks(callorput, underlyingprice, strike, to_expiration_years, riskfreerate, iv), \
-                   blackscholes(callorput, underlyingprice, strike, \
-                                0, riskfreerate, iv), \
+                   price_ae, \
                    blackscholes_greeks(callorput, underlyingprice, strike, 0, riskfreerate, iv), \
                    blackscholes_gamma(underlyingprice, strike, to_expiration_years, riskfreerate, iv),\
                    blackscholes_vega(underlyingprice, strike, to_expiration_years, riskfreerate, iv),\
@@ -301,6 +304,19 @@ class AccountPositionTweet:
 
 
 
+    def option_payoff(self, callorput, underlyingprices, strike, to_expiration_years, iv, riskfreerate=0.01):
+        '''
+        Vectorized option prices and deltas for all payoff points (current and at expiration)
+        returns tuple of arrays (prices, deltas, prices_at_expiration, deltas_at_expiration)
+        '''
+        iscall = 1 if str(callorput).upper() == 'C' else 0
+
+        price, delta = blackscholes_price_greeks_array(iscall, underlyingprices, strike, to_expiration_years,
+                                                       riskfreerate, iv)[:2]
+        price_ae, delta_ae = blackscholes_price_greeks_array(iscall, underlyingprices, strike, 0,
+                                                             riskfreerate, iv)[:2]
+        return price, delta, price_ae, delta_ae
+
     def fill_future(self, position, future_dict, instrument):
         # print('fill_future',position['asset']['idcontract'],future_dict)
         if position['asset']['idcontract'] not in future_dict:
@@ -473,37 +489,21 @@ class AccountPositionTweet:
                             instrument_outputs['total_vega'].append(end_vega_option)
                             instrument_outputs['total_theta'].append(end_theta_option)
 
-                            option_pnl = []
-                            option_delta = []
-                            option_pnl_ae = []
-                            option_delta_ae = []
-                            for underlying_price in instrument_outputs['future_dict'][position['asset']['idcontract']][
-                                'payoff_price_series']:
-                                price_payoff, delta_payoff, price_ae, delta_ae = self.option_price(
-                                    position['asset']['callorput'], \
-                                    underlying_price, \
-                                    position['asset'][
-                                        'strikeprice'], \
-                                    option['timetoexpinyears'],
-                                    option['impliedvol'],
-                                    riskfreerate=self.risk_free_rate,
-                                    option_price_return_type=2)
-
-                                option_pnl.append( \
-                                    (price_payoff - end_option_price) / instrument['optionticksize'] * instrument[
-                                        'optiontickvalue'] * \
-                                    position['qty'])
-
-                                option_delta.append( \
-                                    delta_payoff[0] * position['qty'])
-
-                                option_pnl_ae.append( \
-                                    (price_ae - end_option_ae) / instrument['optionticksize'] * instrument[
-                                        'optiontickvalue'] * \
-                                    position['qty'])
-
-                                option_delta_ae.append( \
-                                    delta_ae[0] * position['qty'])
+                            price_payoff, delta_payoff, price_ae, delta_ae = self.option_payoff(
+                                position['asset']['callorput'],
+                                instrument_outputs['future_dict'][position['asset']['idcontract']][
+                                    'payoff_price_series'],
+                                position['asset']['strikeprice'],
+                                option['timetoexpinyears'],
+                                option['impliedvol'],
+                                riskfreerate=self.risk_free_rate)
+
+                            option_pnl = (price_payoff - end_option_price) / instrument['optionticksize'] * \
+                                         instrument['optiontickvalue'] * position['qty']
+                            option_delta = delta_payoff * position['qty']
+                            option_pnl_ae = (price_ae - end_option_ae) / instrument['optionticksize'] * \
+                                            instrument['optiontickvalue'] * position['qty']
+                            option_delta_ae = delta_ae * position['qty']
 
                                 # payoff_val, delta_val, payoff_val_ae, delta_val_ae = \
                             self.add_to_payoff(option_pnl, option_delta, option_pnl_ae, option_delta_ae,
@@ -295,3 +295,205 @@ def score_modsharpe(np.ndarray[DTYPE_t_float, ndim=1] price_series,
         return float('nan')
 
     return np.mean(trades) / np.std(trades)
+
+#
+# Batched (2-D) versions for many swarm members at once, arrays shape is (bars, members)
+#
+def _members_array(value, int n_members, name):
+    """
+    Broadcast scalar or per-member value to np.int64 array of members length
+    """
+    arr = np.asarray(value, dtype=np.int64)
+    if arr.ndim == 0:
+        return np.full(n_members, int(arr), dtype=np.int64)
+    if arr.shape[0] != n_members or arr.ndim != 1:
+        raise ArgumentError(f"'{name}' length != members count")
+    return arr
+
+
+def _costs_array(costs, int barcount):
+    if isinstance(costs, (float, int, np.float, np.int)):
+        return np.ones(barcount, dtype=np.float) * float(costs)
+    if len(costs) != barcount:
+        raise ArgumentError("'costs' length != price length")
+    return np.asarray(costs, dtype=np.float)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def exposure_2d(np.ndarray[DTYPE_t_float, ndim=1] price_series,
+                np.ndarray[DTYPE_t_uint8, ndim=2, cast=True] entry_rules,
+                np.ndarray[DTYPE_t_uint8, ndim=2, cast=True] exit_rules,
+                direction,
+                size_exposure=None,
+                nbar_stop=0
+                ):
+    """
+    Exposure calculation for many members at once (the same logic as exposure() applied to every column)
+    :param price_series: price series
+    :param entry_rules: boolean entry rules matrix (bars x members)
+    :param exit_rules: boolean exit rules matrix (bars x members)
+    :param direction: trade direction, int or array of members directions
+    :param size_exposure: exposure size, number, series of bars or matrix (bars x members) (default: 1.0)
+    :param nbar_stop: N-bar stop exit, int or array of members values (default: no bar stop)
+    :return: np.array of exposure values (bars x members)
+    """
+    cdef int barcount = price_series.shape[0]
+    cdef int n_members = entry_rules.shape[1]
+    cdef int i = 0
+    cdef int j = 0
+
+    if entry_rules.shape[0] != barcount:
+        raise ArgumentError("'entry_rules' length != price length")
+    if exit_rules.shape[0] != barcount or exit_rules.shape[1] != n_members:
+        raise ArgumentError("'exit_rules' shape != 'entry_rules' shape")
+
+    cdef np.ndarray[np.int64_t, ndim=1] directions = _members_array(direction, n_members, 'direction')
+    cdef np.ndarray[np.int64_t, ndim=1] nbar_stops = _members_array(nbar_stop, n_members, 'nbar_stop')
+
+    cdef np.ndarray[DTYPE_t_float, ndim=2] qty_arr
+    if size_exposure is None:
+        qty_arr = np.ones((barcount, n_members), dtype=np.float)
+    elif isinstance(size_exposure, (float, int, np.float, np.int)):
+        qty_arr = np.ones((barcount, n_members), dtype=np.float) * size_exposure
+    else:
+        if len(size_exposure) != barcount:
+            raise ArgumentError("'size_exposure' length != price length")
+        size_arr = np.asarray(size_exposure, dtype=np.float)
+        if size_arr.ndim == 1:
+            qty_arr = np.repeat(size_arr.reshape(barcount, 1), n_members, axis=1)
+        elif size_arr.shape[1] != n_members:
+            raise ArgumentError("'size_exposure' columns count != members count")
+        else:
+            qty_arr = size_arr
+
+    # Members state: last index of the entry bar (-1 - no position)
+    cdef np.ndarray[np.int64_t, ndim=1] inpos = np.full(n_members, -1, dtype=np.int64)
+    cdef np.ndarray[DTYPE_t_float, ndim=2] exposure = np.zeros((barcount, n_members))
+
+    # Bars are processed in the outer loop to keep row-major matrices access sequential
+    for i in range(barcount):
+        for j in range(n_members):
+            if inpos[j] == -1:
+                if entry_rules[i, j] == 1:
+                    inpos[j] = i
+                    exposure[i, j] = directions[j] * qty_arr[i, j]
+            else:
+                if exit_rules[i, j] == 1 or (nbar_stops[j] > 0 and (i - inpos[j]) >= nbar_stops[j]):
+                    inpos[j] = -1
+                else:
+                    exposure[i, j] = directions[j] * qty_arr[inpos[j], j]
+
+    return exposure
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def score_netprofit_2d(np.ndarray[DTYPE_t_float, ndim=1] price_series,
+                       np.ndarray[DTYPE_t_float, ndim=2] exposure,
+                       costs=None):
+    """
+    Fast score metric: NetProfit for many members at once (the same as score_netprofit() applied to every column)
+    :param price_series: price series
+    :param exposure: exposure values matrix (bars x members)
+    :param costs: costs per 1 contract of exposure (if None - no costs)
+    :return: np.array of members scores
+    """
+    cdef int barcount = price_series.shape[0]
+    cdef int n_members = exposure.shape[1]
+    cdef int i = 0
+    cdef int j = 0
+    cdef float current_exp = 0.0
+    cdef float prev_exp = 0.0
+    cdef double px_change = 0.0
+    cdef int has_costs = costs is not None
+
+    if exposure.shape[0] != barcount:
+        raise ArgumentError("'exposure' length is not equal to 'price_series' length")
+
+    cdef np.ndarray[DTYPE_t_float, ndim=1] transaction_costs
+    if has_costs:
+        transaction_costs = _costs_array(costs, barcount)
+
+    # Single precision accumulators, the same as score_netprofit()
+    cdef np.ndarray[np.float32_t, ndim=1] profit = np.zeros(n_members, dtype=np.float32)
+
+    for i in range(1, barcount):
+        px_change = price_series[i] - price_series[i - 1]
+        for j in range(n_members):
+            current_exp = exposure[i, j]
+            prev_exp = exposure[i - 1, j]
+
+            profit[j] += px_change * prev_exp
+
+            if has_costs:
+                profit[j] += calc_costs(transaction_costs[i], 0, prev_exp, current_exp)
+
+    return profit.astype(np.float)
+
+
+@cython.cdivision(True)
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def score_modsharpe_2d(np.ndarray[DTYPE_t_float, ndim=1] price_series,
+                       np.ndarray[DTYPE_t_float, ndim=2] exposure,
+                       costs=None):
+    """
+    Fast score metric: ModSharpe for many members at once (the same as score_modsharpe() applied to every column)
+    :param price_series: price series
+    :param exposure: exposure values matrix (bars x members)
+    :param costs: costs per 1 contract of exposure (if None - no costs)
+    :return: np.array of members scores, float('nan') for members with trades count < 5
+    """
+    cdef int barcount = price_series.shape[0]
+    cdef int n_members = exposure.shape[1]
+    cdef int i = 0
+    cdef int j = 0
+    cdef float current_exp = 0.0
+    cdef float prev_exp = 0.0
+    cdef double px_change = 0.0
+    cdef int has_costs = costs is not None
+
+    if exposure.shape[0] != barcount:
+        raise ArgumentError("'exposure' length is not equal to 'price_series' length")
+
+    cdef np.ndarray[DTYPE_t_float, ndim=1] transaction_costs
+    if has_costs:
+        transaction_costs = _costs_array(costs, barcount)
+
+    # Members trades state, the same trades calculation as exposure_trades()
+    cdef np.ndarray[np.float32_t, ndim=1] profit = np.zeros(n_members, dtype=np.float32)
+    cdef np.ndarray[np.uint8_t, ndim=1] in_trade = np.zeros(n_members, dtype=np.uint8)
+    cdef np.ndarray[np.int64_t, ndim=1] n_trades = np.zeros(n_members, dtype=np.int64)
+    cdef np.ndarray[DTYPE_t_float, ndim=2] trades = np.zeros((max(barcount, 1), n_members), dtype=np.float)
+
+    for i in range(1, barcount):
+        px_change = price_series[i] - price_series[i - 1]
+        for j in range(n_members):
+            current_exp = exposure[i, j]
+            prev_exp = exposure[i - 1, j]
+
+            if in_trade[j] == 0 and current_exp != 0:
+                in_trade[j] = 1
+                profit[j] = 0.0
+
+            if in_trade[j] == 1:
+                profit[j] += px_change * prev_exp
+
+                if has_costs:
+                    profit[j] += calc_costs(transaction_costs[i], 0, prev_exp, current_exp)
+
+                if i == barcount - 1 or current_exp == 0:
+                    trades[n_trades[j], j] = profit[j]
+                    n_trades[j] += 1
+                    in_trade[j] = 0
+
+    cdef np.ndarray[DTYPE_t_float, ndim=1] result = np.full(n_members, np.nan, dtype=np.float)
+    for j in range(n_members):
+        if n_trades[j] >= 5:
+            member_trades = trades[:n_trades[j], j]
+            result[j] = np.mean(member_trades) / np.std(member_trades)
+
+    return result
@@ -1,10 +1,31 @@
 import itertools
 from tmqr.errors import SettingsError, ArgumentError
+from tmqr.logs import log
 import bisect
 import math
+import multiprocessing
+import os
 import random
 from deap import creator, base, tools, algorithms
 import numpy as np
+from tmqrstrategy.strategy_base import StrategyBase
+
+OPTIMIZER_BACKENDS = ('serial', 'process')
+
+# Max number of params sets scored by single StrategyBase.score_batch() call
+BATCH_SIZE_DEFAULT = 256
+
+# Optimizer instance of the worker process, inherited from the parent process at the pool start (by fork)
+_worker_optimizer = None
+
+
+def _worker_evaluate_chunk(params_chunk):
+    """
+    Evaluate chunk of params sets in the worker process
+    :param params_chunk: list of params sets
+    :return: list of evaluate() results
+    """
+    return _worker_optimizer.evaluate_batch(params_chunk)
 
 
 class OptimizerBase:
@@ -21,6 +42,16 @@ class OptimizerBase:
             * nbest_count - number of best swarm members to store (None - store all)
             * nbest_fitness_method - how to select best members (default: 'max')
             * store_stats - store statistics for WFO analysis for debug purposes (default: False)
+            * backend - params evaluation backend (default: 'serial')
+                'serial' - evaluate params sets one by one in the current process
+                'process' - evaluate chunks of params sets by the pool of worker processes, workers are forked with
+                            the strategy state (i.e. primary quotes of the current WFO window are inherited once
+                            at the pool start, not pickled per evaluation). Strategy calculate() and score() must
+                            not use the DB connections.
+            * n_jobs - number of worker processes for 'process' backend (default: os.cpu_count())
+            * chunk_size - number of params sets per worker task (default: auto)
+            * batch_size - max number of params sets scored by single strategy.score_batch() call, if the strategy
+                           implements calculate_rules_batch() (default: BATCH_SIZE_DEFAULT)
         """
         self.strategy = strategy
         self.opt_params = opt_params
@@ -34,6 +65,27 @@ class OptimizerBase:
         self.store_stats = kwargs.get('store_stats', False)
         self.stats = {}
 
+        self.backend = kwargs.get('backend', 'serial')
+        if self.backend not in OPTIMIZER_BACKENDS:
+            raise SettingsError(f"Unknown optimizer 'backend' kwarg value, expected {OPTIMIZER_BACKENDS} "
+                                f"got {self.backend}")
+
+        self.n_jobs = kwargs.get('n_jobs', None)
+        if self.n_jobs is None:
+            self.n_jobs = os.cpu_count() or 1
+        if self.n_jobs <= 0:
+            raise SettingsError("Optimizer 'n_jobs' kwarg must be > 0")
+
+        self.chunk_size = kwargs.get('chunk_size', None)
+        if self.chunk_size is not None and self.chunk_size <= 0:
+            raise SettingsError("Optimizer 'chunk_size' kwarg must be > 0 or None")
+
+        self.batch_size = kwargs.get('batch_size', BATCH_SIZE_DEFAULT)
+        if self.batch_size <= 0:
+            raise SettingsError("Optimizer 'batch_size' kwarg must be > 0")
+
+        self._pool = None
+
     def _check_params_integrity(self):
         if self.opt_params is None:
             raise SettingsError(f"Optimization params for {self.strategy} is None, check strategy settings")
@@ -103,7 +155,110 @@ class OptimizerBase:
                     del sb_scores[-1]
                     del sb_params[-1]
 
+    def evaluate(self, param):
+        """
+        Alpha strategy score function evaluation
+        :param param: strategy calculate() params set
+        :return: score
+        """
+        exposure_df = self.strategy_calculate(param)
+        return self.score_result(self.strategy.score(exposure_df))
+
+    def score_result(self, score):
+        """
+        Convert strategy score to evaluate() result
+        :param score: strategy score
+        :return: evaluate() result
+        """
+        return score
+
+    def evaluate_batch(self, params_list):
+        """
+        Evaluate params sets in the current process, the strategy scores params sets by batches if it
+        implements calculate_rules_batch()
+        :param params_list: list of params sets
+        :return: list of evaluate() results in the same order as params_list
+        """
+        if not isinstance(self.strategy, StrategyBase) or not self.strategy.is_batch_supported:
+            return [self.evaluate(p) for p in params_list]
 
+        result = []
+        for i in range(0, len(params_list), self.batch_size):
+            batch = params_list[i:i + self.batch_size]
+            result.extend(self.score_result(float(score)) for score in self.strategy.score_batch(batch))
+        return result
+
+    def strategy_calculate(self, param):
+        """
+        Calculate strategy exposure, uses strategy exposure cache (see StrategyBase.calculate_cached())
+        :param param: strategy calculate() params set
+        :return: strategy calculate() result
+        """
+        if isinstance(self.strategy, StrategyBase):
+            return self.strategy.calculate_cached(*param)
+        return self.strategy.calculate(*param)
+
+    def _is_parallel(self):
+        return self.backend == 'process' and self.n_jobs > 1
+
+    def pool_start(self):
+        """
+        Start worker processes pool for 'process' backend, workers inherit the current optimizer and strategy state,
+        so the pool must be (re)started after strategy quotes range changes
+        :return:
+        """
+        global _worker_optimizer
+        if not self._is_parallel() or self._pool is not None:
+            return
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            log.warn("Process optimizer backend requires 'fork' start method, params are evaluated serially")
+            self.backend = 'serial'
+            return
+
+        _worker_optimizer = self
+        try:
+            self._pool = multiprocessing.get_context('fork').Pool(self.n_jobs)
+        finally:
+            _worker_optimizer = None
+
+    def pool_stop(self):
+        """
+        Stop worker processes pool
+        :return:
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def evaluate_many(self, params_list):
+        """
+        Evaluate params sets by the optimizer backend
+        :param params_list: list of params sets
+        :return: list of evaluate() results in the same order as params_list (independent of the backend)
+        """
+        params_list = list(params_list)
+        if not self._is_parallel() or len(params_list) <= 1:
+            return self.evaluate_batch(params_list)
+
+        is_temp_pool = self._pool is None
+        self.pool_start()
+        if self._pool is None:
+            # Fallback to serial backend
+            return self.evaluate_batch(params_list)
+
+        try:
+            chunk_size = self.chunk_size
+            if chunk_size is None:
+                chunk_size = max(1, int(math.ceil(len(params_list) / (self.n_jobs * 4))))
+            chunks = [params_list[i:i + chunk_size] for i in range(0, len(params_list), chunk_size)]
+
+            # Pool.map() keeps the chunks order
+            return [result for chunk in self._pool.map(_worker_evaluate_chunk, chunks) for result in chunk]
+        finally:
+            if is_temp_pool:
+                self.pool_stop()
 
     def optimize(self):
         """
@@ -119,10 +274,9 @@ class OptimizerBase:
         scoreboard_scores = []
         scoreboard_params = []
 
-        for param in params_universe:
-            exposure_df = self.strategy.calculate(*param)
-            score = self.strategy.score(exposure_df)
+        scores = self.evaluate_many(params_universe)
 
+        for param, score in zip(params_universe, scores):
             # Insert score to scoreboard
             self._update_score_board(scoreboard_scores, scoreboard_params,
                                      score, param, n_max=self.nbest_count,
@@ -133,7 +287,7 @@ class OptimizerBase:
         if self.store_stats:
             # Get last available population and process equity and stats
             for individual in scoreboard_params:
-                strategy_exposure = self.strategy.calculate(*individual)
+                strategy_exposure = self.strategy_calculate(individual)
                 score, equity = self.strategy.score_stats(strategy_exposure)
 
                 self.stats[tuple(individual)] = {
@@ -145,7 +299,7 @@ class OptimizerBase:
 
             # Process picked swarm members
             for individual in picked_alphas:
-                strategy_exposure = self.strategy.calculate(*individual)
+                strategy_exposure = self.strategy_calculate(individual)
                 score, equity = self.strategy.score_stats(strategy_exposure)
 
                 self.stats[tuple(individual)] = {
@@ -179,6 +333,10 @@ class OptimizerGenetic(OptimizerBase):
             * cross_prob - cross-over probability (default: 0.5)
             * mut_prob - mutation probability (default: 0.1)
             * number_generations - number of generations (default: 30)
+            * fitness_memo - evaluate every unique individual only once per optimize() call (default: True)
+
+            # Parallel evaluation of the generation individuals ('backend', 'n_jobs', 'chunk_size'),
+            # see OptimizerBase kwargs
         """
         super().__init__(strategy, opt_params, **kwargs)
 
@@ -198,6 +356,11 @@ class OptimizerGenetic(OptimizerBase):
         self.mut_prob = kwargs.get('mut_prob', 0.1)
         self.number_generations = kwargs.get('number_generations', 30)
 
+        # Fitness values cache {tuple(individual): fitness}
+        self.fitness_memo = kwargs.get('fitness_memo', True)
+        self._fitness_cache = {}
+        self.n_evaluations = 0
+
     @staticmethod
     def mutate(individual, params_uni):
         """
@@ -228,13 +391,43 @@ class OptimizerGenetic(OptimizerBase):
         :param individual:
         :return:
         """
-        strategy_exposure = self.strategy.calculate(*individual)
-        score = self.strategy.score(strategy_exposure)
+        strategy_exposure = self.strategy_calculate(individual)
+        return self.score_result(self.strategy.score(strategy_exposure))
+
+    def score_result(self, score):
+        """
+        DEAP fitness values of the strategy score
+        :param score: strategy score
+        :return: fitness tuple
+        """
         if math.isfinite(score):
             return (score,)
         else:
             return (0, )
 
+    def map_evaluate(self, func, individuals):
+        """
+        DEAP toolbox 'map' replacement, evaluates generation individuals by the optimizer backend,
+        fitness of the repeated individuals is taken from the memo (if 'fitness_memo' is enabled)
+        :param func: function to map (toolbox.evaluate)
+        :param individuals: list of individuals
+        :return: list of func() results in the same order as individuals
+        """
+        if getattr(func, 'func', func) != self.evaluate:
+            # Toolbox wraps registered functions by functools.partial()
+            return list(map(func, individuals))
+
+        keys = [tuple(ind) for ind in individuals]
+        if not self.fitness_memo:
+            self.n_evaluations += len(keys)
+            return self.evaluate_many(keys)
+
+        new_keys = [k for k in dict.fromkeys(keys) if k not in self._fitness_cache]
+        self.n_evaluations += len(new_keys)
+        self._fitness_cache.update(zip(new_keys, self.evaluate_many(new_keys)))
+
+        return [self._fitness_cache[k] for k in keys]
+
     def optimize(self):
         """
         Main optimization routine
@@ -258,6 +451,7 @@ class OptimizerGenetic(OptimizerBase):
         toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
         toolbox.register("evaluate", self.evaluate)
+        toolbox.register("map", self.map_evaluate)
         toolbox.register("mate", self.mate)
         toolbox.register("mutate", self.mutate, params_uni=self.params_universe)
         toolbox.register("select", tools.selTournament, tournsize=5)
@@ -268,17 +462,27 @@ class OptimizerGenetic(OptimizerBase):
         stats.register("avg", np.mean)
 
         self.hof = tools.HallOfFame(self.nbest_count)
-        self.pop, self.logbook = algorithms.eaSimple(pop, toolbox,
-                                                     cxpb=self.cross_prob, mutpb=self.mut_prob,
-                                                     ngen=self.number_generations, verbose=False,
-                                                     stats=stats, halloffame=self.hof)
+
+        # Fitness values are valid only for the current strategy quotes range
+        self._fitness_cache = {}
+        self.n_evaluations = 0
+
+        # Worker processes are started once for all generations
+        self.pool_start()
+        try:
+            self.pop, self.logbook = algorithms.eaSimple(pop, toolbox,
+                                                         cxpb=self.cross_prob, mutpb=self.mut_prob,
+                                                         ngen=self.number_generations, verbose=False,
+                                                         stats=stats, halloffame=self.hof)
+        finally:
+            self.pool_stop()
 
         picked_alphas = self.strategy.pick(list(self.hof))
 
         if self.store_stats:
             # Get last available population and process equity and stats
             for individual in self.pop:
-                strategy_exposure = self.strategy.calculate(*individual)
+                strategy_exposure = self.strategy_calculate(individual)
                 score, equity = self.strategy.score_stats(strategy_exposure)
 
                 self.stats[tuple(individual)] = {
@@ -290,7 +494,7 @@ class OptimizerGenetic(OptimizerBase):
 
             # Process picked swarm members
             for individual in picked_alphas:
-                strategy_exposure = self.strategy.calculate(*individual)
+                strategy_exposure = self.strategy_calculate(individual)
                 score, equity = self.strategy.score_stats(strategy_exposure)
 
                 self.stats[tuple(individual)] = {
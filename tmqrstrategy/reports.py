@@ -93,7 +93,8 @@ class WFOViewer:
 
 
 class GeneticSwarmViewer:
-    def __init__(self, alpha, opt_params, oos_period_ratio, nbest_count, population_size=50, number_generations=50):
+    def __init__(self, alpha, opt_params, oos_period_ratio, nbest_count, population_size=50, number_generations=50,
+                 **optimizer_kwargs):
         self.alpha = alpha
         self.opt_params = opt_params
         self.oos_period_ratio = oos_period_ratio
@@ -110,7 +111,8 @@ class GeneticSwarmViewer:
         self.optimizer = OptimizerGenetic(alpha, opt_params, nbest_count=nbest_count,
                                           population_size=population_size,
                                           number_generations=number_generations,
-                                          store_stats=True)
+                                          store_stats=True,
+                                          **optimizer_kwargs)
         self.best_params = []
         self.iis_range_end = None
         self.picked_stats = {}
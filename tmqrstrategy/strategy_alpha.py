@@ -37,14 +37,8 @@ class StrategyAlpha(StrategyBase):
         stats = super().process_stats()
 
         series = stats['series']
-        position_delta = np.zeros(len(series))
-
-        for i, dt in enumerate(series.index):
-            # Calculate position delta
-            try:
-                position_delta[i] = self.position.delta(dt)
-            except NotFoundError:
-                pass
+        # Calculate position delta
+        position_delta = self.position.get_greeks_series(series.index)['delta'].values
 
         series['delta'] = position_delta
 
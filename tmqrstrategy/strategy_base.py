@@ -12,13 +12,15 @@ from dateutil.rrule import rrule, MONTHLY, WEEKLY
 from tmqr.errors import ArgumentError, WalkForwardOptimizationError, QuoteNotFoundError, StrategyError, \
     PositionNotFoundError, ChainNotFoundError
 from tmqr.logs import log
-from tmqr.settings import QDATE_MIN
+from tmqr.settings import QDATE_MIN, STRATEGY_EXPOSURE_CACHE_MAX_SIZE
 from tmqrfeed import DataManager
+from tmqrfeed.cache import CacheRegion
 from tmqrfeed.position import Position
 import warnings
 
 pyximport.install()
-from tmqrstrategy.fast_backtesting import score_netprofit, exposure, score_modsharpe, score_equity
+from tmqrstrategy.fast_backtesting import score_netprofit, exposure, score_modsharpe, score_equity, exposure_2d, \
+    score_netprofit_2d, score_modsharpe_2d
 from tmqr.serialization import object_from_path, object_to_full_path, object_load_decompress, object_save_compress
 
 WFO_ACTION_SKIP = 0
@@ -28,6 +30,13 @@ WFO_ACTION_BREAK = 4
 
 
 class StrategyBase:
+    _calculate_full_history = False
+    """
+    Set True if calculate() results depend only on the params and the full-history quotes, i.e. the indicators are
+    calculated on the full history and the result is sliced by quotes range. Cached exposure is calculated once on
+    the full history and sliced for all WFO windows (see 'wfo_exposure_cache' kwarg)
+    """
+
     def __init__(self, datamanager: DataManager, **kwargs):
         self.dm = datamanager  # type: DataManager
 
@@ -106,6 +115,15 @@ class StrategyBase:
         self.wfo_store_stats = kwargs.get('wfo_store_stats', False)
         """Store or not walk-forward optimization stats"""
 
+        self.wfo_exposure_cache = kwargs.get('wfo_exposure_cache', False)
+        """Cache calculate() results by (params, quotes range) for optimization, OOS and stats steps"""
+
+        self._exposure_cache = None
+        if self.wfo_exposure_cache:
+            self._exposure_cache = CacheRegion('exposure',
+                                               max_size=kwargs.get('wfo_exposure_cache_size',
+                                                                   STRATEGY_EXPOSURE_CACHE_MAX_SIZE))
+
     @property
     def strategy_name(self):
         """
@@ -208,6 +226,19 @@ class StrategyBase:
 
         return result
 
+    def _price_series(self) -> pd.Series:
+        """
+        Primary quotes price series of the active quotes range used for exposure and scoring
+        (DataManager caches the quotes range view until quotes_range_set() call)
+        :return: pd.Series
+        """
+        quotes = self.dm.quotes()
+        try:
+            return quotes['c']
+        except KeyError:
+            # In case of index based quotes
+            return quotes['equity_decision']
+
     def exposure(self, entry_rule: pd.Series, exit_rule: pd.Series, direction: int, position_size=None,
                  nbar_stop: int = 0) -> pd.DataFrame:
         """
@@ -220,16 +251,14 @@ class StrategyBase:
         :return: pandas DataFrame with 'exposure' column
         """
         # Use fast Cythonized method to calculate exposure
-        try:
-            price_series = self.dm.quotes()['c']
-        except KeyError:
-            # In case of index based quotes
-            price_series = self.dm.quotes()['equity_decision']
+        price_series = self._price_series()
 
-        if len(price_series) != len(entry_rule) or not np.all(price_series.index == entry_rule.index):
+        if entry_rule.index is not price_series.index and \
+                (len(price_series) != len(entry_rule) or not np.all(price_series.index == entry_rule.index)):
             raise StrategyError("Entry rule index doesn't match primary price series index")
 
-        if len(price_series) != len(exit_rule) or not np.all(price_series.index == exit_rule.index):
+        if exit_rule.index is not price_series.index and \
+                (len(price_series) != len(exit_rule) or not np.all(price_series.index == exit_rule.index)):
             raise StrategyError("Exit rule index doesn't match primary price series index")
 
         if direction not in [1, -1]:
@@ -244,7 +273,9 @@ class StrategyBase:
                     raise StrategyError("'position_size' is permanently zero")
             else:
                 if isinstance(position_size, pd.Series):
-                    if len(price_series) != len(position_size) or not np.all(price_series.index == position_size.index):
+                    if position_size.index is not price_series.index and \
+                            (len(price_series) != len(position_size) or
+                             not np.all(price_series.index == position_size.index)):
                         raise StrategyError("Position size index doesn't match primary price series index")
                 else:
                     raise StrategyError("Position size must be pandas.Series type")
@@ -272,6 +303,42 @@ class StrategyBase:
         """
         raise NotImplementedError("You must implement 'calculate' method in child strategy class")
 
+    def calculate_cached(self, *args: list) -> pd.DataFrame:
+        """
+        Cached calculate() call (if 'wfo_exposure_cache' kwarg is set), the results are cached by
+        (params, quotes range) or by params only if the strategy declares _calculate_full_history
+        IMPORTANT: cached results are shared, they must not be changed
+        :param args: optional strategy params (like MA periods, direction, etc)
+        :return: calculate() result
+        """
+        if self._exposure_cache is None:
+            return self.calculate(*args)
+
+        range_start, range_end = self.dm.quotes_range_get()
+        if not self._calculate_full_history:
+            key = (tuple(args), range_start, range_end)
+            result = self._exposure_cache.get(key)
+            if result is None:
+                result = self.calculate(*args)
+                self._exposure_cache[key] = result
+            return result
+
+        key = (tuple(args), None, None)
+        result = self._exposure_cache.get(key)
+        if result is None:
+            # Calculate on the full history
+            self.dm.quotes_range_set()
+            try:
+                result = self.calculate(*args)
+            finally:
+                self.dm.quotes_range_set(range_start, range_end)
+            self._exposure_cache[key] = result
+
+        if range_start is not None or range_end is not None:
+            # The same slicing as DataManager.quotes()
+            result = result.ix[range_start:range_end]
+        return result
+
     #
     #  Strategy optimization
     #
@@ -282,11 +349,7 @@ class StrategyBase:
         :param exposure_df: 'calculate' method exposure Pandas.DataFrame
         :return: float number
         """
-        try:
-            price_series = self.dm.quotes()['c']
-        except KeyError:
-            # In case of index based quotes
-            price_series = self.dm.quotes()['equity_decision']
+        price_series = self._price_series()
 
         if self.wfo_scoring_type == 'netprofit':
             return score_netprofit(price_series.values,
@@ -301,17 +364,56 @@ class StrategyBase:
         else:
             raise StrategyError(f"Unsupported 'wfo_scoring_type' = {self.wfo_scoring_type}")
 
+    def calculate_rules_batch(self, params_list: list) -> dict:
+        """
+        Optional batch version of 'calculate' used by the optimizers to score many swarm members in one pass,
+        implement it if the strategy logic is based on entry/exit rules only (see exposure())
+        :param params_list: list of 'calculate' args
+        :return: dict of exposure_2d() kwargs, rules matrices are aligned to primary quotes and have column per params:
+            * entry_rules - boolean np.array (bars x members)
+            * exit_rules - boolean np.array (bars x members)
+            * direction - 1 / -1 or array of members directions
+            * size_exposure - (optional) number, array of bars or matrix (bars x members)
+            * nbar_stop - (optional) int or array of members N-bar stops
+        """
+        raise NotImplementedError("'calculate_rules_batch' is not implemented by the strategy")
+
+    @property
+    def is_batch_supported(self) -> bool:
+        """
+        True if the strategy class implements calculate_rules_batch()
+        """
+        return type(self).calculate_rules_batch is not StrategyBase.calculate_rules_batch
+
+    def score_batch(self, params_list: list) -> np.ndarray:
+        """
+        Batch version of the optimization scoring (see score()) based on calculate_rules_batch() results
+        :param params_list: list of 'calculate' args
+        :return: np.array of scores in the same order as params_list
+        """
+        price_series = self._price_series()
+
+        rules = self.calculate_rules_batch(params_list)
+        exposure_arr = exposure_2d(price_series.values, **rules)
+
+        if exposure_arr.shape[1] != len(params_list):
+            raise StrategyError(f"'calculate_rules_batch' returned {exposure_arr.shape[1]} rules columns, "
+                                f"expected {len(params_list)}")
+
+        if self.wfo_scoring_type == 'netprofit':
+            return score_netprofit_2d(price_series.values, exposure_arr, costs=self.wfo_costs_per_contract)
+        elif self.wfo_scoring_type == 'modsharpe':
+            return score_modsharpe_2d(price_series.values, exposure_arr, costs=self.wfo_costs_per_contract)
+        else:
+            raise StrategyError(f"Unsupported 'wfo_scoring_type' = {self.wfo_scoring_type}")
+
     def score_stats(self, exposure_df: pd.DataFrame) -> Tuple[dict, pd.Series]:
         """
         Calculates statistics for fast tier scoring (i.e. price based backtesting)
         :param exposure_df: 'calculate' method exposure Pandas.DataFrame
         :return: tuple of (dictionary of stats metrics, equity)
         """
-        try:
-            price_series = self.dm.quotes()['c']
-        except KeyError:
-            # In case of index based quotes
-            price_series = self.dm.quotes()['equity_decision']
+        price_series = self._price_series()
 
         df_exposure_ = exposure_df['exposure']
 
@@ -446,6 +548,10 @@ class StrategyBase:
         # Initialize quotes
         self.setup()
 
+        if self._exposure_cache is not None:
+            # Quotes could be changed by setup()
+            self._exposure_cache.clear()
+
         try:
             quotes_index = self.dm.quotes().index
         except QuoteNotFoundError:
@@ -502,7 +608,7 @@ class StrategyBase:
             oos_stats = {}
 
             for alpha_params in self.wfo_selected_alphas:
-                alpha_exposure_df = self.calculate(*alpha_params)
+                alpha_exposure_df = self.calculate_cached(*alpha_params)
                 oos_exposure_df_list.append(alpha_exposure_df)
 
                 if self.wfo_store_stats:
@@ -695,6 +801,7 @@ class StrategyBase:
             'wfo_members_count': self.wfo_members_count,
             'wfo_optimizer_class_kwargs': self.wfo_optimizer_class_kwargs,
             'wfo_optimizer_class': object_to_full_path(self.wfo_optimizer_class),
+            'wfo_exposure_cache': self.wfo_exposure_cache,
             'position': self.position.serialize(),
             'exposure_series': object_save_compress(self.exposure_series),
             'stats': object_save_compress(self.stats),
@@ -185,3 +185,61 @@ class FastScoringTestCase(unittest.TestCase):
         trades = exposure_trades(pxs, exp)
         expected = np.array([2.0, 1.0, 0.0], dtype=np.float)
         self.assertTrue(np.all(trades == expected))
+
+    def test_exposure_2d(self):
+        np.random.seed(1)
+        n_bars, n_members = 300, 8
+        px = np.cumsum(np.random.normal(size=n_bars))
+        ent = np.random.random((n_bars, n_members)) > 0.9
+        ext = np.random.random((n_bars, n_members)) > 0.8
+        directions = np.array([1, -1] * (n_members // 2))
+        nbar_stops = np.arange(n_members) % 3
+        size = np.random.random(n_bars)
+
+        result = exposure_2d(px, ent, ext, directions, size_exposure=size, nbar_stop=nbar_stops)
+        self.assertEqual((n_bars, n_members), result.shape)
+        for j in range(n_members):
+            exp = exposure(px, ent[:, j], ext[:, j], directions[j], size_exposure=size, nbar_stop=nbar_stops[j])
+            self.assertTrue(np.all(exp == result[:, j]))
+
+        # Scalar arguments
+        result = exposure_2d(px, ent, ext, -1, size_exposure=2)
+        for j in range(n_members):
+            self.assertTrue(np.all(exposure(px, ent[:, j], ext[:, j], -1, size_exposure=2) == result[:, j]))
+
+        # Per member sizes
+        size_2d = np.random.random((n_bars, n_members))
+        result = exposure_2d(px, ent, ext, 1, size_exposure=size_2d)
+        for j in range(n_members):
+            self.assertTrue(np.all(exposure(px, ent[:, j], ext[:, j], 1, size_exposure=size_2d[:, j]) == result[:, j]))
+
+        self.assertRaises(ArgumentError, exposure_2d, px, ent[:1], ext, 1)
+        self.assertRaises(ArgumentError, exposure_2d, px, ent, ext[:, :1], 1)
+        self.assertRaises(ArgumentError, exposure_2d, px, ent, ext, [1, -1])
+        self.assertRaises(ArgumentError, exposure_2d, px, ent, ext, 1, nbar_stop=[1, 2])
+        self.assertRaises(ArgumentError, exposure_2d, px, ent, ext, 1, size_exposure=size[:1])
+        self.assertRaises(ArgumentError, exposure_2d, px, ent, ext, 1, size_exposure=size_2d[:, :1])
+
+    def test_score_2d(self):
+        np.random.seed(2)
+        n_bars, n_members = 500, 6
+        px = np.cumsum(np.random.normal(size=n_bars))
+        exp = exposure_2d(px, np.random.random((n_bars, n_members)) > 0.9,
+                          np.random.random((n_bars, n_members)) > 0.8, 1)
+        cst = np.random.random(n_bars)
+
+        for costs in (None, 0.5, cst):
+            netprofit = score_netprofit_2d(px, exp, costs=costs)
+            modsharpe = score_modsharpe_2d(px, exp, costs=costs)
+            for j in range(n_members):
+                self.assertEqual(score_netprofit(px, exp[:, j], costs=costs), netprofit[j])
+                self.assertAlmostEqual(score_modsharpe(px, exp[:, j], costs=costs), modsharpe[j])
+
+        # Less than 5 trades
+        exp = np.zeros((n_bars, 2))
+        exp[10:20, 1] = 1.0
+        self.assertTrue(np.all(np.isnan(score_modsharpe_2d(px, exp))))
+
+        self.assertRaises(ArgumentError, score_netprofit_2d, px, exp[:1])
+        self.assertRaises(ArgumentError, score_modsharpe_2d, px, exp[:1])
+        self.assertRaises(ArgumentError, score_netprofit_2d, px, exp, costs=cst[:1])
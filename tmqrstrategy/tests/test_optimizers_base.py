@@ -1,7 +1,32 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from tmqrstrategy.optimizers import OptimizerBase
+from tmqrstrategy.strategy_base import StrategyBase
+from tmqrfeed import DataManager
 from tmqr.errors import *
+import numpy as np
+import pandas as pd
+
+
+class StrategyRules(StrategyBase):
+    def rules(self, period):
+        px = self.dm.quotes()['c']
+        ma = px.rolling(period).mean()
+        return px > ma, px < ma
+
+    def calculate(self, direction, period):
+        entry_rule, exit_rule = self.rules(period)
+        return self.exposure(entry_rule, exit_rule, direction)
+
+
+class StrategyRulesBatch(StrategyRules):
+    def calculate_rules_batch(self, params_list):
+        rules = [self.rules(period) for direction, period in params_list]
+        return {
+            'entry_rules': np.column_stack([r[0].values for r in rules]),
+            'exit_rules': np.column_stack([r[1].values for r in rules]),
+            'direction': [direction for direction, period in params_list],
+        }
 
 
 class OptimizerBaseTestCase(unittest.TestCase):
@@ -319,6 +344,95 @@ class OptimizerBaseTestCase(unittest.TestCase):
         self.assertEqual([(-1, 4), (-1, 3), (1, 3), (1, 4)], picked_members)
         pass
 
+    def test_init_backend(self):
+        strategy = MagicMock()
+        params = [('direction', [1, -1])]
+
+        opt = OptimizerBase(strategy, params)
+        self.assertEqual('serial', opt.backend)
+        self.assertTrue(opt.n_jobs >= 1)
+        self.assertEqual(None, opt.chunk_size)
+
+        opt = OptimizerBase(strategy, params, backend='process', n_jobs=2, chunk_size=10)
+        self.assertEqual('process', opt.backend)
+        self.assertEqual(2, opt.n_jobs)
+        self.assertEqual(10, opt.chunk_size)
+
+        self.assertRaises(SettingsError, OptimizerBase, strategy, params, backend='unkn')
+        self.assertRaises(SettingsError, OptimizerBase, strategy, params, n_jobs=0)
+        self.assertRaises(SettingsError, OptimizerBase, strategy, params, chunk_size=0)
+
+    def test_optimize_process_backend(self):
+        params = [
+            ('direction', [1, -1]),
+            ('period', list(range(1, 20)))
+        ]
+
+        strategy = MagicMock()
+        strategy.calculate.side_effect = lambda *p: p
+        strategy.score.side_effect = lambda p: p[0] * (p[1] % 7) + p[1] / 100.0
+        strategy.pick.side_effect = lambda p: p
+
+        picked_serial = OptimizerBase(strategy, params, nbest_count=10).optimize()
+
+        for chunk_size in (None, 1, 3, 100):
+            optimizer = OptimizerBase(strategy, params, nbest_count=10, backend='process', n_jobs=2,
+                                      chunk_size=chunk_size)
+            self.assertEqual(picked_serial, optimizer.optimize())
+            self.assertEqual(None, optimizer._pool)
+
+        # Results order doesn't depend on the backend
+        universe = [(1, i) for i in range(10)]
+        optimizer = OptimizerBase(strategy, params, backend='process', n_jobs=3, chunk_size=2)
+        optimizer.pool_start()
+        try:
+            self.assertEqual([strategy.score(p) for p in universe], optimizer.evaluate_many(universe))
+            # The pool is reused by next calls
+            pool = optimizer._pool
+            self.assertEqual([strategy.score(p) for p in universe], optimizer.evaluate_many(universe))
+            self.assertTrue(pool is optimizer._pool)
+        finally:
+            optimizer.pool_stop()
+        self.assertEqual(None, optimizer._pool)
+
+    def test_optimize_batch(self):
+        dm = MagicMock(DataManager)()
+        np.random.seed(3)
+        dm.quotes.return_value = pd.DataFrame({'c': np.cumsum(np.random.normal(size=300)) + 100},
+                                              index=pd.date_range('2011-01-01', periods=300))
+        wfo_params = {
+            'window_type': 'rolling',
+            'period': 'M',
+            'oos_periods': 2,
+            'iis_periods': 2,
+        }
+        params = [
+            ('direction', [1, -1]),
+            ('period', list(range(2, 30)))
+        ]
+
+        picked = {}
+        for strategy_cls in (StrategyRules, StrategyRulesBatch):
+            for scoring_type in ('netprofit', 'modsharpe'):
+                strategy = strategy_cls(dm, wfo_params=wfo_params, wfo_optimizer_class=OptimizerBase, name='test',
+                                        wfo_scoring_type=scoring_type, wfo_costs_per_contract=0.1)
+                strategy.pick = lambda p: p
+                optimizer = OptimizerBase(strategy, params, nbest_count=10, batch_size=7)
+                with patch.object(strategy, 'calculate_rules_batch',
+                                  wraps=strategy.calculate_rules_batch) as mock_batch:
+                    picked[(strategy_cls, scoring_type)] = optimizer.optimize()
+
+                    if strategy_cls == StrategyRulesBatch:
+                        # 56 params sets by 7
+                        self.assertEqual(8, mock_batch.call_count)
+                    else:
+                        self.assertEqual(0, mock_batch.call_count)
+
+        for scoring_type in ('netprofit', 'modsharpe'):
+            self.assertEqual(picked[(StrategyRules, scoring_type)], picked[(StrategyRulesBatch, scoring_type)])
+
+        self.assertRaises(SettingsError, OptimizerBase, MagicMock(), params, batch_size=0)
+
     def test_optimize_errors(self):
         params = [
             ('direction', [1, -1]),
@@ -179,3 +179,47 @@ class OptimizerGeneticTestCase(unittest.TestCase):
                 mock_eval.side_effect = lambda x: sum(x)
                 opt = OptimizerGenetic(strategy, params, nbest_fitness_method='invalid')
                 self.assertRaises(SettingsError, opt.optimize)
+
+    def test_optimize_fitness_memo_and_backend(self):
+        params = [
+            ('direction', [1, -1]),
+            ('period_slow', [2, 4, 5, 10]),
+            ('period_false', [10, 11, 12, 13])
+        ]
+        strategy = MagicMock(StrategyBase)()
+        strategy.calculate.side_effect = lambda *p: p
+        strategy.score.side_effect = lambda p: p[0] * p[1] + p[2] / 100.0
+        strategy.pick.side_effect = lambda p: p
+
+        def run_optimizer(**kwargs):
+            opt = OptimizerGenetic(strategy, params, rand_seed=7, population_size=20, number_generations=5,
+                                   nbest_count=5, **kwargs)
+            picked = opt.optimize()
+            return opt, [list(p) for p in picked]
+
+        opt_nomemo, picked_nomemo = run_optimizer(fitness_memo=False)
+        opt_memo, picked_memo = run_optimizer()
+
+        self.assertEqual(picked_nomemo, picked_memo)
+        # Only unique individuals are evaluated
+        self.assertTrue(opt_memo.n_evaluations < opt_nomemo.n_evaluations)
+        self.assertEqual(opt_memo.n_evaluations, len(opt_memo._fitness_cache))
+        self.assertTrue(opt_memo.n_evaluations <= 2 * 4 * 4)
+
+        opt_process, picked_process = run_optimizer(backend='process', n_jobs=2)
+        self.assertEqual(picked_memo, picked_process)
+        self.assertEqual(opt_memo.n_evaluations, opt_process.n_evaluations)
+        self.assertEqual(None, opt_process._pool)
+
+    def test_map_evaluate(self):
+        strategy = MagicMock(StrategyBase)()
+        strategy.calculate.side_effect = lambda *p: p
+        strategy.score.side_effect = lambda p: sum(p)
+        opt = OptimizerGenetic(strategy, [('direction', [1, -1]), ('period', [1, 2])])
+
+        self.assertEqual([(3,), (4,), (3,)], opt.map_evaluate(opt.evaluate, [[1, 2], [2, 2], [1, 2]]))
+        self.assertEqual(2, opt.n_evaluations)
+        self.assertEqual(2, strategy.score.call_count)
+
+        # Other functions are mapped as is
+        self.assertEqual([2, 4], opt.map_evaluate(lambda x: x * 2, [1, 2]))
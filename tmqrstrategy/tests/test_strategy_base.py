@@ -990,6 +990,88 @@ class StrategyBaseTestCase(unittest.TestCase):
         strategy = StrategyBase(dm, wfo_params=wfo_params, wfo_optimizer_class=MagicMock(), name='unittest_strat')
         self.assertRaises(NotImplementedError, strategy.calculate)
 
+    def test_calculate_cached(self):
+        dm = MagicMock(DataManager)()
+        wfo_params = {
+            'window_type': 'rolling',  # Rolling window for IIS values: rolling or expanding
+            'period': 'M',  # Period of rolling window 'M' - monthly or 'W' - weekly
+            'oos_periods': 2,  # Number of months is OOS period
+            'iis_periods': 2,  # Number of months in IIS rolling window (only applicable for 'window_type' == 'rolling')
+        }
+        date_idx = pd.date_range('2011-01-01', periods=10)
+        dm.quotes_range_get.return_value = (datetime(2011, 1, 3), datetime(2011, 1, 5))
+
+        with patch('tmqrstrategy.strategy_base.StrategyBase.calculate') as mock_calculate:
+            mock_calculate.side_effect = lambda *args: pd.DataFrame({'exposure': np.ones(10) * args[0]},
+                                                                    index=date_idx)
+            # Cache is disabled by default
+            strategy = StrategyBase(dm, wfo_params=wfo_params, wfo_optimizer_class=MagicMock(), name='unittest_strat')
+            strategy.calculate_cached(1)
+            strategy.calculate_cached(1)
+            self.assertEqual(2, mock_calculate.call_count)
+
+            # Cached by (params, quotes range)
+            mock_calculate.reset_mock()
+            strategy = StrategyBase(dm, wfo_params=wfo_params, wfo_optimizer_class=MagicMock(), name='unittest_strat',
+                                    wfo_exposure_cache=True)
+            df = strategy.calculate_cached(1)
+            self.assertTrue(df is strategy.calculate_cached(1))
+            self.assertEqual(1, mock_calculate.call_count)
+            strategy.calculate_cached(2)
+            self.assertEqual(2, mock_calculate.call_count)
+
+            dm.quotes_range_get.return_value = (datetime(2011, 1, 3), datetime(2011, 1, 7))
+            strategy.calculate_cached(1)
+            self.assertEqual(3, mock_calculate.call_count)
+            self.assertEqual(False, dm.quotes_range_set.called)
+
+            # Full history calculation is sliced by quotes range
+            mock_calculate.reset_mock()
+            strategy._calculate_full_history = True
+            strategy._exposure_cache.clear()
+            df = strategy.calculate_cached(1)
+            self.assertEqual(list(date_idx[2:7]), list(df.index))
+            self.assertEqual(((), {}), dm.quotes_range_set.call_args_list[0])
+            self.assertEqual(((datetime(2011, 1, 3), datetime(2011, 1, 7)), {}), dm.quotes_range_set.call_args)
+
+            dm.quotes_range_get.return_value = (datetime(2011, 1, 1), datetime(2011, 1, 2))
+            df = strategy.calculate_cached(1)
+            self.assertEqual(list(date_idx[:2]), list(df.index))
+            self.assertEqual(1, mock_calculate.call_count)
+
+    def test_score_batch(self):
+        dm = MagicMock(DataManager)()
+        wfo_params = {
+            'window_type': 'rolling',  # Rolling window for IIS values: rolling or expanding
+            'period': 'M',  # Period of rolling window 'M' - monthly or 'W' - weekly
+            'oos_periods': 2,  # Number of months is OOS period
+            'iis_periods': 2,  # Number of months in IIS rolling window (only applicable for 'window_type' == 'rolling')
+        }
+        date_idx = pd.date_range('2011-01-01', periods=6)
+        dm.quotes.return_value = pd.DataFrame({'c': [1, 3, 5, 7, 8, 9]}, index=date_idx, dtype=np.float)
+
+        strategy = StrategyBase(dm, wfo_params=wfo_params, wfo_optimizer_class=MagicMock(), name='unittest_strat')
+        self.assertEqual(False, strategy.is_batch_supported)
+        self.assertRaises(NotImplementedError, strategy.score_batch, [(1,)])
+
+        class StrategyBatch(StrategyBase):
+            def calculate_rules_batch(self, params_list):
+                entry_rules = np.zeros((6, 2), dtype=np.uint8)
+                entry_rules[1, :] = 1
+                exit_rules = np.zeros((6, 2), dtype=np.uint8)
+                exit_rules[3, :] = 1
+                return {'entry_rules': entry_rules, 'exit_rules': exit_rules, 'direction': [1, -1]}
+
+        strategy = StrategyBatch(dm, wfo_params=wfo_params, wfo_optimizer_class=MagicMock(), name='unittest_strat')
+        self.assertEqual(True, strategy.is_batch_supported)
+        self.assertEqual([4.0, -4.0], list(strategy.score_batch([(1,), (-1,)])))
+
+        # Columns count mismatch
+        self.assertRaises(StrategyError, strategy.score_batch, [(1,)])
+
+        strategy.wfo_scoring_type = 'unknown'
+        self.assertRaises(StrategyError, strategy.score_batch, [(1,), (-1,)])
+
     def test_calculate_position(self):
         dm = MagicMock(DataManager)()
         wfo_params = {